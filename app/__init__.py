@@ -1 +1,8 @@
-from .controller import Controller
\ No newline at end of file
+def __getattr__(name: str):
+    # VIKTOR loads the app as `app.Controller`; importing the controller (and viktor)
+    # only then keeps the analysis modules usable without a VIKTOR environment
+    if name == "Controller":
+        from .controller import Controller
+
+        return Controller
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,201 @@
+"""
+Headless batch runs of analyses and optimizations, without VIKTOR nor the LLM.
+
+    python -m app.cli platforms.csv results.npz --workers 4
+
+The batch is a JSON list of objects or a CSV with a header row, one platform per
+entry with the fields of `PlatformInputs` (and `TrussDir`, `TrussDepth` for a
+`PlatformMixedInputs`) and either:
+
+- the sections of `SectionSeed` (`SectionSeedMixed`) to analyse the platform, or
+- the optimization settings `deformation_limit` (mm), `multi_fidelity` and
+  `keep_best` to optimize it, with the platform as seed.
+
+The entries run in parallel worker processes, each with its own OpenSees model.
+The results are written with one column per quantity: one row per analysis and
+one per design an optimization returns (its rank, the lightest first), to a CSV or,
+for a `.npz` output, one array per column. An entry that fails gets a row with its
+error, the others still run.
+"""
+import os
+import csv
+import json
+import time
+import logging
+import argparse
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from app.schemas import DesignResult, PlatformInputs, PlatformMixedInputs, SectionSeed, SectionSeedMixed
+
+logger = logging.getLogger(__name__)
+
+WORKERS = max(1, (os.cpu_count() or 2) - 1)
+OUTPUT_FORMATS = (".csv", ".npz")
+OPTIMIZATION_FIELDS = ("deformation_limit", "multi_fidelity", "keep_best")
+# Value of a missing cell of the `.npz` columns, by the type of the column
+MISSING_VALUES: dict[type, Any] = {str: "", int: -1, float: float("nan"), bool: False}
+
+
+@dataclass(frozen=True)
+class BatchEntry:
+    geometry: PlatformInputs
+    sections: SectionSeed | None = None  # None optimizes the platform
+    deformation_limit: float | None = None
+    multi_fidelity: bool = False
+    keep_best: int | None = None
+
+    @classmethod
+    def from_record(cls, record: dict[str, Any]) -> "BatchEntry":
+        """Entry of a flat record of the batch file, empty values are left out."""
+        record = {key: value for key, value in record.items() if value not in (None, "")}
+        mixed = "TrussDir" in record or "TrussDepth" in record
+        platform = PlatformMixedInputs if mixed else PlatformInputs
+        seed = SectionSeedMixed if mixed else SectionSeed
+        unknown = set(record) - set(platform.model_fields) - set(seed.model_fields) - set(OPTIMIZATION_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields {sorted(unknown)}")
+
+        geometry = platform.model_validate({key: record[key] for key in platform.model_fields if key in record})
+        section_fields = {key: record[key] for key in seed.model_fields if key in record}
+        if section_fields and set(record) & set(OPTIMIZATION_FIELDS):
+            raise ValueError("Give either the sections to analyse or the optimization settings, not both")
+        multi_fidelity = record.get("multi_fidelity", False)
+        if isinstance(multi_fidelity, str):
+            multi_fidelity = multi_fidelity.strip().lower() in ("1", "true", "yes")
+        if multi_fidelity and "deformation_limit" not in record:
+            raise ValueError("multi_fidelity needs a deformation_limit")
+        return cls(
+            geometry=geometry,
+            sections=seed.model_validate(section_fields) if section_fields else None,
+            deformation_limit=float(record["deformation_limit"]) if "deformation_limit" in record else None,
+            multi_fidelity=bool(multi_fidelity),
+            keep_best=int(record["keep_best"]) if "keep_best" in record else None,
+        )
+
+
+def read_batch(path: Path) -> list[BatchEntry]:
+    """Entries of a `.json` or `.csv` batch file, raising a ValueError naming the entry that is not valid."""
+    if path.suffix.lower() == ".csv":
+        with open(path, newline="") as csvfile:
+            records = list(csv.DictReader(csvfile))
+    else:
+        records = json.loads(path.read_text())
+        if not isinstance(records, list):
+            raise ValueError(f"{path} is not a JSON list of platforms")
+    entries = []
+    for number, record in enumerate(records, start=1):
+        try:
+            entries.append(BatchEntry.from_record(record))
+        except ValueError as error:
+            raise ValueError(f"Entry {number} of {path}: {error}") from error
+    return entries
+
+
+def design_row(design: DesignResult) -> dict[str, Any]:
+    from app.types import steel_cost
+
+    return {
+        **design.inputs.model_dump(),
+        **design.sections.model_dump(),
+        "total_weight": round(design.total_weight, 2),
+        "max_disp": round(design.global_max_disp, 4),
+        "total_cost": round(design.total_weight * steel_cost, 2),
+    }
+
+
+def run_entry(entry: BatchEntry) -> list[dict[str, Any]]:
+    """Worker process: rows of the analysis or of the designs of the optimization of `entry`."""
+    from app.tools.analysis_tools import calculate_model, run_optimization
+    from app.tools.model_tools import COARSE_FIDELITY
+
+    try:
+        if entry.sections is not None:
+            *_, max_disp_by_type, _, weight_dict = calculate_model(entry.geometry, entry.sections)
+            design = DesignResult(entry.geometry, entry.sections, max_disp_by_type, weight_dict)
+            return [{"mode": "analysis", "rank": 1, **design_row(design)}]
+
+        run = run_optimization(
+            entry.geometry,
+            deformation_limit=entry.deformation_limit,
+            keep_best=entry.keep_best,
+            coarse=COARSE_FIDELITY if entry.multi_fidelity else None,
+        )
+        designs = sorted(run.designs)
+        if entry.deformation_limit is not None:
+            designs = [design for design in designs if abs(design.global_max_disp) < entry.deformation_limit]
+        return [
+            {"mode": "optimization", "rank": rank, **design_row(design)}
+            for rank, design in enumerate(designs, start=1)
+        ]
+    except Exception as error:
+        logger.exception("Batch entry failed: %s", entry)
+        return [{"mode": "analysis" if entry.sections is not None else "optimization", "error": f"{type(error).__name__}: {error}"}]
+
+
+def run_batch(entries: list[BatchEntry], workers: int = WORKERS) -> list[dict[str, Any]]:
+    """Rows of all entries, in their order, each with the number of its `entry` (from 1)."""
+    if workers <= 1 or len(entries) <= 1:
+        results = map(run_entry, entries)
+    else:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(entries)), mp_context=multiprocessing.get_context("spawn"))
+        with pool:
+            results = list(pool.map(run_entry, entries))
+    return [{"entry": number, **row} for number, rows in enumerate(results, start=1) for row in rows]
+
+
+def to_columns(rows: list[dict[str, Any]]) -> dict[str, list[Any]]:
+    """One list per key of the rows, in order of appearance, None where a row has no value."""
+    keys = list(dict.fromkeys(key for row in rows for key in row))
+    return {key: [row.get(key) for row in rows] for key in keys}
+
+
+def write_columns(columns: dict[str, list[Any]], path: Path) -> None:
+    """Writes the columns to a `.npz` (one array per column) or a `.csv` file."""
+    if path.suffix.lower() == ".npz":
+        import numpy as np
+
+        arrays = {}
+        for key, values in columns.items():
+            kind = next((type(value) for value in values if value is not None), str)
+            arrays[key] = np.array([MISSING_VALUES.get(kind, "") if value is None else value for value in values])
+        np.savez_compressed(path, **arrays)
+    elif path.suffix.lower() == ".csv":
+        with open(path, "w", newline="") as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(columns)
+            writer.writerows(zip(*columns.values()))
+    else:
+        raise ValueError(f"Unsupported output {path}, use one of {', '.join(OUTPUT_FORMATS)}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("batch", type=Path, help="JSON or CSV file of the platforms to run")
+    parser.add_argument("output", type=Path, help="CSV or NPZ file of the results")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Worker processes (default: %(default)s)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+
+    if args.output.suffix.lower() not in OUTPUT_FORMATS:
+        parser.error(f"Unsupported output {args.output}, use one of {', '.join(OUTPUT_FORMATS)}")
+    try:
+        entries = read_batch(args.batch)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    start = time.perf_counter()
+    rows = run_batch(entries, args.workers)
+    write_columns(to_columns(rows), args.output)
+    failed = sum(1 for row in rows if "error" in row)
+    print(
+        f"{len(entries)} entries ({failed} failed), {len(rows)} rows written to {args.output} "
+        f"in {time.perf_counter() - start:.1f} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
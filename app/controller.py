@@ -1,43 +1,102 @@
-import os
-import json
 import viktor as vkt
-import plotly.graph_objects as go
 
-from openai import OpenAI
 from dotenv import load_dotenv
-from app.llm_engine import llm_response, execute_tool
-from app.plots.model_viz import default_blank_scene
-from typing import Literal
+from functools import cache
+from typing import TYPE_CHECKING, Iterator, Literal
 from textwrap import dedent
 
+from app.jobs import JOB_KEY, JobRecord, discard_job, read_job
+from app.plots.payload import annotate_figure, decode_figure
+from app.plots.thumbnails import THUMBNAILS_KEY, thumbnails_html
+from app.storage import current_storage, storage_session
+from app.tools.results_table import RESULTS_KEY, ResultsQuery, clear_results_table, query_results
+
+if TYPE_CHECKING:
+    # Loaded on first use: plotly, OpenSees and the LLM client are slow to import
+    from app.llm_engine import ResponseStream
+
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 
 def get_visibility(params, **kwargs):
-    if not params.chat:
-        entities = vkt.Storage().list(scope="entity")
-        for entity in entities:
-            if entity == "optimization_table":
-                vkt.Storage().delete("optimization_table", scope="entity")
+    # Called by VIKTOR on its own, or by a view within the session of the view
+    with storage_session(name="visibility") as storage:
+        if not params.chat:
+            clear_results_table()
+            storage.delete(THUMBNAILS_KEY)
+            storage.delete("design_space")
+            discard_job()
+
+        # If there is no data nor optimization job, then view is hiden.
+        return any(storage.exists_many([RESULTS_KEY, JOB_KEY]).values())
+
 
-    try:
-        vkt.Storage().get("optimization_table", scope="entity").getvalue()
-        return True
-    except Exception:
-        # If there is no data, then view is hiden.
-        return False
+def get_thumbnails_visibility(params, **kwargs):
+    with storage_session(name="thumbnails visibility") as storage:
+        get_visibility(params, **kwargs)
+        return storage.exists(THUMBNAILS_KEY)
+
+
+def get_design_space_visibility(params, **kwargs):
+    with storage_session(name="design space visibility") as storage:
+        get_visibility(params, **kwargs)
+        return storage.exists("design_space")
 
 
-def store_scene(figure: go.Figure, view_name: Literal["view"] = "view") -> None:
+def poll_job() -> JobRecord | None:
+    """Polls the optimization job of the entity, its results are stored once it is done."""
+    record = read_job()
+    if record is None or not record.active:
+        return record
+
+    from app.llm_engine import sync_job
+
+    record, scene = sync_job()
+    if scene:
+        store_scene(scene)
+    return record
+
+
+def store_scene(scene: bytes, view_name: Literal["view"] = "view") -> None:
     """This function stores the output of a tool call in
     the vkt.Storage object. The storage object can be used to communicate
-    between views."""
-    vkt.Storage().set(
-        view_name,
-        data=vkt.File.from_data(figure.to_json().encode()),
-        scope="entity",
-    )
+    between views. Tools store a compact scene payload, the view renders it."""
+    current_storage().set(view_name, scene)
+
+
+def read_view_figure(data: bytes) -> str:
+    """Figure JSON of the stored view, rendering (and caching) a scene payload."""
+    from app.plots.scene import is_scene_payload, render_scenes
+
+    if is_scene_payload(data):
+        return render_scenes(data)
+    return decode_figure(data)
+
+
+@cache
+def blank_scene_json() -> str:
+    from app.plots.model_viz import default_blank_scene
+
+    return default_blank_scene().to_json()
+
+
+def stream_and_execute(stream: "ResponseStream", params, **kwargs) -> Iterator[str]:
+    """Forwards the response text to the chat while it is generated, then waits for the
+    selected tool (started speculatively by the stream's runner) and stores its scene.
+    Background jobs started or cancelled are reported at the end of the message."""
+    from app.llm_engine import execute_tool
+
+    yield from stream
+    if stream.final is None:
+        raise ValueError("The LLM returned no parsed reponse.")
+
+    with storage_session(name="chat tool"):
+        notice, scene = execute_tool(stream.final, runner=stream.runner)
+        if scene:
+            store_scene(scene)
+        get_visibility(params, **kwargs)
+    if notice:
+        yield f"\n\n{notice}"
 
 
 class Parametrization(vkt.Parametrization):
@@ -51,6 +110,29 @@ class Parametrization(vkt.Parametrization):
         )
     )
     chat = vkt.Chat("", method="call_llm")
+    design_space_colour = vkt.OptionField(
+        "Colour the design space by",
+        options=[
+            vkt.OptionListElement("joist_cs", "Joist section"),
+            vkt.OptionListElement("beam_cs", "Beam section"),
+            vkt.OptionListElement("truss_chord_cs", "Truss chord section"),
+            vkt.OptionListElement("nJoist", "Number of joists"),
+        ],
+        default="joist_cs",
+    )
+    results_sort = vkt.OptionField(
+        "Sort the results by",
+        options=[
+            vkt.OptionListElement("rank", "Optimization rank"),
+            vkt.OptionListElement("weight", "Total weight"),
+            vkt.OptionListElement("displacement", "Max displacement"),
+            vkt.OptionListElement("joists", "Number of joists"),
+        ],
+        default="rank",
+    )
+    results_rows = vkt.IntegerField("Results shown", default=50, min=1, max=1000)
+    results_max_weight = vkt.NumberField("Max total weight", suffix="kg")
+    results_max_displacement = vkt.NumberField("Max |ΔZ|", suffix="mm")
 
 
 class Controller(vkt.Controller):
@@ -62,59 +144,78 @@ class Controller(vkt.Controller):
         conversation_history = params.chat.get_messages()
         #  Check if user uploaded an Excel Field
         if conversation_history:
-            response = llm_response(
-                conversation_history=conversation_history,
-            )
-
-            if response:
-                llm_message, fig = execute_tool(response)
-                if fig:
-                    store_scene(fig)
-                    get_visibility(params, **kwargs)
+            from app.llm_engine import ResponseStream, SpeculativeToolRunner
 
-                return vkt.ChatResult(params.chat, llm_message)
-            else:
-                raise ValueError("The LLM returned no parsed reponse.")
+            stream = ResponseStream(conversation_history=conversation_history, runner=SpeculativeToolRunner())
+            return vkt.ChatResult(params.chat, stream_and_execute(stream, params, **kwargs))
         return None
 
     @vkt.PlotlyView("Plotting Tool", width=100)
     def get_plotly_view(self, params, **kwargs) -> vkt.PlotlyResult:
         """This view plots the output of a tool call in a Plotly view.
-        All tool calls are go.Figures exported as JSON. They are saved in
-        Storage and retrieved here."""
-        # 1. Delete tools calls from storage if there is no .xlsx file
-        if not params.chat:
-            entities = vkt.Storage().list(scope="entity")
-            for entity in entities:
-                if entity == "view":
-                    vkt.Storage().delete("view", scope="entity")
-
-        # 2. Try to get the previous view from the tool call, otherwise blank scene
-        try:
-            raw = vkt.Storage().get("view", scope="entity").getvalue()
-            fig = go.Figure(json.loads(raw))
-        except Exception:
-            fig = default_blank_scene()
-
-        return vkt.PlotlyResult(fig.to_json())
+        Tool calls store compact scenes, the figure is built from them on first
+        display and cached. Figures stored as JSON are passed through as is."""
+        with storage_session(name="plotly view") as storage:
+            # 1. Delete tools calls from storage if there is no .xlsx file
+            if not params.chat:
+                storage.delete("view")
+            job = poll_job() if params.chat else None
+
+            # 2. Try to get the previous view from the tool call, otherwise blank scene
+            try:
+                figure_json = read_view_figure(storage.get("view"))
+            except Exception:
+                figure_json = blank_scene_json()
+
+        # 3. Progress of a running optimization, its optimal model replaces the view when done
+        if job is not None and job.active:
+            figure_json = annotate_figure(figure_json, f"Optimization running: {job}")
+        return vkt.PlotlyResult(figure_json)
 
     @vkt.TableView("Results", visible=get_visibility)
     def design_results_view(self, params, **kwargs):
-        get_visibility(params, **kwargs)
-        try:
-            # 1. Get the pre-formatted table data from storage
-            raw_table_data = (
-                vkt.Storage().get("optimization_table", scope="entity").getvalue()
+        with storage_session(name="results view") as storage:
+            job = poll_job() if params.chat else None
+            # 1. Read the index of the stored table and the pages of the rows shown
+            table = storage.get_json(RESULTS_KEY)
+            query = ResultsQuery(
+                sort=params.results_sort or "rank",
+                rows=params.results_rows or 50,
+                max_weight=params.results_max_weight,
+                max_displacement=params.results_max_displacement,
             )
-            table = json.loads(raw_table_data)
+            headers, rows = query_results(query, table) if table is not None else ([], [])
+            get_visibility(params, **kwargs)
 
-        except (FileNotFoundError, TypeError):
+        if job is not None and (job.active or not headers):
+            # The optimization is running (or did not finish, or found no valid design), show its progress
+            return vkt.TableResult(data=[[str(job)]], column_headers=["Optimization job"])
+        if table is None:
             # If no data is stored, show an empty table
             return vkt.TableResult(
                 data=[], column_headers=["No results generated yet."]
             )
 
-        # 2. Pass the headers and data directly to the result
-        return vkt.TableResult(
-            data=table.get("data", []), column_headers=table.get("headers", [])
-        )
\ No newline at end of file
+        # 2. Pass the headers and rows directly to the result
+        return vkt.TableResult(data=rows, column_headers=headers)
+
+    @vkt.WebView("Best designs", visible=get_thumbnails_visibility)
+    def design_thumbnails_view(self, params, **kwargs) -> vkt.WebResult:
+        """Deformed shape thumbnails of the best designs of the last optimization, next to the table."""
+        with storage_session(name="thumbnails view"):
+            if params.chat:
+                poll_job()
+            return vkt.WebResult(html=thumbnails_html())
+
+    @vkt.PlotlyView("Design space", visible=get_design_space_visibility)
+    def design_space_view(self, params, **kwargs) -> vkt.PlotlyResult:
+        """Every design evaluated by the last optimization, weight against max displacement."""
+        from app.plots.design_space import render_design_space
+
+        with storage_session(name="design space view") as storage:
+            if params.chat:
+                poll_job()
+            data = storage.get("design_space")
+        if data is None:
+            return vkt.PlotlyResult(blank_scene_json())
+        return vkt.PlotlyResult(render_design_space(data, params.design_space_colour or "joist_cs"))
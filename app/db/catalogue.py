@@ -0,0 +1,253 @@
+"""
+Section catalogue with the section properties held in NumPy arrays.
+
+The sections are kept in one structured array sorted by family and strong
+axis stiffness (``Iz``). Each family is therefore a contiguous slice and
+stiffness ranges are found with a binary search instead of a dict scan.
+
+Besides the small ``sections.json`` shipped with the app, a full catalogue
+(complete UB/UC/PFC/SHS/RHS/CHS ranges) can be stored as a sorted ``.npy``
+file which is memory-mapped on load. Build one from a JSON file with the
+same layout as ``sections.json``::
+
+    python -m app.db.catalogue full_sections.json full_sections.npy
+
+and point the app to it with the ``SECTIONS_TABLE`` environment variable.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import json
+import numpy as np
+
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Annotated, Literal
+
+from app.types import CrossSectionInfo, CrossSectionsDict, Steel
+
+SECTIONS_JSON = Path(__file__).parent / "sections.json"
+
+SectionFamily = Literal["Ishape", "HollowSection", "PFC"]
+FAMILIES: tuple[SectionFamily, ...] = ("Ishape", "HollowSection", "PFC")
+PROPERTIES: tuple[str, ...] = ("A", "Iy", "Iz", "Jxx", "b", "h")
+
+SECTION_DTYPE = np.dtype(
+    [
+        ("id", "<i4"),
+        ("family", "u1"),
+        ("name", "<U32"),
+        ("A", "<f8"),
+        ("Iy", "<f8"),
+        ("Iz", "<f8"),
+        ("Jxx", "<f8"),
+        ("b", "<f8"),
+        ("h", "<f8"),
+        ("mass", "<f8"),  # kg per metre
+    ]
+)
+
+
+@dataclass(frozen=True)
+class SectionWindow:
+    """Candidate sections for one member group of the optimizer."""
+    families: tuple[SectionFamily, ...]
+    min_Iz: float | None = None
+    max_Iz: float | None = None
+    max_mass: float | None = None
+    max_count: Annotated[int | None, "Sections kept, evenly spread over the stiffness range"] = None
+
+
+class SectionCatalogue:
+    def __init__(self, data: np.ndarray) -> None:
+        order = np.lexsort((data["Iz"], data["family"]))
+        if not np.array_equal(order, np.arange(data.size)):
+            data = data[order]
+        self.data = data
+
+        # Families are contiguous slices of the sorted data
+        bounds = np.searchsorted(data["family"], np.arange(len(FAMILIES) + 1))
+        self._family_slices: dict[str, slice] = {
+            family: slice(int(bounds[code]), int(bounds[code + 1])) for code, family in enumerate(FAMILIES)
+        }
+
+        self._rows = np.full(int(data["id"].max()) + 1, -1, dtype=np.int32)
+        self._rows[data["id"]] = np.arange(data.size, dtype=np.int32)
+
+    @classmethod
+    def from_json(cls, file_path: Path = SECTIONS_JSON) -> SectionCatalogue:
+        with open(file_path) as jsonfile:
+            grouped: dict[str, list[CrossSectionInfo]] = json.load(jsonfile)
+        return cls.from_grouped(grouped)
+
+    @classmethod
+    def from_npy(cls, file_path: Path, mmap: bool = True) -> SectionCatalogue:
+        """Load a catalogue written by ``save``; the file is memory-mapped by default."""
+        data = np.load(file_path, mmap_mode="r" if mmap else None, allow_pickle=False)
+        if data.dtype != SECTION_DTYPE:
+            raise ValueError(f"{file_path} is not a section table, got dtype {data.dtype}")
+        return cls(data)
+
+    def save(self, file_path: Path) -> None:
+        np.save(file_path, np.asarray(self.data), allow_pickle=False)
+
+    @classmethod
+    def from_grouped(cls, grouped: dict[str, list[CrossSectionInfo]]) -> SectionCatalogue:
+        rows = [(family, cs) for family, sections in grouped.items() for cs in sections]
+        data = np.zeros(len(rows), dtype=SECTION_DTYPE)
+        for row, (family, cs) in enumerate(rows):
+            data[row] = (
+                cs["id"], FAMILIES.index(family), cs["name"], cs["A"], cs["Iy"], cs["Iz"], cs["Jxx"], cs["b"], cs["h"], 0.0
+            )
+        data["mass"] = data["A"] * Steel.density * 1000.0
+        return cls(data)
+
+    # ------------------------------------------------------------------ #
+    # Columns
+    # ------------------------------------------------------------------ #
+    @property
+    def ids(self) -> np.ndarray:
+        return self.data["id"]
+
+    @property
+    def names(self) -> np.ndarray:
+        return self.data["name"]
+
+    @property
+    def A(self) -> np.ndarray:
+        return self.data["A"]
+
+    @property
+    def Iy(self) -> np.ndarray:
+        return self.data["Iy"]
+
+    @property
+    def Iz(self) -> np.ndarray:
+        return self.data["Iz"]
+
+    @property
+    def Jxx(self) -> np.ndarray:
+        return self.data["Jxx"]
+
+    @property
+    def b(self) -> np.ndarray:
+        return self.data["b"]
+
+    @property
+    def h(self) -> np.ndarray:
+        return self.data["h"]
+
+    @property
+    def mass(self) -> np.ndarray:
+        """Mass per metre in kg/m."""
+        return self.data["mass"]
+
+    def __len__(self) -> int:
+        return int(self.data.size)
+
+    def __contains__(self, section_id: object) -> bool:
+        return isinstance(section_id, (int, np.integer)) and 0 <= section_id < self._rows.size and self._rows[section_id] >= 0
+
+    # ------------------------------------------------------------------ #
+    # Lookups
+    # ------------------------------------------------------------------ #
+    def rows(self, section_ids: np.ndarray | list[int] | int) -> np.ndarray:
+        """Row of every section id, raises ``KeyError`` for unknown ids."""
+        ids = np.asarray(section_ids)
+        if ids.size and (ids.min() < 0 or ids.max() >= self._rows.size or (self._rows[ids] < 0).any()):
+            raise KeyError(f"Unknown cross section id in {ids.tolist()}")
+        return self._rows[ids]
+
+    def column(self, name: str, section_ids: np.ndarray | list[int]) -> np.ndarray:
+        return self.data[name][self.rows(section_ids)]
+
+    def name(self, section_id: int) -> str:
+        return str(self.data["name"][self.rows(section_id)])
+
+    def family_ids(self, family: SectionFamily) -> np.ndarray:
+        """Ids of a family ordered by increasing ``Iz``."""
+        return self.data["id"][self._family_slices[family]]
+
+    def query(
+        self,
+        family: SectionFamily,
+        *,
+        min_Iz: float | None = None,
+        max_Iz: float | None = None,
+        max_mass: float | None = None,
+        order_by: Literal["mass", "Iz", "A"] = "mass",
+    ) -> np.ndarray:
+        """Ids of the sections of ``family`` within the given limits, ordered by ``order_by``.
+        E.g. ``query("Ishape", min_Iz=1e8)`` gives the I-shapes with Iz >= 1e8 mm4, lightest first."""
+        family_slice = self._family_slices[family]
+        iz = self.data["Iz"][family_slice]
+        lo = int(np.searchsorted(iz, min_Iz, side="left")) if min_Iz is not None else 0
+        hi = int(np.searchsorted(iz, max_Iz, side="right")) if max_Iz is not None else iz.size
+
+        selected = self.data[family_slice.start + lo : family_slice.start + hi]
+        if max_mass is not None:
+            selected = selected[selected["mass"] <= max_mass]
+        return selected["id"][np.argsort(selected[order_by], kind="stable")]
+
+    def window(self, window: SectionWindow) -> np.ndarray:
+        """Ids of the sections inside ``window``, ordered by increasing ``Iz``."""
+        ids = np.concatenate(
+            [
+                self.query(family, min_Iz=window.min_Iz, max_Iz=window.max_Iz, max_mass=window.max_mass, order_by="Iz")
+                for family in window.families
+            ]
+        )
+        ids = ids[np.argsort(self.column("Iz", ids), kind="stable")]
+        return self._spread(ids, window.max_count)
+
+    @staticmethod
+    def _spread(ids: np.ndarray, max_count: int | None) -> np.ndarray:
+        """Keep at most ``max_count`` ids evenly spread over the (sorted) input."""
+        if max_count is None or ids.size <= max_count:
+            return ids
+        picks = np.unique(np.linspace(0, ids.size - 1, max_count).round().astype(np.intp))
+        return ids[picks]
+
+    # ------------------------------------------------------------------ #
+    # Exports
+    # ------------------------------------------------------------------ #
+    def to_records(self) -> CrossSectionsDict:
+        """Sections as ``CrossSectionInfo`` dicts keyed by id."""
+        records: CrossSectionsDict = {}
+        for row in self.data.tolist():
+            section_id, _, name, *props, _ = row
+            records[section_id] = {"name": name, "id": section_id, **dict(zip(PROPERTIES, props))}  # type: ignore[typeddict-item]
+        return records
+
+    def describe(self, max_per_family: int | None = None) -> str:
+        """Compact text listing of the sections grouped by family, used in the LLM prompt."""
+        lines = []
+        for family, family_slice in self._family_slices.items():
+            sections = self.data[family_slice]
+            sections = sections[self._spread(np.arange(sections.size), max_per_family)]
+            lines.append(f"{family}:")
+            lines.extend(
+                f"id:{section_id}: name:{name}: mass:{mass:.1f} kg/m: Iz:{iz:.4g} mm4"
+                for section_id, name, mass, iz in zip(
+                    sections["id"].tolist(), sections["name"].tolist(), sections["mass"].tolist(), sections["Iz"].tolist()
+                )
+            )
+        return "\n".join(lines)
+
+
+@lru_cache(maxsize=1)
+def get_catalogue() -> SectionCatalogue:
+    """Shared catalogue, loaded once per process. `SECTIONS_TABLE` selects a full `.npy` table."""
+    table = os.getenv("SECTIONS_TABLE")
+    if table:
+        return SectionCatalogue.from_npy(Path(table))
+    return SectionCatalogue.from_json()
+
+
+if __name__ == "__main__":
+    source, target = Path(sys.argv[1]), Path(sys.argv[2])
+    catalogue = SectionCatalogue.from_json(source)
+    catalogue.save(target)
+    print(f"Wrote {len(catalogue)} sections to {target} ({target.stat().st_size} bytes)")
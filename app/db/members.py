@@ -1,41 +1,44 @@
-
 import json
+import numpy as np
 
-from math import sqrt
-from pathlib import Path
-from collections import defaultdict
-from typing import Annotated, DefaultDict
+from typing import Annotated
 
-from app.types import CrossSectionInfo, LinesDict, MembersDict, CrossSectionsDict, NodesDict
+from app.types import CrossSectionInfo, CrossSectionsDict, Steel
+from app.db.catalogue import SectionCatalogue, get_catalogue, SECTIONS_JSON
+from app.geometry.tables import LINE_TYPES, MATERIAL_NAMES, LineTable, MemberTable, NodeTable
+from app.geometry.topology import Topology
 from functools import lru_cache
 
-def load_sections() -> dict[Annotated[str, "HollowSection, Ishape, PFC"], list[CrossSectionInfo]]:
-    file_path = Path.cwd() / "app" / "db" / "sections.json" 
+# SectionSeed field holding the cross section of every line Type
+SECTION_FIELDS: dict[str, str] = {
+    "Truss Diagonal": "truss_diag_cs",
+    "Column":         "column_cs",
+    "Joist":          "joist_cs",
+    "Beam":           "beam_cs",
+    "Truss Chord":    "truss_chord_cs",
+}
 
-    with open(file_path) as jsonfile:
+@lru_cache(maxsize=1)
+def load_sections() -> dict[Annotated[str, "HollowSection, Ishape, PFC"], list[CrossSectionInfo]]:
+    """Raw sections.json content, grouped by type. Prefer `get_catalogue()` for lookups."""
+    with open(SECTIONS_JSON) as jsonfile:
         data = json.load(jsonfile)
     return data
 
 @lru_cache(maxsize=1)
 def load_sections_db() -> CrossSectionsDict:
     """ sections.json: has cross section grouped by type  {HollowSection, Ishape, PFC}"""
-    grouped_cs_dict: dict[Annotated[str, "HollowSection, Ishape, PFC"], list[CrossSectionInfo]] = load_sections()
-
-    cross_section_dict: CrossSectionsDict = {}
-    for values in grouped_cs_dict.values():
-        for cs in values:
-            cross_section_dict[cs["id"]] = cs
-    
-    return cross_section_dict
+    catalogue: SectionCatalogue = get_catalogue()
+    return catalogue.to_records()
 
 def create_members(
-    lines: LinesDict,
+    lines: LineTable,
     truss_diag_cs: int | None = None,
     column_cs: int | None = None,
     joist_cs: int | None = None,
     beam_cs: int | None = None,
     truss_chord_cs: int | None = None,
-) -> MembersDict:
+) -> MemberTable:
     cs_map: dict[str, int | None] = {
         "Truss Diagonal": truss_diag_cs,
         "Column":         column_cs,
@@ -44,49 +47,44 @@ def create_members(
         "Truss Chord":    truss_chord_cs,
     }
 
-    members: MembersDict = {}
-    for line in lines.values():
-        line_type = line["Type"]
-        if line_type not in cs_map:
-            raise ValueError(f"Unknown line Type: {line_type!r}")
+    cs_by_code = type_section_ids({SECTION_FIELDS[line_type]: cs for line_type, cs in cs_map.items()})
+    cross_section_ids = cs_by_code[lines.type_codes]
+
+    missing = cross_section_ids == 0
+    if missing.any():
+        line_type = LINE_TYPES[lines.type_codes[missing][0]]
+        raise ValueError(f"{line_type=} not in {cs_map=} ")
+
+    material_codes = np.full(len(lines), MATERIAL_NAMES.index("Steel"), dtype=np.uint8)
+    return MemberTable(lines.ids, cross_section_ids, material_codes)
 
-        cs = cs_map.get(line_type)
-        if cs:
-            members[line["id"]] = {
-                "line_id":          line["id"],
-                "cross_section_id": cs,
-                "material_name":    "Steel",
-            }
-        else:
-            raise ValueError(f"{line_type=} not in {cs_map=} ")
-    return members
+def type_section_ids(sections: dict[str, int | None]) -> np.ndarray:
+    """Cross section id per line type code from SectionSeed fields, 0 where no section was given."""
+    return np.array([sections.get(SECTION_FIELDS[line_type]) or 0 for line_type in LINE_TYPES], dtype=np.int32)
+
+def assignment_weights(topology: Topology, sections: dict[str, int | None]) -> np.ndarray:
+    """
+    Weight in kg per line type code when every member group uses one section
+    (`SectionSeed.model_dump()`): a product with the precomputed lengths per type.
+    """
+    cs_by_code = type_section_ids(sections)
+    used = cs_by_code > 0
+    mass_per_mm = np.zeros(len(LINE_TYPES))
+    mass_per_mm[used] = get_catalogue().column("A", cs_by_code[used]) * Steel.density
+    return topology.length_by_type * mass_per_mm
 
 def calculate_weights_schedule(
-    members: MembersDict,
-    lines: LinesDict,
-    nodes: NodesDict
+    members: MemberTable,
+    lines: LineTable,
+    nodes: NodeTable,
+    topology: Topology | None = None,
 ) -> dict[str, float]:
     """
     Returns a mapping from each line Type to the total weight of its members.
     """
-    cs_dict: CrossSectionsDict = load_sections_db()
-    weights_by_type: DefaultDict[str, float] = defaultdict(float)
-
-    for member in members.values():
-        line = lines[member["line_id"]]
-        nI = nodes[line["Ni"]]
-        nJ = nodes[line["Nj"]]
-
-        # Compute actual member length
-        dx = nI["x"] - nJ["x"]
-        dy = nI["y"] - nJ["y"]
-        dz = nI["z"] - nJ["z"]
-        length = sqrt(dx*dx + dy*dy + dz*dz)
-
-        cs_info = cs_dict[member["cross_section_id"]]
-        area = cs_info["A"]  # in mm²
-
-        weight = area * length * (7.85e-6) # kg
-        weights_by_type[line["Type"]] += weight
+    topology = topology or Topology(nodes, lines)
+    cross_section_ids = members.cross_section_ids[members.rows(lines.ids)]
+    areas = get_catalogue().column("A", cross_section_ids)  # in mm²
 
-    return dict(weights_by_type)
\ No newline at end of file
+    weights = topology.by_type(areas * topology.lengths * Steel.density) # kg
+    return {line_type: float(weights[LINE_TYPES.index(line_type)]) for line_type in topology.present_types()}
@@ -1,4 +1,4 @@
-from app.types import LinesDict, NodesDict
+from app.geometry.tables import LineList, LineTable, NodeList, NodeTable
 from app.geometry.truss import Truss, Columns
 from app.geometry.utils import clean_model
 from typing import Annotated
@@ -12,8 +12,8 @@ class Platform:
         nJoist: Annotated[int, "Joist number"],
         nDivision: Annotated[int, "Sub divisions per joist"] = 6,
     ) -> None:
-        self.nodes: NodesDict = {}
-        self.lines: LinesDict = {}
+        self.nodes: NodeList = NodeList()
+        self.lines: LineList = LineList()
         self.nodetag: int = 0
         self.linetag: int = 0
 
@@ -37,10 +37,10 @@ class Platform:
     def get_current_line_tag(self) -> int:
         return self.linetag
 
-    def set_nodes(self, nodes: NodesDict) -> None:
+    def set_nodes(self, nodes: NodeList) -> None:
         self.nodes = nodes
 
-    def set_lines(self, lines: LinesDict) -> None:
+    def set_lines(self, lines: LineList) -> None:
         self.lines = lines
 
     def set_node_tag(self, new_tag: int) -> None:
@@ -52,38 +52,37 @@ class Platform:
     @staticmethod
     def create_frame_data(
         xlength: float, ylength: float, height: float
-    ) -> tuple[NodesDict, LinesDict]:
-        nodes: NodesDict = {
-            1: {"id": 1, "x": 0, "y": 0, "z": 0},
-            2: {"id": 2, "x": 0, "y": ylength, "z": 0},
-            3: {"id": 3, "x": 0, "y": 0, "z": height},
-            4: {"id": 4, "x": 0, "y": ylength, "z": height},
-            5: {"id": 5, "x": xlength, "y": 0, "z": 0},
-            6: {"id": 6, "x": xlength, "y": ylength, "z": 0},
-            7: {"id": 7, "x": xlength, "y": 0, "z": height},
-            8: {"id": 8, "x": xlength, "y": ylength, "z": height},
-        }
-        lines: LinesDict = {
-            1: {"id": 1, "Ni": 1, "Nj": 3, "Type": "Column"},
-            2: {"id": 2, "Ni": 2, "Nj": 4, "Type": "Column"},
-            3: {"id": 3, "Ni": 3, "Nj": 4, "Type": "Beam"},
-            4: {"id": 4, "Ni": 6, "Nj": 8, "Type": "Column"},
-            5: {"id": 5, "Ni": 5, "Nj": 7, "Type": "Column"},
-            6: {"id": 6, "Ni": 3, "Nj": 7, "Type": "Beam"},
-            7: {"id": 7, "Ni": 4, "Nj": 8, "Type": "Beam"},
-            8: {"id": 8, "Ni": 7, "Nj": 8, "Type": "Beam"},
-        }
+    ) -> tuple[NodeList, LineList]:
+        nodes = NodeList()
+        nodes.add_node(1, 0, 0, 0)
+        nodes.add_node(2, 0, ylength, 0)
+        nodes.add_node(3, 0, 0, height)
+        nodes.add_node(4, 0, ylength, height)
+        nodes.add_node(5, xlength, 0, 0)
+        nodes.add_node(6, xlength, ylength, 0)
+        nodes.add_node(7, xlength, 0, height)
+        nodes.add_node(8, xlength, ylength, height)
+
+        lines = LineList()
+        lines.add_line(1, 1, 3, "Column")
+        lines.add_line(2, 2, 4, "Column")
+        lines.add_line(3, 3, 4, "Beam")
+        lines.add_line(4, 6, 8, "Column")
+        lines.add_line(5, 5, 7, "Column")
+        lines.add_line(6, 3, 7, "Beam")
+        lines.add_line(7, 4, 8, "Beam")
+        lines.add_line(8, 7, 8, "Beam")
         return nodes, lines
 
     def create_nodes_for_joist(self, id: int, eleType: Annotated[str, "Beam or Joist"]) -> list[int]:
-        line = self.lines[id]
-        node_i = self.nodes[line["Ni"]]
-        node_j = self.nodes[line["Nj"]]
-        self.lines.pop(id, None)
+        node_i, node_j, _ = self.lines.get(id)
+        xi, yi, zi = self.nodes.coords(node_i)
+        xj, yj, zj = self.nodes.coords(node_j)
+        self.lines.pop(id)
 
-        vx = node_j["x"] - node_i["x"]
-        vy = node_j["y"] - node_i["y"]
-        vz = node_j["z"] - node_i["z"]
+        vx = xj - xi
+        vy = yj - yi
+        vz = zj - zi
 
         length = (vx**2 + vy**2 + vz**2) ** 0.5
         step_len = length / (self.nJoist + 1)
@@ -92,48 +91,37 @@ class Platform:
         step = (ux * step_len, uy * step_len, uz * step_len)
 
         new_nodes: list[int] = []
-        current_node_id = node_i["id"]
+        current_node_id = node_i
 
         for i in range(1, self.nJoist + 1):
             new_node_tag = self.get_new_node_tag()
             new_nodes.append(new_node_tag)
-            self.nodes[new_node_tag] = {
-                "id": new_node_tag,
-                "x": node_i["x"] + step[0] * i,
-                "y": node_i["y"] + step[1] * i,
-                "z": node_i["z"] + step[2] * i,
-            }
+            self.nodes.add_node(
+                new_node_tag,
+                xi + step[0] * i,
+                yi + step[1] * i,
+                zi + step[2] * i,
+            )
 
             new_line_tag = self.get_new_line_tag()
-            self.lines[new_line_tag] = {
-                "id": new_line_tag,
-                "Ni": current_node_id,
-                "Nj": new_node_tag,
-                "Type": eleType
-            }
+            self.lines.add_line(new_line_tag, current_node_id, new_node_tag, eleType)
             current_node_id = new_node_tag
 
         end_line_tag = self.get_new_line_tag()
-        self.lines[end_line_tag] = {
-            "id": end_line_tag,
-            "Ni": current_node_id,
-            "Nj": node_j["id"],
-            "Type": eleType
-
-        }
+        self.lines.add_line(end_line_tag, current_node_id, node_j, eleType)
         return new_nodes
 
     def create_model(
         self,
-    ) -> tuple[NodesDict, LinesDict]:
+    ) -> tuple[NodeTable, LineTable]:
         nodes, lines = self.create_frame_data(
             xlength=self.xLenght, ylength=self.yLenght, height=self.height
         )
         self.set_nodes(nodes)
         self.set_lines(lines)
 
-        self.set_node_tag(max(nodes.keys()))
-        self.set_line_tag(max(lines.keys()))
+        self.set_node_tag(nodes.max_id())
+        self.set_line_tag(lines.max_id())
 
         # Subdivide top beams (lines 3 and 8) and create joists between them
         top_left_nodes = self.create_nodes_for_joist(3, "Beam")
@@ -142,19 +130,14 @@ class Platform:
         original_njoist = self.nJoist
         for left_tag, right_tag in zip(top_left_nodes, top_right_nodes):
             new_line_id = self.get_new_line_tag()
-            self.lines[new_line_id] = {
-                "id": new_line_id,
-                "Ni": left_tag,
-                "Nj": right_tag,
-                "Type": "Joist"
-            }
+            self.lines.add_line(new_line_id, left_tag, right_tag, "Joist")
 
             # Further subdivide this joist
             self.nJoist = self.nDivision
             self.create_nodes_for_joist(new_line_id, "Joist")
             self.nJoist = original_njoist
 
-        return self.nodes, self.lines
+        return self.nodes.serialize(), self.lines.serialize()
 
 
 class PlatformMixed(Platform):
@@ -167,6 +150,7 @@ class PlatformMixed(Platform):
         TrussDir: Annotated[str, "Axis in wich the truss will be created  `y` or `x`"],
         TrussDepth: Annotated[float, "Truss Depth"] ,
         nDivision: Annotated[int, "Sub divisions per joist"] = 6,
+        nPartition: Annotated[int, "Sub divisions per column"] = 4,
     ) -> None:
         super().__init__(
             xLenght=xLenght,
@@ -177,10 +161,11 @@ class PlatformMixed(Platform):
         )
         self.TrussDir = TrussDir
         self.TrussDepth = TrussDepth
+        self.nPartition = nPartition
 
     def create_model(
         self,
-    ) -> tuple[NodesDict, LinesDict]:
+    ) -> tuple[NodeTable, LineTable]:
         nodes, lines = self.create_frame_data(
             xlength=self.xLenght, ylength=self.yLenght, height=self.height
         )
@@ -188,8 +173,8 @@ class PlatformMixed(Platform):
         self.set_nodes(nodes)
         self.set_lines(lines)
 
-        self.set_node_tag(max(nodes.keys()))
-        self.set_line_tag(max(lines.keys()))
+        self.set_node_tag(nodes.max_id())
+        self.set_line_tag(lines.max_id())
 
         # Subdivide top beams (lines 3 and 8) and create joists between them
         # We replace current beams for trusses!
@@ -211,8 +196,8 @@ class PlatformMixed(Platform):
         nodes, lines = leftTruss.create()
         self.nodes.update(nodes)
         self.lines.update(lines)
-        self.set_node_tag(max(nodes.keys()))
-        self.set_line_tag(max(lines.keys()))
+        self.set_node_tag(nodes.max_id())
+        self.set_line_tag(lines.max_id())
 
         rightTruss = Truss(
             height=self.TrussDepth,
@@ -229,18 +214,13 @@ class PlatformMixed(Platform):
         nodes, lines = rightTruss.create()
         self.nodes.update(nodes)
         self.lines.update(lines)
-        self.set_node_tag(max(nodes.keys()))
-        self.set_line_tag(max(lines.keys()))
+        self.set_node_tag(nodes.max_id())
+        self.set_line_tag(lines.max_id())
 
         original_njoist = self.nJoist
         for left_tag, right_tag in zip(leftTruss.joist_nodes, rightTruss.joist_nodes):
             new_line_id = self.get_new_line_tag()
-            self.lines[new_line_id] = {
-                "id": new_line_id,
-                "Ni": left_tag,
-                "Nj": right_tag,
-                "Type": "Joist"
-            }
+            self.lines.add_line(new_line_id, left_tag, right_tag, "Joist")
 
             # Further subdivide this joist
             self.nJoist = self.nDivision
@@ -254,8 +234,8 @@ class PlatformMixed(Platform):
             (self.xLenght, self.yLenght),
         ]
         for base_cord in base_cords:
-            current_nodes_id = max(list(self.nodes.keys()))
-            current_lines_id = max(list(self.lines.keys()))
+            current_nodes_id = self.nodes.max_id()
+            current_lines_id = self.lines.max_id()
             new_colums = Columns(
                 height=self.height - 0.5,
                 xo=base_cord[0],
@@ -263,7 +243,7 @@ class PlatformMixed(Platform):
                 zo=0,
                 nodes_id=current_nodes_id,
                 lines_id=current_lines_id,
-                partition=4,
+                partition=self.nPartition,
             )
 
             column_nodes, column_lines = new_colums.create()
@@ -271,9 +251,7 @@ class PlatformMixed(Platform):
             self.nodes.update(column_nodes)
             self.lines.update(column_lines)
         
-        self.nodes, self.lines = clean_model(self.nodes, self.lines)
-
-        return self.nodes, self.lines
+        return clean_model(self.nodes.serialize(), self.lines.serialize())
 
 
 if __name__ == "__main__":
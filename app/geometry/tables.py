@@ -0,0 +1,369 @@
+"""
+Compact, array-backed containers for nodes, lines and members.
+
+Every table keeps its columns in contiguous NumPy arrays and behaves like a
+read-only ``dict[int, ...]`` keyed by id. Item access hands out small views
+with ``__slots__``, so code written against the old ``NodesDict`` style
+(``nodes[nid]["x"]``, ``line.get("Type")``) keeps working while hot paths can
+use the arrays directly.
+"""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator, Mapping
+from typing import Any, get_args
+
+import numpy as np
+
+from app.types import LinesDict, MaterialName, MembersDict, MemberType, NodesDict, Vec3
+
+LINE_TYPES: tuple[str, ...] = get_args(MemberType)
+MATERIAL_NAMES: tuple[str, ...] = get_args(MaterialName)
+
+
+def line_type_code(line_type: str) -> int:
+    try:
+        return LINE_TYPES.index(line_type)
+    except ValueError:
+        raise ValueError(f"Unknown line Type: {line_type!r}") from None
+
+
+def _row_lookup(ids: np.ndarray) -> np.ndarray:
+    """Dense id -> row array, -1 where an id is not part of the table. Ids must be unique."""
+    size = int(ids.max()) + 1 if ids.size else 0
+    lookup = np.full(size, -1, dtype=np.int32)
+    rows = np.arange(ids.size, dtype=np.int32)
+    lookup[ids] = rows
+    # A repeated id keeps the row of its last occurrence, the earlier rows are not found
+    repeated = lookup[ids] != rows
+    if repeated.any():
+        raise ValueError(f"Duplicate ids: {np.unique(ids[repeated]).tolist()}")
+    return lookup
+
+
+# --------------------------------------------------------------------------- #
+# Views
+# --------------------------------------------------------------------------- #
+class _View:
+    __slots__ = ("_table", "_row")
+    _fields: tuple[str, ...] = ()
+
+    def __init__(self, table: Any, row: int) -> None:
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self._fields else default
+
+    def keys(self) -> tuple[str, ...]:
+        return self._fields
+
+    def to_dict(self) -> dict[str, Any]:
+        return {key: getattr(self, key) for key in self._fields}
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, _View):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()})"
+
+
+class NodeView(_View):
+    __slots__ = ()
+    _fields = ("id", "x", "y", "z")
+
+    @property
+    def id(self) -> int:
+        return int(self._table.ids[self._row])
+
+    @property
+    def x(self) -> float:
+        return float(self._table.xyz[self._row, 0])
+
+    @property
+    def y(self) -> float:
+        return float(self._table.xyz[self._row, 1])
+
+    @property
+    def z(self) -> float:
+        return float(self._table.xyz[self._row, 2])
+
+
+class LineView(_View):
+    __slots__ = ()
+    _fields = ("id", "Ni", "Nj", "Type")
+
+    @property
+    def id(self) -> int:
+        return int(self._table.ids[self._row])
+
+    @property
+    def Ni(self) -> int:
+        return int(self._table.ni[self._row])
+
+    @property
+    def Nj(self) -> int:
+        return int(self._table.nj[self._row])
+
+    @property
+    def Type(self) -> str:
+        return LINE_TYPES[self._table.type_codes[self._row]]
+
+
+class MemberView(_View):
+    __slots__ = ()
+    _fields = ("line_id", "cross_section_id", "material_name")
+
+    @property
+    def line_id(self) -> int:
+        return int(self._table.ids[self._row])
+
+    @property
+    def cross_section_id(self) -> int:
+        return int(self._table.cross_section_ids[self._row])
+
+    @property
+    def material_name(self) -> str:
+        return MATERIAL_NAMES[self._table.material_codes[self._row]]
+
+
+# --------------------------------------------------------------------------- #
+# Tables
+# --------------------------------------------------------------------------- #
+class _Table(Mapping):
+    __slots__ = ("ids", "_rows")
+    _view: type[_View] = _View
+
+    def __init__(self, ids: np.ndarray) -> None:
+        self.ids = np.ascontiguousarray(ids, dtype=np.int32)
+        self._rows = _row_lookup(self.ids)
+
+    def row(self, key: int) -> int:
+        if isinstance(key, (int, np.integer)) and 0 <= key < self._rows.size:
+            row = int(self._rows[key])
+            if row >= 0:
+                return row
+        raise KeyError(key)
+
+    def rows(self, keys: np.ndarray) -> np.ndarray:
+        """Vectorized ``row`` for an array of ids (ids must exist)."""
+        return self._rows[keys]
+
+    def __getitem__(self, key: int) -> Any:
+        return self._view(self, self.row(key))
+
+    def __contains__(self, key: object) -> bool:
+        try:
+            self.row(key)  # type: ignore[arg-type]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.ids.tolist())
+
+    def __len__(self) -> int:
+        return int(self.ids.size)
+
+    def max_id(self) -> int:
+        return int(self.ids.max())
+
+    def _columns(self) -> tuple[np.ndarray, ...]:
+        return (self.ids, self._rows)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self._columns())
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__}(n={len(self)}, nbytes={self.nbytes})>"
+
+
+class NodeTable(_Table):
+    __slots__ = ("xyz",)
+    _view = NodeView
+
+    def __init__(self, ids: np.ndarray, xyz: np.ndarray) -> None:
+        super().__init__(ids)
+        self.xyz = np.ascontiguousarray(xyz, dtype=np.float64).reshape(-1, 3)
+
+    def coords(self, node_ids: np.ndarray) -> np.ndarray:
+        """(n, 3) coordinates of the given node ids."""
+        return self.xyz[self.rows(node_ids)]
+
+    def _columns(self) -> tuple[np.ndarray, ...]:
+        return (*super()._columns(), self.xyz)
+
+    def to_dict(self) -> NodesDict:
+        return {
+            node_id: {"id": node_id, "x": x, "y": y, "z": z}
+            for node_id, (x, y, z) in zip(self.ids.tolist(), self.xyz.tolist())
+        }
+
+    @classmethod
+    def from_dict(cls, nodes: NodesDict) -> NodeTable:
+        ids = np.fromiter((n["id"] for n in nodes.values()), dtype=np.int32, count=len(nodes))
+        xyz = np.array([(n["x"], n["y"], n["z"]) for n in nodes.values()], dtype=np.float64)
+        return cls(ids, xyz)
+
+
+class LineTable(_Table):
+    __slots__ = ("ni", "nj", "type_codes")
+    _view = LineView
+
+    def __init__(self, ids: np.ndarray, ni: np.ndarray, nj: np.ndarray, type_codes: np.ndarray) -> None:
+        super().__init__(ids)
+        self.ni = np.ascontiguousarray(ni, dtype=np.int32)
+        self.nj = np.ascontiguousarray(nj, dtype=np.int32)
+        self.type_codes = np.ascontiguousarray(type_codes, dtype=np.uint8)
+
+    def of_type(self, line_type: str) -> np.ndarray:
+        """Boolean mask of the lines with the given ``Type``."""
+        return self.type_codes == line_type_code(line_type)
+
+    def nodes_of_type(self, line_type: str) -> np.ndarray:
+        """Sorted unique node ids touched by lines of the given ``Type``."""
+        mask = self.of_type(line_type)
+        return np.unique(np.concatenate([self.ni[mask], self.nj[mask]]))
+
+    def _columns(self) -> tuple[np.ndarray, ...]:
+        return (*super()._columns(), self.ni, self.nj, self.type_codes)
+
+    def to_dict(self) -> LinesDict:
+        return {
+            line_id: {"id": line_id, "Ni": ni, "Nj": nj, "Type": LINE_TYPES[code]}  # type: ignore[typeddict-item]
+            for line_id, ni, nj, code in zip(
+                self.ids.tolist(), self.ni.tolist(), self.nj.tolist(), self.type_codes.tolist()
+            )
+        }
+
+    @classmethod
+    def from_dict(cls, lines: LinesDict) -> LineTable:
+        builder = LineList()
+        for line in lines.values():
+            builder.add_line(line["id"], line["Ni"], line["Nj"], line["Type"])
+        return builder.serialize()
+
+
+class MemberTable(_Table):
+    """Members keyed by ``line_id``."""
+
+    __slots__ = ("cross_section_ids", "material_codes")
+    _view = MemberView
+
+    def __init__(self, line_ids: np.ndarray, cross_section_ids: np.ndarray, material_codes: np.ndarray) -> None:
+        super().__init__(line_ids)
+        self.cross_section_ids = np.ascontiguousarray(cross_section_ids, dtype=np.int32)
+        self.material_codes = np.ascontiguousarray(material_codes, dtype=np.uint8)
+
+    def _columns(self) -> tuple[np.ndarray, ...]:
+        return (*super()._columns(), self.cross_section_ids, self.material_codes)
+
+    def to_dict(self) -> MembersDict:
+        return {
+            line_id: {"line_id": line_id, "cross_section_id": cs_id, "material_name": MATERIAL_NAMES[code]}  # type: ignore[typeddict-item]
+            for line_id, cs_id, code in zip(
+                self.ids.tolist(), self.cross_section_ids.tolist(), self.material_codes.tolist()
+            )
+        }
+
+    @classmethod
+    def from_dict(cls, members: MembersDict) -> MemberTable:
+        rows = list(members.values())
+        return cls(
+            np.array([m["line_id"] for m in rows], dtype=np.int32),
+            np.array([m["cross_section_id"] for m in rows], dtype=np.int32),
+            np.array([MATERIAL_NAMES.index(m["material_name"]) for m in rows], dtype=np.uint8),
+        )
+
+
+# --------------------------------------------------------------------------- #
+# Builders
+# --------------------------------------------------------------------------- #
+class NodeList:
+    """Columnar node builder, frozen into a ``NodeTable`` by ``serialize``."""
+
+    def __init__(self) -> None:
+        self._ids: array[int] = array("q")
+        self._xyz: array[float] = array("d")
+        self._rows: dict[int, int] = {}
+
+    def add_node(self, node_id: int, x: float, y: float, z: float) -> None:
+        if node_id in self._rows:
+            raise ValueError(f"Duplicate node id: {node_id}")
+        self._rows[node_id] = len(self._ids)
+        self._ids.append(node_id)
+        self._xyz.extend((x, y, z))
+
+    def update(self, nodes: NodeTable) -> None:
+        for node_id, (x, y, z) in zip(nodes.ids.tolist(), nodes.xyz.tolist()):
+            self.add_node(node_id, x, y, z)
+
+    def coords(self, node_id: int) -> Vec3:
+        row = 3 * self._rows[node_id]
+        return (self._xyz[row], self._xyz[row + 1], self._xyz[row + 2])
+
+    def max_id(self) -> int:
+        return max(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def serialize(self) -> NodeTable:
+        return NodeTable(np.frombuffer(self._ids, dtype=np.int64), np.frombuffer(self._xyz, dtype=np.float64))
+
+
+class LineList:
+    """Columnar line builder, frozen into a ``LineTable`` by ``serialize``."""
+
+    def __init__(self) -> None:
+        self._ids: array[int] = array("q")
+        self._ni: array[int] = array("q")
+        self._nj: array[int] = array("q")
+        self._types: array[int] = array("B")
+        self._rows: dict[int, int] = {}
+
+    def add_line(self, line_id: int, ni: int, nj: int, line_type: str) -> None:
+        self._rows[line_id] = len(self._ids)
+        self._ids.append(line_id)
+        self._ni.append(ni)
+        self._nj.append(nj)
+        self._types.append(line_type_code(line_type))
+
+    def update(self, lines: LineTable) -> None:
+        for line_id, ni, nj, code in zip(
+            lines.ids.tolist(), lines.ni.tolist(), lines.nj.tolist(), lines.type_codes.tolist()
+        ):
+            self.add_line(line_id, ni, nj, LINE_TYPES[code])
+
+    def get(self, line_id: int) -> tuple[int, int, str]:
+        row = self._rows[line_id]
+        return self._ni[row], self._nj[row], LINE_TYPES[self._types[row]]
+
+    def pop(self, line_id: int) -> None:
+        self._rows.pop(line_id, None)
+
+    def max_id(self) -> int:
+        return max(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def serialize(self) -> LineTable:
+        alive = np.fromiter(sorted(self._rows.values()), dtype=np.intp, count=len(self._rows))
+        return LineTable(
+            np.frombuffer(self._ids, dtype=np.int64)[alive],
+            np.frombuffer(self._ni, dtype=np.int64)[alive],
+            np.frombuffer(self._nj, dtype=np.int64)[alive],
+            np.frombuffer(self._types, dtype=np.uint8)[alive],
+        )
+
@@ -0,0 +1,41 @@
+"""
+Per-topology precomputation shared by the weight schedule, the self-weight
+loads and the optimizer.
+
+A ``Topology`` only depends on the geometry (nodes and lines), so it can be
+built once and reused for every section assignment: weights and nodal loads
+then reduce to a product with the member lengths and a ``bincount``.
+"""
+import numpy as np
+
+from app.geometry.tables import LINE_TYPES, LineTable, NodeTable
+
+
+class Topology:
+    __slots__ = ("line_ids", "node_ids", "rows_i", "rows_j", "type_codes", "lengths", "length_by_type")
+
+    def __init__(self, nodes: NodeTable, lines: LineTable) -> None:
+        self.line_ids = lines.ids
+        self.node_ids = nodes.ids
+        self.rows_i = nodes.rows(lines.ni)
+        self.rows_j = nodes.rows(lines.nj)
+        self.type_codes = lines.type_codes
+
+        delta = nodes.xyz[self.rows_j] - nodes.xyz[self.rows_i]
+        self.lengths: np.ndarray = np.sqrt(np.einsum("ij,ij->i", delta, delta))
+        self.length_by_type: np.ndarray = self.by_type(self.lengths)
+
+    def by_type(self, line_values: np.ndarray) -> np.ndarray:
+        """Sum a per-line quantity per line type code (index = position in ``LINE_TYPES``)."""
+        return np.bincount(self.type_codes, weights=line_values, minlength=len(LINE_TYPES))
+
+    def to_nodes(self, line_values: np.ndarray) -> np.ndarray:
+        """Lump a per-line quantity half on each end node, row aligned with the node table."""
+        half = line_values / 2.0
+        n_nodes = self.node_ids.size
+        return np.bincount(self.rows_i, weights=half, minlength=n_nodes) + np.bincount(self.rows_j, weights=half, minlength=n_nodes)
+
+    def present_types(self) -> list[str]:
+        """Line types in the model, in order of first appearance."""
+        codes, first_seen = np.unique(self.type_codes, return_index=True)
+        return [LINE_TYPES[code] for code in codes[np.argsort(first_seen)].tolist()]
@@ -1,42 +1,9 @@
 from typing import Literal
-from app.types import (
-    NodeInfo,
-    LineInfo,
-    NodesDict,
-    LinesDict,
-)
+from app.geometry.tables import LineList, LineTable, NodeList, NodeTable
 
 Plane = Literal["xz", "yz"]
 
 
-class NodeList:
-    def __init__(self) -> None:
-        self.node_list: list[NodeInfo] = []
-
-    def add_node(self, new_node: NodeInfo) -> None:
-        self.node_list.append(new_node)
-
-    def add_node_list(self, new_node_list: list[NodeInfo]) -> None:
-        self.node_list.extend(new_node_list)
-
-    def serialize(self) -> NodesDict:
-        return {node["id"]: node for node in self.node_list}
-
-
-class LineList:
-    def __init__(self) -> None:
-        self.line_list: list[LineInfo] = []
-
-    def add_line(self, new_line: LineInfo) -> None:
-        self.line_list.append(new_line)
-
-    def add_line_list(self, new_line_list: list[LineInfo]) -> None:
-        self.line_list.extend(new_line_list)
-
-    def serialize(self) -> LinesDict:
-        return {line["id"]: line for line in self.line_list}
-
-
 class Truss:
     def __init__(
         self,
@@ -79,39 +46,24 @@ class Truss:
 
     def create_chord_nodes(
         self, width: float, xo: float, yo: float, zo: float, plane: Plane
-    ) -> list[NodeInfo]:
+    ) -> list[int]:
         count = self.n_diagonals + 1
         delta = width / (count - 1)
-        chord: list[NodeInfo] = []
+        chord: list[int] = []
 
         for i in range(count):
             x = xo + (delta * i) if plane == "xz" else xo
             y = yo + (delta * i) if plane == "yz" else yo
             z = zo
-            chord.append(
-                {
-                    "id": self.gen_node_tag(),
-                    "x": x,
-                    "y": y,
-                    "z": z,
-                }
-            )
-
-        self.nodes.add_node_list(chord)
+            node_id = self.gen_node_tag()
+            self.nodes.add_node(node_id, x, y, z)
+            chord.append(node_id)
+
         return chord
 
-    def connect_chord_lines(self, chord_nodes: list[NodeInfo]) -> None:
-        lines: list[LineInfo] = []
+    def connect_chord_lines(self, chord_nodes: list[int]) -> None:
         for i in range(len(chord_nodes) - 1):
-            lines.append(
-                {
-                    "id": self.gen_line_tag(),
-                    "Ni": chord_nodes[i]["id"],
-                    "Nj": chord_nodes[i + 1]["id"],
-                    "Type": "Truss Chord"
-                }
-            )
-        self.lines.add_line_list(lines)
+            self.lines.add_line(self.gen_line_tag(), chord_nodes[i], chord_nodes[i + 1], "Truss Chord")
 
     def create_diagonals(self, top_ids: list[int], bot_ids: list[int]) -> None:
         for i in range(self.n_diagonals):
@@ -121,26 +73,12 @@ class Truss:
             else:
                 a = top_ids[i + 1]
                 b = bot_ids[i]
-            self.lines.add_line(
-                {
-                    "id": self.gen_line_tag(),
-                    "Ni": a,
-                    "Nj": b,
-                    "Type": "Truss Diagonal"
-                }
-            )
+            self.lines.add_line(self.gen_line_tag(), a, b, "Truss Diagonal")
 
         for t, b in zip(top_ids, bot_ids, strict=True):  # verticals
-            self.lines.add_line(
-                {
-                    "id": self.gen_line_tag(),
-                    "Ni": t,
-                    "Nj": b,
-                    "Type": "Truss Diagonal"
-                }
-            )
-
-    def create(self) -> tuple[NodesDict, LinesDict]:
+            self.lines.add_line(self.gen_line_tag(), t, b, "Truss Diagonal")
+
+    def create(self) -> tuple[NodeTable, LineTable]:
         # bottom chord
         bottom = self.create_chord_nodes(
             width=self.width,
@@ -161,11 +99,8 @@ class Truss:
         )
         self.connect_chord_lines(top)
 
-        self.joist_nodes = [n["id"] for n in top[1:-1]]
-        self.create_diagonals(
-            [n["id"] for n in top],
-            [n["id"] for n in bottom],
-        )
+        self.joist_nodes = top[1:-1]
+        self.create_diagonals(top, bottom)
 
         return self.nodes.serialize(), self.lines.serialize()
 
@@ -202,31 +137,16 @@ class Columns:
         self.lines_id += 1
         return self.lines_id
 
-    def create(self) -> tuple[NodesDict, LinesDict]:
+    def create(self) -> tuple[NodeTable, LineTable]:
         delta = self.height / self.partition
-        col_nodes: list[NodeInfo] = []
+        col_nodes: list[int] = []
 
         for i in range(self.partition + 1):
-            col_nodes.append(
-                {
-                    "id": self.gen_node_tag(),
-                    "x": self.xo,
-                    "y": self.yo,
-                    "z": self.zo + delta * i,
-                }
-            )
-        self.nodes.add_node_list(col_nodes)
-
-        col_lines: list[LineInfo] = []
+            node_id = self.gen_node_tag()
+            self.nodes.add_node(node_id, self.xo, self.yo, self.zo + delta * i)
+            col_nodes.append(node_id)
+
         for i in range(len(col_nodes) - 1):
-            col_lines.append(
-                {
-                    "id": self.gen_line_tag(),
-                    "Ni": col_nodes[i]["id"],
-                    "Nj": col_nodes[i + 1]["id"],
-                    "Type": "Column"
-                }
-            )
-        self.lines.add_line_list(col_lines)
+            self.lines.add_line(self.gen_line_tag(), col_nodes[i], col_nodes[i + 1], "Column")
 
         return self.nodes.serialize(), self.lines.serialize()
@@ -1,44 +1,38 @@
-import matplotlib.pyplot as plt
-from collections import defaultdict
-from app.types import NodesDict, LinesDict
+import numpy as np
+from app.geometry.tables import LineTable, NodeTable
 
-def clean_model(Nodes: dict, Lines: dict) -> tuple[dict, dict]:
+def clean_model(Nodes: NodeTable, Lines: LineTable) -> tuple[NodeTable, LineTable]:
     """Deletes duplicated nodes"""
-    # Create a mapping from coordinates to node IDs
-    coord_to_nodes = defaultdict(list)
-    for node_id, attrs in Nodes.items():
-        coord = (attrs["x"], attrs["y"], attrs["z"])
-        coord_to_nodes[coord].append(node_id)
-
-    # Identify duplicates: coordinates with more than one node ID
-    duplicates = {coord: ids for coord, ids in coord_to_nodes.items() if len(ids) > 1}
-
-    node_replacements = {}
-    for _, ids in duplicates.items():
-        kept_node = min(ids)  # Choose the node with the smallest ID to keep
-        for duplicate_node in ids:
-            if duplicate_node != kept_node:
-                node_replacements[duplicate_node] = kept_node
+    # Group nodes sharing the exact same coordinates
+    _, group = np.unique(Nodes.xyz, axis=0, return_inverse=True)
+    group = group.reshape(-1)
+
+    # Keep the node with the smallest ID of every group
+    kept_per_group = np.full(group.max() + 1 if group.size else 0, np.iinfo(np.int32).max, dtype=np.int32)
+    np.minimum.at(kept_per_group, group, Nodes.ids)
+    kept = kept_per_group[group]
+    if np.array_equal(kept, Nodes.ids):
+        return Nodes, Lines
 
     # Update Lines to replace deleted Nodes with Kept Nodes
-    for line in Lines.values():
-        if line["Ni"] in node_replacements:
-            line["Ni"] = node_replacements[line["Ni"]]
-        if line["Nj"] in node_replacements:
-            line["Nj"] = node_replacements[line["Nj"]]
+    replacement = np.arange(Nodes.max_id() + 1, dtype=np.int32)
+    replacement[Nodes.ids] = kept
+    cleaned_lines = LineTable(Lines.ids, replacement[Lines.ni], replacement[Lines.nj], Lines.type_codes)
 
     # Remove duplicate Nodes
-    for dup_node in node_replacements.keys():
-        del Nodes[dup_node]
-
-    return Nodes, Lines
+    keep = kept == Nodes.ids
+    cleaned_nodes = NodeTable(Nodes.ids[keep], Nodes.xyz[keep])
+    return cleaned_nodes, cleaned_lines
 
-def get_nodes_by_z(Nodes: dict, z: float) -> list[int]:
-    selected = [node_id for node_id, attrs in Nodes.items() if attrs["z"] == z]
+def get_nodes_by_z(Nodes: NodeTable, z: float) -> list[int]:
+    selected = Nodes.ids[Nodes.xyz[:, 2] == z].tolist()
     return selected
 
 
-def plot_model(nodes: NodesDict, lines: LinesDict) -> None:
+def plot_model(nodes: NodeTable, lines: LineTable) -> None:
+    # Debug helper only, matplotlib is not needed by the app
+    import matplotlib.pyplot as plt
+
     fig = plt.figure(figsize=(7, 5))
     ax = fig.add_subplot(111, projection="3d")
 
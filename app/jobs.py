@@ -0,0 +1,280 @@
+"""
+Background jobs for long tool runs (optimizations).
+
+The chat starts a job and replies at once; the job record is kept in the entity
+storage and the views poll it, storing the results when the job is done. A job
+calls ``fn(*args, progress=callback)``; the callback reports the candidates
+processed and is where a cancelled job stops.
+
+``ProcessJobRunner`` runs every job in its own worker process and exchanges
+progress, results and cancel requests through files in a job directory, so any
+process of the app on the same machine can poll or cancel it. The views of one
+refresh poll the job concurrently; the first to ``claim`` a finished job stores
+its results, the others leave them. ``InProcessJobRunner``
+runs jobs on an executor of the current process, as a stand-in for tests and
+offline runs.
+"""
+import os
+import time
+import uuid
+import pickle
+import logging
+import tempfile
+import threading
+import multiprocessing
+
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Literal, Protocol
+
+from app.storage import current_storage
+
+logger = logging.getLogger(__name__)
+
+JOB_KEY = "optimization_job"
+JOB_DIR = Path(tempfile.gettempdir()) / "opensees-agent-jobs"
+JOB_FILES_TTL = 24 * 3600  # Files of older jobs are removed when a job is submitted
+
+JobStatus = Literal["queued", "running", "done", "failed", "cancelled", "lost"]
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class JobCancelled(Exception):
+    pass
+
+
+@dataclass
+class JobState:
+    status: JobStatus = "queued"
+    done: int = 0
+    total: int = 0
+    error: str | None = None
+    result: Any = None
+
+
+@dataclass
+class JobRecord:
+    """Job of the entity, as stored. `tools` holds the name and arguments of every tool it runs."""
+    id: str
+    tools: list[dict[str, Any]]
+    status: JobStatus = "queued"
+    done: int = 0
+    total: int = 0
+    error: str | None = None
+    message: str | None = None  # Told to the user about the results, e.g. no design met the limit
+    started: float = field(default_factory=time.time)
+    finished: float | None = None
+
+    @classmethod
+    def new(cls, tools: list[dict[str, Any]]) -> "JobRecord":
+        return cls(id=uuid.uuid4().hex[:8], tools=tools)
+
+    @property
+    def active(self) -> bool:
+        return self.status in ACTIVE_STATUSES
+
+    def update(self, state: JobState) -> None:
+        self.status, self.done, self.total, self.error = state.status, state.done, state.total, state.error
+        if not self.active and self.finished is None:
+            self.finished = time.time()
+
+    def __str__(self) -> str:
+        elapsed = (self.finished or time.time()) - self.started
+        text = f"Job {self.id} {self.status} after {elapsed:.0f} s"
+        if self.total:
+            text += f", {self.done}/{self.total} candidates"
+        if self.error:
+            text += f": {self.error}"
+        if self.message:
+            text += f". {self.message}"
+        return text
+
+
+def store_job(record: JobRecord) -> None:
+    current_storage().set_json(JOB_KEY, asdict(record))
+
+
+def read_job() -> JobRecord | None:
+    stored = current_storage().get_json(JOB_KEY)
+    return JobRecord(**stored) if stored else None
+
+
+def discard_job() -> None:
+    """Cancels the job of the entity if it is running and deletes its record."""
+    record = read_job()
+    if record is not None and record.active:
+        get_job_runner().cancel(record.id)
+    current_storage().delete(JOB_KEY)
+
+
+class JobRunner(Protocol):
+    def submit(self, job_id: str, fn: Callable[..., Any], *args: Any) -> None: ...
+
+    def poll(self, job_id: str) -> JobState | None:
+        """State of the job, with its result once done. None for an unknown job."""
+        ...
+
+    def cancel(self, job_id: str) -> None: ...
+
+    def claim(self, job_id: str) -> bool:
+        """True for the first caller only, which stores the results of the finished job."""
+        ...
+
+
+class InProcessJobRunner:
+    """
+    Runs the jobs on `executor` (a new single thread by default) of this process. Pass
+    the executor of the other OpenSees runs, the model is global to the process.
+    """
+
+    def __init__(self, executor: Executor | None = None) -> None:
+        self.executor = executor or ThreadPoolExecutor(max_workers=1)
+        self._states: dict[str, JobState] = {}
+        self._futures: dict[str, Future] = {}
+        self._cancel: dict[str, threading.Event] = {}
+        self._claimed: set[str] = set()
+        self._claim_lock = threading.Lock()
+
+    def submit(self, job_id: str, fn: Callable[..., Any], *args: Any) -> None:
+        state = self._states[job_id] = JobState()
+        cancel = self._cancel[job_id] = threading.Event()
+
+        def progress(done: int, total: int) -> None:
+            if cancel.is_set():
+                raise JobCancelled(job_id)
+            state.done, state.total = done, total
+
+        def run() -> None:
+            state.status = "running"
+            try:
+                state.result = fn(*args, progress=progress)
+                state.status = "done"
+            except JobCancelled:
+                state.status = "cancelled"
+            except Exception as exc:
+                logger.exception("Job %s failed", job_id)
+                state.status, state.error = "failed", f"{type(exc).__name__}: {exc}"
+
+        self._futures[job_id] = self.executor.submit(run)
+
+    def poll(self, job_id: str) -> JobState | None:
+        return self._states.get(job_id)
+
+    def cancel(self, job_id: str) -> None:
+        if job_id not in self._states:
+            return
+        self._cancel[job_id].set()
+        if self._futures[job_id].cancel():
+            self._states[job_id].status = "cancelled"
+
+    def claim(self, job_id: str) -> bool:
+        with self._claim_lock:
+            if job_id in self._claimed:
+                return False
+            self._claimed.add(job_id)
+            return True
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _process_main(job_dir: Path, job_id: str, fn: Callable[..., Any], args: tuple) -> None:
+    """Entry point of the job process: writes the state file on every update."""
+    state = JobState(status="running")
+    state_file, cancel_file = job_dir / f"{job_id}.state", job_dir / f"{job_id}.cancel"
+
+    def progress(done: int, total: int) -> None:
+        if cancel_file.exists():
+            raise JobCancelled(job_id)
+        state.done, state.total = done, total
+        _write_atomic(state_file, pickle.dumps(state))
+
+    _write_atomic(state_file, pickle.dumps(state))
+    try:
+        state.result = fn(*args, progress=progress)
+        state.status = "done"
+    except JobCancelled:
+        state.status = "cancelled"
+    except Exception as exc:
+        state.status, state.error = "failed", f"{type(exc).__name__}: {exc}"
+    _write_atomic(state_file, pickle.dumps(state))
+
+
+class ProcessJobRunner:
+    """
+    Runs every job in a spawned process (OpenSees keeps one model per process). The
+    state, result and cancel request of a job are files in `job_dir`.
+    """
+
+    def __init__(self, job_dir: Path = JOB_DIR) -> None:
+        self.job_dir = job_dir
+        self._processes: dict[str, multiprocessing.Process] = {}
+
+    def submit(self, job_id: str, fn: Callable[..., Any], *args: Any) -> None:
+        self.job_dir.mkdir(parents=True, exist_ok=True)
+        self._remove_old_files()
+        _write_atomic(self.job_dir / f"{job_id}.state", pickle.dumps(JobState()))
+        process = multiprocessing.get_context("spawn").Process(
+            target=_process_main, args=(self.job_dir, job_id, fn, args), daemon=True
+        )
+        process.start()
+        self._processes[job_id] = process
+
+    def poll(self, job_id: str) -> JobState | None:
+        try:
+            state: JobState = pickle.loads((self.job_dir / f"{job_id}.state").read_bytes())
+        except FileNotFoundError:
+            return None
+        process = self._processes.get(job_id)
+        if state.status in ACTIVE_STATUSES and process is not None and not process.is_alive():
+            # Terminated, or crashed before writing its final state
+            cancelled = (self.job_dir / f"{job_id}.cancel").exists()
+            state.status = "cancelled" if cancelled else "failed"
+            state.error = None if cancelled else f"Job process exited with code {process.exitcode}"
+        return state
+
+    def _remove_old_files(self) -> None:
+        expired = time.time() - JOB_FILES_TTL
+        for path in self.job_dir.iterdir():
+            try:
+                if path.stat().st_mtime < expired:
+                    path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def cancel(self, job_id: str) -> None:
+        if not (self.job_dir / f"{job_id}.state").exists():
+            return
+        (self.job_dir / f"{job_id}.cancel").touch()
+        process = self._processes.get(job_id)
+        if process is not None and process.is_alive():
+            process.terminate()
+
+    def claim(self, job_id: str) -> bool:
+        # Creating the file is atomic, whichever process of the app polls the job
+        try:
+            os.close(os.open(self.job_dir / f"{job_id}.stored", os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            return False
+        return True
+
+
+_runner: JobRunner | None = None
+
+
+def get_job_runner() -> JobRunner:
+    """Runner of the process, a `ProcessJobRunner` unless replaced with `set_job_runner`."""
+    global _runner
+    if _runner is None:
+        _runner = ProcessJobRunner()
+    return _runner
+
+
+def set_job_runner(runner: JobRunner | None) -> None:
+    """Replaces the runner of the process, None restores the default."""
+    global _runner
+    _runner = runner
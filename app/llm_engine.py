@@ -1,25 +1,28 @@
+import os
+import time
 import logging
 import pprint
-import instructor
-import plotly.graph_objects as go
-
-from pydantic import BaseModel, Field
-from dotenv import load_dotenv
-from openai import OpenAI
-from openai.types.chat import ParsedChatCompletion
-from typing import Union
-from textwrap import dedent
-
-from app.tools.analysis_tools import run_optimization, calculate_model, store_design_results_as_table, last_optimization_result
-from app.tools.model_tools import generate_model_inputs, get_cross_section_library
-from app.schemas import PlatformInputs, SectionSeed, SectionSeedMixed, PlatformMixedInputs
-from app.db.members import load_sections_db
-from app.plots.model_defo import plot_deformed_mesh
-from app.plots.model_viz import plot_3d_model
+import multiprocessing
+
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from typing import TYPE_CHECKING, Any, Iterator, Union
+
+from app.jobs import JobRecord, get_job_runner, read_job, store_job
+from app.prompts import PromptBuilder, store_agent_state
+from app.providers import get_provider
+from app.storage import storage_session
+from app.tools.memo import ToolMemo, payload_key
+from app.schemas import PlatformInputs, SectionSeed, SectionSeedMixed, PlatformMixedInputs, DesignResult
+
+if TYPE_CHECKING:
+    from app.plots.design_space import DesignSpace
+    from app.plots.scene import Scene
+    from app.tools.analysis_tools import Progress
 
 logger = logging.getLogger(__name__)
-load_dotenv()
-client = instructor.from_openai(OpenAI())
+prompt_builder = PromptBuilder()
 
 class PlotPlatform(BaseModel):
     geometry: PlatformInputs = Field(..., description="Instance of PlatformInputs")
@@ -31,102 +34,422 @@ class PlotPlatformMixed(BaseModel):
 
 class OptimizationTool(BaseModel):
     deformation_limit: float = Field(..., description="Deformation limit to be used in the optimizatin process")
+    multi_fidelity: bool = Field(False, description="Screen the candidates on a coarse mesh first, only when the user asks for a faster optimization")
     geometry: Union[PlatformInputs, PlatformMixedInputs] =  Field(..., description="Define this based on the type of the structure to be runned or analyzed. Use this to run or analyze the model and show the result to the user, tell him the optimal model will be display along a table with the complete analzed models")
 
 class RunModelTool(BaseModel):
     previous_geometry: Union[PlatformInputs, PlatformMixedInputs] = Field(..., description="Using the same inputs used in PlotPlatform or  PlotPlatformMixed")
     sections: Union[SectionSeed, SectionSeedMixed]  = Field(..., description="Use SectionSeed for simple Platform and SectionSeedMixed with PlatformMixed")
 
+class CancelJobTool(BaseModel):
+    job_id: str | None = Field(None, description="Id of the optimization job to cancel, None cancels the running one. Use it only when the user asks to stop or cancel an optimization")
+
+Tool = Union[RunModelTool, PlotPlatform, PlotPlatformMixed, OptimizationTool, CancelJobTool]
+tool_adapter: TypeAdapter[Tool] = TypeAdapter(Tool)
+TOOLS_BY_NAME: dict[str, type[BaseModel]] = {tool.__name__: tool for tool in Tool.__args__}
+# Run as background jobs, the chat replies without waiting for them
+BACKGROUND_TOOLS = (OptimizationTool,)
+# Single worker: tool runs share the global OpenSees model, so they must never overlap
+tool_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tool")
+tool_memo: ToolMemo[Tool, "ToolOutput"] = ToolMemo(sizeof=lambda output: output.nbytes)
+ANALYSIS_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+_analysis_pool: ProcessPoolExecutor | None = None
+
 class Response(BaseModel):
+    # The tools are generated first so they can start while the response text is streamed
+    selected_tools: list[Union[RunModelTool, PlotPlatform, PlotPlatformMixed, OptimizationTool, CancelJobTool]] = Field(default_factory=list, description="Select any of these tools,  PlotPlatform, PlotPlatformMixed to create and displaye the modes, RunModel to analuze and show deformatinos, Optimization to optimize (it runs as a background job) and CancelJob to stop it. Select several in one answer to compare platforms, they run in parallel and are shown side by side. Otherwise leave it empty")
     response: str = Field(..., description="Be conversational firendly and Format the response always nicely")
-    selected_tool: Union[None , RunModelTool, PlotPlatform, PlotPlatformMixed, OptimizationTool] = Field(..., description="Select any of these tools,  PlotPlatform, PlotPlatformMixed to create and displaye the modes, RunModel to analuze and show deformatinos, and Optimization to optimize   otherwise return None")
+
+
+class ResponseStream:
+    """
+    Streams the `response` text of the structured answer as it is generated. With a
+    `runner`, the selected tools are offered for speculative execution on every chunk.
+    Once iterated, `final` holds the complete response and `ttft` the time to the first text (s).
+    """
+
+    def __init__(
+        self,
+        conversation_history: list[dict],
+        verbose: bool = True,
+        runner: "SpeculativeToolRunner | None" = None,
+    ) -> None:
+        self.conversation_history = conversation_history
+        self.verbose = verbose
+        self.runner = runner
+        self.final: Response | None = None
+        self.ttft: float | None = None
+        self.duration: float | None = None
+
+    def __iter__(self) -> Iterator[str]:
+        start = time.perf_counter()
+        # The prompt reads the optimization table and the agent state, once per request
+        with storage_session(name="chat prompt"):
+            messages = prompt_builder.build(self.conversation_history)
+        if self.verbose:
+            logger.debug("Request messages:\n%s", pprint.pformat(messages))
+
+        resp_chunks = get_provider().stream(messages, response_model=Response)
+
+        sent = ""
+        for resp in resp_chunks:
+            if self.verbose:
+                logger.debug("Received response chunk:\n%s", resp)
+            self.final = resp
+            if self.runner is not None:
+                # The response text follows the tools, once it started the tools are complete
+                self.runner.offer(resp.selected_tools, settled=resp.response is not None)
+            text = resp.response or ""
+            if len(text) > len(sent) and text.startswith(sent):
+                if self.ttft is None:
+                    self.ttft = time.perf_counter() - start
+                    logger.info("LLM time to first token: %.3f s", self.ttft)
+                yield text[len(sent):]
+                sent = text
+
+        self.duration = time.perf_counter() - start
+        logger.info("LLM response completed in %.3f s", self.duration)
 
 
 def llm_response(conversation_history: list[dict],
-                 verbose: bool = True) -> ParsedChatCompletion[Response]:
-    
-    messages = []
-    # Default system prompt is always first
-    system_message = {
-        "role": "system",
-        "content": dedent(
-            f"""
-            You are a helpful assistant with the following context, who formats responses clearly and helps users create and optimize structural models in OpenSees.
+                 verbose: bool = True) -> Response | None:
+    stream = ResponseStream(conversation_history, verbose=verbose)
+    for _ in stream:
+        pass
+    return stream.final
+
 
-            Respond by describing the functionality of the tools you have, without mentioning their names explicitly.
+@dataclass
+class ToolOutput:
+    """Result of a tool run, without side effects. `design_results` is stored by `execute_tool`."""
+    scene: "Scene | None" = None  # Compact result, the view builds the figure from it
+    design_results: list[DesignResult] | None = None
+    design: DesignResult | None = None  # Analysed design shown in the figure
+    design_space: "DesignSpace | None" = None  # Every design evaluated by an optimization, as columns
+    message: str | None = None  # Told to the user when the tool has no design to show
 
-            You can create two types of platforms. The first type uses only elements with open sections, such as I-shaped beams or PFC (C/U-shaped steel sections). You have a tool designed to generate this type of structure.
+    @property
+    def nbytes(self) -> int:
+        return (self.scene.nbytes if self.scene else 0) + (self.design_space.nbytes if self.design_space else 0)
 
-            The second type of platform uses truss bearers to support the joists. These truss elements — including diagonals, top, and bottom chords — are modeled using hollow sections.
 
-            Your mission is to interact with the user and assist in optimizing the platform configuration.
+def run_tool(tool: Tool) -> ToolOutput:
+    """Runs the selected tool. Pure, so it can be started speculatively and discarded, and
+    memoized: repeated arguments return the previous output."""
+    return tool_memo.get_or_run(tool, _run_tool)
 
-            In the first interaction, inform the user that you can help them optimize the platform. Then, naturally ask them to provide the platform specifications. By default, use the plotting tool to create and display the platform.
 
-            **Important**: Every time `selected_tool` is not `None`, the VIKTOR app will render the model with the specified inputs. You may say something like, “The structure will be rendered on the right-hand side of the application.”
+def _run_tool(tool: Tool, progress: "Progress | None" = None) -> ToolOutput:
+    from app.tools.analysis_tools import run_optimization, calculate_model, design_with_scene
+    from app.tools.model_tools import COARSE_FIDELITY, generate_model_inputs
+    from app.plots.design_space import DesignSpace
+    from app.plots.scene import Scene
+    from app.plots.thumbnails import THUMBNAIL_TOP_K
+
+    if isinstance(tool, PlotPlatform) or isinstance(tool, PlotPlatformMixed):
+        inputs = tool.geometry
+        sections = tool.sections
+        nodes, lines, members, _ = generate_model_inputs(inputs=inputs, sections=sections)
+        return ToolOutput(scene=Scene("model", nodes, lines, members))
+
+    if isinstance(tool, RunModelTool):
+        modeltype = tool.previous_geometry
+        sections = tool.sections
+        nodes, lines, members, max_disp_by_type, disp_dict, weight_dict = calculate_model(inputs=modeltype, sections=sections)
+        design = DesignResult(inputs=modeltype, sections=sections, max_disp_by_type=max_disp_by_type, weight_dict=weight_dict)
+        return ToolOutput(scene=Scene.deformed(nodes, lines, members, disp_dict), design=design)
 
-            All units are in millimeters.
-            Do not optimize the structure yourself use OptimizationTool
-            **
-            This are the available cross Sections{get_cross_section_library()}
-            **
-            This is the infromation about the latest optimize models {last_optimization_result()}
-            """
+    if isinstance(tool, OptimizationTool):
+        modeltype = tool.geometry
+        limit= tool.deformation_limit
+        coarse = COARSE_FIDELITY if tool.multi_fidelity else None
+        optimization = run_optimization(
+            seed=modeltype, deformation_limit=limit, coarse=coarse, progress=progress, keep_scenes=THUMBNAIL_TOP_K
         )
-    }
-    messages.append(system_message)
-    messages.extend(conversation_history)
-    if verbose:
-        logger.debug("Request messages:\n%s", pprint.pformat(messages))
-    
-    resp_chunks = client.chat.completions.create_partial(
-        model="gpt-4.1",
-        messages=messages,
-        response_model=Response,
-        temperature=0.3,
+        valid_designs = [design for design in sorted(optimization.designs) if abs(design.global_max_disp) < limit]
+        if not valid_designs:
+            return no_valid_design(optimization.designs, limit)
+        # Only the designs drawn (the optimum and the thumbnails) keep the deformed shape of
+        # their analysis, they are not run again
+        valid_designs[:THUMBNAIL_TOP_K] = [design_with_scene(design) for design in valid_designs[:THUMBNAIL_TOP_K]]
+        return ToolOutput(
+            scene=valid_designs[0].scene,
+            design_results=valid_designs,
+            design=valid_designs[0],
+            design_space=DesignSpace.from_designs(optimization.designs, limit),
+        )
+
+    return ToolOutput()
+
+
+def no_valid_design(designs: list[DesignResult], limit: float) -> ToolOutput:
+    """Output of an optimization where no design meets `limit`: an empty table and the least
+    deflecting design analysed, if any, shown and named in the message."""
+    from app.tools.analysis_tools import design_with_scene
+    from app.plots.design_space import DesignSpace
+
+    if not designs:
+        message = f"No design meets the deformation limit of {limit} mm: the analytical lower deflection bound of every candidate exceeds it."
+        return ToolOutput(design_results=[], message=message)
+    least = design_with_scene(min(designs, key=lambda design: abs(design.global_max_disp)))
+    sections = ", ".join(f"{group} {name}" for group, name in least.section_names.items())
+    message = (
+        f"No design meets the deformation limit of {limit} mm. The least deflecting design, shown in the view, "
+        f"deflects {abs(least.global_max_disp):.2f} mm and weighs {least.total_weight:,.0f} kg: "
+        f"{least.inputs.nJoist} joists, {sections}."
+    )
+    return ToolOutput(
+        scene=least.scene,
+        design_results=[],
+        design=least,
+        design_space=DesignSpace.from_designs(designs, limit),
+        message=message,
     )
 
-    resp_final = None
-    # Streaming
-    for resp in resp_chunks:
-        if verbose:
-            logger.debug("Received response chunk:\n%s", resp)
-        resp_final: Response = resp 
 
-    return resp_final
+def complete_tool(selected_tool: Any) -> Tool | None:
+    """The tool of a partial `selected_tool` once its arguments validate, otherwise None."""
+    if isinstance(selected_tool, Tool.__args__):
+        return selected_tool
+    if isinstance(selected_tool, BaseModel):
+        # A partial model of instructor, its unset fields are None
+        selected_tool = selected_tool.model_dump(exclude_none=True)
+    try:
+        return tool_adapter.validate_python(selected_tool)
+    except ValidationError:
+        return None
 
 
-def execute_tool(response: Response) -> tuple[str, go.Figure | None]:
-    """Exectue the tools based on the user query and file_content. Generates a text response
-    or a Plotly view."""
-    print(f"[Debug] {response}")
-    if isinstance(response.selected_tool, PlotPlatform) or isinstance(response.selected_tool, PlotPlatformMixed):
-        inputs = response.selected_tool.geometry
-        sections = response.selected_tool.sections
-        nodes, lines, members, _ = generate_model_inputs(inputs=inputs, sections=sections)
-        cs_dict = load_sections_db()
-        fig = plot_3d_model(nodes, lines, members, cs_dict)
-        return response.response, fig
+def analysis_pool() -> ProcessPoolExecutor:
+    """Worker processes for the extra tools of a turn, each with its own OpenSees model."""
+    global _analysis_pool
+    if _analysis_pool is None:
+        _analysis_pool = ProcessPoolExecutor(max_workers=ANALYSIS_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _analysis_pool
 
-    if isinstance(response.selected_tool, RunModelTool):
-        modeltype = response.selected_tool.previous_geometry
-        sections = response.selected_tool.sections
-        nodes, lines, members, max_disp_by_type, disp_dict, weight_dict = calculate_model(inputs=modeltype, sections=sections)
-        cs_dict = load_sections_db()
-        fig = plot_deformed_mesh(disp_dict=disp_dict, members=members, cross_sections= cs_dict, nodes=nodes, lines=lines)
-        return response.response, fig
-
-    if isinstance(response.selected_tool, OptimizationTool):
-        modeltype = response.selected_tool.geometry
-        limit= response.selected_tool.deformation_limit
-        design_results = run_optimization(seed=modeltype)
-        valid_designs = [design for design in sorted(design_results) if abs(design.global_max_disp) < limit]
-        store_design_results_as_table(valid_designs)
-        sections = valid_designs[0].sections
-        modeltype = valid_designs[0].inputs
-        nodes, lines, members, max_disp_by_type, disp_dict, weight_dict = calculate_model(inputs=modeltype, sections=sections)
-        cs_dict = load_sections_db()
-        fig = plot_deformed_mesh(disp_dict=disp_dict, members=members, cross_sections= cs_dict, nodes=nodes, lines=lines)
-        return response.response, fig
-            
-    return response.response, None
\ No newline at end of file
+
+def _run_and_memoize(tool: Tool) -> ToolOutput:
+    output = _run_tool(tool)
+    tool_memo.store(tool, output)
+    return output
+
+
+def submit_tool(tool: Tool, isolated: bool = False) -> Future[ToolOutput]:
+    """
+    Starts a tool run. Memoized arguments resolve at once; otherwise the tool runs in the
+    in-process worker, or with `isolated` in a worker process so it can run concurrently.
+    """
+    cached = tool_memo.lookup(tool)
+    if cached is not None:
+        future: Future[ToolOutput] = Future()
+        future.set_result(cached)
+        return future
+    if not isolated:
+        return tool_executor.submit(_run_and_memoize, tool)
+
+    future = analysis_pool().submit(_run_tool, tool)
+
+    def memoize(done: Future[ToolOutput]) -> None:
+        if not done.cancelled() and done.exception() is None:
+            tool_memo.store(tool, done.result())
+
+    future.add_done_callback(memoize)
+    return future
+
+
+class SpeculativeToolRunner:
+    """
+    Starts every selected tool as soon as its streamed arguments are final, while the
+    response text is still being generated. Partial arguments may validate before they
+    are complete (`14` streamed as `1`, a mixed platform before its `TrussDir`), so a
+    tool is only final once the stream has moved past it: the next tool or the response
+    text has started. The first tool runs in the in-process worker, the next ones
+    concurrently in worker processes.
+    """
+
+    def __init__(self) -> None:
+        self.futures: dict[str, Future[ToolOutput]] = {}
+
+    def offer(self, selected_tools: list[Any] | None, settled: bool = False) -> None:
+        """Starts the final tools of a chunk. With `settled`, the list of tools is complete."""
+        selected_tools = selected_tools or []
+        final = selected_tools if settled else selected_tools[:-1]
+        for index, selected_tool in enumerate(final):
+            tool = complete_tool(selected_tool)
+            if tool is None or isinstance(tool, (*BACKGROUND_TOOLS, CancelJobTool)):
+                continue
+            key = payload_key(tool)
+            if key not in self.futures:
+                self.futures[key] = submit_tool(tool, isolated=index > 0)
+
+    def results(self, tools: list[Tool]) -> list[ToolOutput]:
+        keys = [payload_key(tool) for tool in tools]
+        for key, future in self.futures.items():
+            if key not in keys:
+                future.cancel()
+                logger.info("Speculative tool run discarded, the arguments changed")
+
+        futures = []
+        for index, (key, tool) in enumerate(zip(keys, tools)):
+            if key in self.futures:
+                logger.info("Speculative %s run reused", type(tool).__name__)
+                futures.append(self.futures[key])
+            else:
+                futures.append(submit_tool(tool, isolated=index > 0))
+        return [future.result() for future in futures]
+
+
+def tool_label(index: int, tool: Tool) -> str:
+    geometry = tool.previous_geometry if isinstance(tool, RunModelTool) else tool.geometry
+    platform = "Mixed platform" if isinstance(geometry, PlatformMixedInputs) else "Platform"
+    action = {RunModelTool: "analysis", OptimizationTool: "optimization"}.get(type(tool), "model")
+    return f"{index + 1}. {platform} {action}"
+
+
+def execute_tool(response: Response, runner: SpeculativeToolRunner | None = None) -> tuple[str, bytes | None]:
+    """Exectue the tools based on the user query and file_content. Returns a notice of the
+    background jobs started or cancelled (empty if none) and the scenes of the Plotly view
+    (as a compact payload, the view renders it). The scenes of several tools are shown side
+    by side and their optimization results share one table."""
+    logger.debug("Executing %s", response)
+    notices = [job_notice(cancel_job(tool.job_id)) for tool in response.selected_tools if isinstance(tool, CancelJobTool)]
+    tools = [tool for tool in response.selected_tools if not isinstance(tool, CancelJobTool)]
+
+    background = [tool for tool in tools if isinstance(tool, BACKGROUND_TOOLS)]
+    if background:
+        notices.append(job_notice(start_job(background)))
+        store_agent_state(agent_state(background[-1], ToolOutput()))
+
+    foreground = [tool for tool in tools if not isinstance(tool, BACKGROUND_TOOLS)]
+    outputs = (runner or SpeculativeToolRunner()).results(foreground)
+    notices.extend(output.message for output in outputs if output.message)
+    return "\n\n".join(notices), store_outputs(foreground, outputs)
+
+
+def store_outputs(tools: list[Tool], outputs: list[ToolOutput]) -> bytes | None:
+    """Stores the optimization table and agent state of the tool outputs, returns their scenes."""
+    labels = [tool_label(index, tool) for index, tool in enumerate(tools)]
+    optimizations = [(label, output.design_results) for label, output in zip(labels, outputs) if output.design_results is not None]
+    if optimizations:
+        from app.tools.analysis_tools import store_design_results_as_table
+
+        if len(optimizations) == 1:
+            store_design_results_as_table(optimizations[0][1])
+        else:
+            store_design_results_as_table(
+                [design for _, designs in optimizations for design in designs],
+                cases=[label for label, designs in optimizations for _ in designs],
+            )
+
+        from app.plots.thumbnails import THUMBNAIL_TOP_K, store_thumbnail_designs, thumbnail_caption
+
+        best = [
+            (design, thumbnail_caption(rank, design, label if len(optimizations) > 1 else None))
+            for label, designs in optimizations
+            for rank, design in enumerate(designs[:THUMBNAIL_TOP_K], start=1)
+        ]
+        store_thumbnail_designs([design for design, _ in best], [caption for _, caption in best])
+
+    spaces = [(label, output.design_space) for label, output in zip(labels, outputs) if output.design_space is not None]
+    if spaces:
+        from app.plots.design_space import DesignSpace, store_design_space
+
+        space = spaces[0][1] if len(spaces) == 1 else DesignSpace.concat([space for _, space in spaces], [label for label, _ in spaces])
+        store_design_space(space)
+    if tools:
+        store_agent_state(agent_state(tools[-1], outputs[-1]))
+
+    scenes = [replace(output.scene, title=label) for label, output in zip(labels, outputs) if output.scene is not None]
+    if not scenes:
+        return None
+
+    from app.plots.scene import pack_scenes
+
+    return pack_scenes(scenes)
+
+
+def run_tools(tools: list[Tool], progress: "Progress | None" = None) -> list[ToolOutput]:
+    """Body of a background job: runs the tools one after the other."""
+    return [_run_tool(tool, progress=progress) for tool in tools]
+
+
+def start_job(tools: list[Tool]) -> JobRecord:
+    """Starts a background job running `tools`, replacing (and cancelling) the running one."""
+    previous = read_job()
+    if previous is not None and previous.active:
+        cancel_job(previous.id)
+    record = JobRecord.new([{"tool": type(tool).__name__, "arguments": tool.model_dump(mode="json")} for tool in tools])
+    get_job_runner().submit(record.id, run_tools, tools)
+    store_job(record)
+    logger.info("Started %s", record)
+    return record
+
+
+def cancel_job(job_id: str | None = None) -> JobRecord | None:
+    """Cancels the running job (if it is `job_id`), returns its record."""
+    record = read_job()
+    if record is None or not record.active or job_id not in (None, record.id):
+        return record
+    get_job_runner().cancel(record.id)
+    record.status, record.finished = "cancelled", time.time()
+    store_job(record)
+    return record
+
+
+def sync_job() -> tuple[JobRecord | None, bytes | None]:
+    """
+    Polls the job of the entity and stores its progress. When it has just finished,
+    its results are stored and the scenes of its Plotly view returned, by the one caller
+    that claims the finished job.
+    """
+    record = read_job()
+    if record is None or not record.active:
+        return record, None
+    state = get_job_runner().poll(record.id)
+    if state is None:
+        record.status, record.error, record.finished = "lost", "The job is not known on this machine", time.time()
+    elif (state.status, state.done, state.total) == (record.status, record.done, record.total):
+        return record, None
+    else:
+        record.update(state)
+    if record.status != "done":
+        store_job(record)
+        return record, None
+    if not get_job_runner().claim(record.id):
+        # Another view polling the job in the same refresh stores its results
+        return record, None
+    # Done before the outputs, so the views polling from now on skip the job
+    record.message = " ".join(output.message for output in state.result if output.message) or None
+    store_job(record)
+    tools = [TOOLS_BY_NAME[tool["tool"]].model_validate(tool["arguments"]) for tool in record.tools]
+    return record, store_outputs(tools, state.result)
+
+
+def job_notice(record: JobRecord | None) -> str:
+    if record is None:
+        return "There is no optimization job."
+    if record.status == "queued":
+        return f"Optimization job `{record.id}` started. The results table and view show its progress and the optimal model when it is done."
+    return f"{record}."
+
+
+def agent_state(tool: Tool, output: ToolOutput) -> dict:
+    """Inputs, sections and results of the last tool call, summarised when old turns are folded."""
+    state: dict[str, Any] = {"tool": type(tool).__name__}
+    if output.design is not None:
+        design = output.design
+        state["geometry"] = design.inputs.model_dump()
+        state["sections"] = design.sections.model_dump()
+        state["results"] = {
+            "max_displacement_mm": round(design.global_max_disp, 4),
+            "total_weight_kg": round(design.total_weight, 2),
+            "sections": design.section_names,
+        }
+    elif isinstance(tool, (PlotPlatform, PlotPlatformMixed)):
+        state["geometry"] = tool.geometry.model_dump()
+        state["sections"] = tool.sections.model_dump()
+    elif isinstance(tool, OptimizationTool):
+        state["geometry"] = tool.geometry.model_dump()
+    if output.message:
+        state["message"] = output.message
+    return state
@@ -1,44 +1,43 @@
+import numpy as np
 import openseespy.opensees as ops
+from app.geometry.tables import LINE_TYPES, MATERIAL_NAMES, LineTable, MemberTable, NodeTable
+from app.geometry.topology import Topology
 from app.types import (
     Vec3,
-    NodesDict,
-    LinesDict,
-    MembersDict,
     MaterialDictType,
-    MassDict,
     CrossSectionsDict,
     material_dict,
 )
 from app.opensees.utils import v_cross, v_sub, v_norm
 from app.geometry.utils import get_nodes_by_z
-from collections import defaultdict
-from typing import DefaultDict, Annotated
+from typing import Annotated
 
 
 class Model:
     def __init__(
         self,
-        nodes: NodesDict,
-        lines: LinesDict,
+        nodes: NodeTable,
+        lines: LineTable,
         cross_sections: CrossSectionsDict,
-        members: MembersDict,
+        members: MemberTable,
         nodesWithLoad: Annotated[list[int] | None, "Joist Nodes"] = None,
-        nodalLoadMagnitud: Annotated[float | None, "Load to be applied in Newton per Node"] = None
+        nodalLoadMagnitud: Annotated[float | None, "Load to be applied in Newton per Node"] = None,
+        topology: Topology | None = None,
     ) -> None:
         self.nodes = nodes
         self.lines = lines
         self.cross_sections = cross_sections
         self.members = members
+        self.topology = topology or Topology(nodes, lines)
         self.materials:MaterialDictType = material_dict
-        self.mass: MassDict = {}
         self.g = 10000 #9800
-        self.loadsDict: DefaultDict[int, float] = defaultdict(float)
+        self.nodal_loads: np.ndarray = np.zeros(len(nodes))
         self.nodesWithLoad = nodesWithLoad
         self.nodalLoadMagnitud = nodalLoadMagnitud
 
     def create_nodes(self) -> None:
-        for n in self.nodes.values():
-            ops.node(n["id"], n["x"], n["y"], n["z"])
+        for node_id, (x, y, z) in zip(self.nodes.ids.tolist(), self.nodes.xyz.tolist()):
+            ops.node(node_id, x, y, z)
 
     def _define_elastic_section(
         self,
@@ -82,30 +81,35 @@ class Model:
         verbose: bool = False,
     ) -> None:
         """
-        Create geometric transformations, sections, forceBeamColumn
-        elements, and update the lumped nodal mass dictionary.
+        Create geometric transformations, sections and forceBeamColumn
+        elements.
         """
 
+        # Member end nodes and coordinates, row aligned with self.members
+        line_rows = self.lines.rows(self.members.ids)
+        node_i_ids = self.lines.ni[line_rows]
+        node_j_ids = self.lines.nj[line_rows]
+        coords_i = self.nodes.coords(node_i_ids).tolist()
+        coords_j = self.nodes.coords(node_j_ids).tolist()
+
         section_set: set[int] = set()
-        for member in self.members.values():
-            line_id = member["line_id"]
-            section_id = member["cross_section_id"]
-            material_name = member["material_name"]
-            
-            # Geometry
-            line = self.lines[line_id]
-            node_i = self.nodes[line["Ni"]]
-            node_j = self.nodes[line["Nj"]]
-
-
-            xi: Vec3 = (node_i["x"], node_i["y"], node_i["z"])
-            xj: Vec3 = (node_j["x"], node_j["y"], node_j["z"])
+        for line_id, section_id, material_code, node_i, node_j, xi, xj in zip(
+            self.members.ids.tolist(),
+            self.members.cross_section_ids.tolist(),
+            self.members.material_codes.tolist(),
+            node_i_ids.tolist(),
+            node_j_ids.tolist(),
+            coords_i,
+            coords_j,
+        ):
+            material_name = MATERIAL_NAMES[material_code]
+
             x_axis: Vec3 = v_sub(xi, xj)
             vec_xz: Vec3 = v_cross(x_axis, z_global)
 
             # Material
             material = self.materials[material_name]
-            E,G,gamma = material.E, material.G, material.gamma
+            E,G = material.E, material.G
                 # Elastic member -> rotation = 0
             if section_id not in section_set:
                 self._define_elastic_section(section_id, 0, E, G, N)
@@ -120,7 +124,7 @@ class Model:
             else:
                 # non-zero cross-product, apply vec_xz
                 # the nested check for purely horizontal Z stays the same
-                if node_i["z"] - node_j["z"] == 0.0:
+                if xi[2] - xj[2] == 0.0:
 
                     ops.geomTransf("Linear", line_id, *vec_xz)
                 else:
@@ -131,42 +135,36 @@ class Model:
             ops.element(
                 "forceBeamColumn",
                 line_id,
-                node_i["id"],
-                node_j["id"],
+                node_i,
+                node_j,
                 line_id, # geom tranformation
                 section_id,
             )
 
-            # Lumped mass
-            L = v_norm(x_axis)
-            area = self.cross_sections[section_id]["A"]
-            m_node = area * L * gamma / (2.0 * self.g)
-            for tag in (node_i["id"], node_j["id"]):
-                nm = self.mass.setdefault(
-                    tag, {"mass_x": 0.0, "mass_y": 0.0, "mass_z": 0.0}
-                )
-                nm["mass_x"] += m_node
-                nm["mass_y"] += m_node
-                nm["mass_z"] += m_node
-
             if verbose:
                 print(
                     f"Line {line_id}: section {section_id}, "
-                    f"nodes {node_i['id']}–{node_j['id']}",
+                    f"nodes {node_i}–{node_j}",
                     f"Cross Section name: {self.cross_sections[section_id]["name"]}"
                 )
     
+    def self_weight(self) -> np.ndarray:
+        """Self weight in N lumped on the nodes, row aligned with `self.nodes`."""
+        line_rows = self.members.rows(self.topology.line_ids)
+        cs_ids, cs_index = np.unique(self.members.cross_section_ids[line_rows], return_inverse=True)
+        areas = np.array([self.cross_sections[cs_id]["A"] for cs_id in cs_ids.tolist()])[cs_index]
+        gammas = np.array([self.materials[name].gamma for name in MATERIAL_NAMES])[self.members.material_codes[line_rows]]
+        return self.topology.to_nodes(areas * self.topology.lengths * gammas)
+
     def create_loads(self):
         """Create self weight load and point loads"""
-        for notetag, mass_values in self.mass.items():
-            # Mass in opensees is N/g * g to loads
-            self.loadsDict[notetag] += mass_values["mass_z"]*self.g
+        self.nodal_loads = self.self_weight()
 
         if self.nodesWithLoad and self.nodalLoadMagnitud:
-            for nodetag in self.nodesWithLoad:
-                self.loadsDict[nodetag] += self.nodalLoadMagnitud
-            
-        for nodetag, loadMag in self.loadsDict.items():    
+            np.add.at(self.nodal_loads, self.nodes.rows(np.asarray(self.nodesWithLoad)), self.nodalLoadMagnitud)
+
+        loaded = np.flatnonzero(self.nodal_loads)
+        for nodetag, loadMag in zip(self.nodes.ids[loaded].tolist(), self.nodal_loads[loaded].tolist()):
             ops.load(nodetag, 0, 0, -loadMag, 0, 0, 0)
 
 
@@ -210,27 +208,16 @@ class Model:
         )
     
 
-def calculate_displacements(lines:LinesDict, nodes:NodesDict):
-    disp_by_type: DefaultDict[str, list[float]] = defaultdict(list)
-    disp_dict: dict[int, float] = {}
-    for lineargs in lines.values():
-        for node in (lineargs["Ni"], lineargs["Nj"]):
-            disp = ops.nodeDisp(node)
-            disp_z = disp[2]
-            disp_by_type[lineargs["Type"]].append(disp_z)
-
-            if node not in disp_dict:
-                disp_dict[node] = disp_z
-                        
-    max_disp_by_type = {eletype: min(disp_list) for eletype, disp_list in  disp_by_type.items()}   
-
-    for node in nodes:
-        disp = ops.nodeDisp(node)
-        disp_z = disp[2]
-        disp_dict[node] = disp_z
-
-    
-    return max_disp_by_type, disp_dict
-
+def calculate_displacements(lines: LineTable, nodes: NodeTable):
+    disp_z = np.array([ops.nodeDisp(node, 3) for node in nodes.ids.tolist()], dtype=np.float64)
+    disp_dict: dict[int, float] = dict(zip(nodes.ids.tolist(), disp_z.tolist()))
 
+    # Vertical displacement at both ends of every line, grouped by line Type
+    end_disp = np.minimum(disp_z[nodes.rows(lines.ni)], disp_z[nodes.rows(lines.nj)])
+    codes, first_seen = np.unique(lines.type_codes, return_index=True)
+    max_disp_by_type = {
+        LINE_TYPES[code]: float(end_disp[lines.type_codes == code].min())
+        for code in codes[np.argsort(first_seen)].tolist()
+    }
 
+    return max_disp_by_type, disp_dict
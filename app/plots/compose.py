@@ -0,0 +1,47 @@
+"""
+Composition of several tool figures into one Plotly view.
+"""
+import plotly.graph_objects as go
+
+from plotly.subplots import make_subplots
+
+
+def side_by_side(figures: list[go.Figure], titles: list[str]) -> go.Figure:
+    """
+    Places the 3D scenes of the given figures next to each other. Every
+    figure keeps its camera and axes settings; legend entries repeated across the
+    figures are only shown once.
+    """
+    figures = [figure.to_plotly_json() for figure in figures]
+    n_cols = len(figures)
+    fig = make_subplots(
+        rows=1, cols=n_cols, specs=[[{"type": "scene"}] * n_cols], subplot_titles=titles, horizontal_spacing=0.01
+    )
+
+    shown_legend: set[str] = set()
+    for col, figure in enumerate(figures, start=1):
+        for trace in figure.get("data", []):
+            if trace.get("showlegend", True) and trace.get("name"):
+                trace["showlegend"] = trace["name"] not in shown_legend
+                shown_legend.add(trace["name"])
+            if "colorbar" in trace:
+                trace["colorbar"] = {**trace["colorbar"], "x": col / n_cols, "len": 0.5}
+            fig.add_trace(trace, row=1, col=col)
+
+        layout = figure.get("layout", {})
+        scene_name = "scene" if col == 1 else f"scene{col}"
+        fig.layout[scene_name].update({key: value for key, value in layout.get("scene", {}).items() if key != "domain"})
+
+        # Paper annotations (e.g. the max displacement box) move to the centre of their column
+        for annotation in layout.get("annotations", []):
+            if annotation.get("xref") == "paper":
+                annotation = {**annotation, "x": (col - 0.5) / n_cols, "y": 0.92}
+            fig.add_annotation(annotation)
+
+    first_layout = figures[0].get("layout", {}) if figures else {}
+    fig.update_layout(
+        paper_bgcolor="white",
+        margin=first_layout.get("margin", dict(l=0, r=0, t=40, b=0)),
+        legend=first_layout.get("legend", {}),
+    )
+    return fig
@@ -0,0 +1,233 @@
+"""
+Design space of an optimization: every evaluated design, weight against max |ΔZ|.
+
+The optimizer returns a columnar ``DesignSpace`` (one array per quantity and one
+column of section ids per member group) instead of the design objects. It is
+stored as a compressed ``.npz`` together with the names of the sections it uses,
+resolved once from the catalogue. The view draws it with WebGL (``go.Scattergl``),
+one trace per colour, with the hover texts built from the columns and that lookup
+with vectorized string operations, so sweeps of 10k+ designs stay interactive.
+"""
+from __future__ import annotations
+
+import io
+
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+    from app.schemas import DesignResult
+
+DESIGN_SPACE_KEY = "design_space"
+# Colour options of the view: the number of joists or the section of a member group
+COLOUR_BY = {"joist_cs": "Joist section", "beam_cs": "Beam section", "truss_chord_cs": "Truss chord section", "nJoist": "Number of joists"}
+NO_SECTION = -1
+# Points drawn slightly transparent when the design exceeds the deformation limit
+FEASIBLE_OPACITY, INFEASIBLE_OPACITY = 0.9, 0.3
+
+
+def group_label(group: str) -> str:
+    """Display name of a member group, as in `DesignResult.section_names`."""
+    return group.replace("_cs", "").replace("_", " ").title()
+
+
+@dataclass(frozen=True)
+class DesignSpace:
+    weight: np.ndarray  # Total weight per design (kg)
+    max_disp: np.ndarray  # Global max vertical displacement per design (mm, downwards negative)
+    n_joist: np.ndarray
+    groups: tuple[str, ...]  # Member groups of the section columns, e.g. ("column_cs", "beam_cs", "joist_cs")
+    section_ids: np.ndarray  # (designs, groups), NO_SECTION where a design has no such group
+    case: np.ndarray  # Index in `case_labels` of the optimization of every design
+    case_labels: tuple[str, ...] = ("",)
+    limit: float | None = None
+    lookup_ids: np.ndarray | None = None  # Sorted section ids used, and their names
+    lookup_names: np.ndarray | None = None
+
+    @classmethod
+    def from_designs(cls, designs: list[DesignResult], limit: float | None = None) -> DesignSpace:
+        sections = [design.sections.model_dump() for design in designs]
+        groups = tuple(dict.fromkeys(group for row in sections for group in row))
+        return cls(
+            weight=np.array([design.total_weight for design in designs], dtype=np.float64),
+            max_disp=np.array([design.global_max_disp for design in designs], dtype=np.float64),
+            n_joist=np.array([design.inputs.nJoist for design in designs], dtype=np.int32),
+            groups=groups,
+            section_ids=np.array([[row.get(group, NO_SECTION) for group in groups] for row in sections], dtype=np.int32).reshape(
+                len(designs), len(groups)
+            ),
+            case=np.zeros(len(designs), dtype=np.uint8),
+            limit=limit,
+        )
+
+    @classmethod
+    def concat(cls, spaces: list[DesignSpace], labels: list[str]) -> DesignSpace:
+        """One space of the designs of several optimizations, told apart by their `labels`."""
+        groups = tuple(dict.fromkeys(group for space in spaces for group in space.groups))
+        section_ids = []
+        for space in spaces:
+            columns = np.full((len(space), len(groups)), NO_SECTION, dtype=np.int32)
+            columns[:, [groups.index(group) for group in space.groups]] = space.section_ids
+            section_ids.append(columns)
+        limits = {space.limit for space in spaces}
+        return cls(
+            weight=np.concatenate([space.weight for space in spaces]),
+            max_disp=np.concatenate([space.max_disp for space in spaces]),
+            n_joist=np.concatenate([space.n_joist for space in spaces]),
+            groups=groups,
+            section_ids=np.concatenate(section_ids),
+            case=np.concatenate([np.full(len(space), index, dtype=np.uint8) for index, space in enumerate(spaces)]),
+            case_labels=tuple(labels),
+            limit=limits.pop() if len(limits) == 1 else None,
+        )
+
+    def __len__(self) -> int:
+        return self.weight.size
+
+    @property
+    def nbytes(self) -> int:
+        return self.weight.nbytes + self.max_disp.nbytes + self.n_joist.nbytes + self.section_ids.nbytes + self.case.nbytes
+
+    @property
+    def feasible(self) -> np.ndarray:
+        if self.limit is None:
+            return np.ones(len(self), dtype=bool)
+        return np.abs(self.max_disp) < self.limit
+
+    def with_lookup(self) -> DesignSpace:
+        """The space with the names of the sections it uses, one catalogue lookup for all designs."""
+        if self.lookup_ids is not None:
+            return self
+        from app.db.catalogue import get_catalogue
+
+        catalogue = get_catalogue()
+        ids = np.unique(self.section_ids[self.section_ids != NO_SECTION])
+        known = np.array([section_id in catalogue for section_id in ids.tolist()], dtype=bool)
+        names = np.array([f"ID: {section_id}" for section_id in ids.tolist()], dtype=object)
+        names[known] = catalogue.names[catalogue.rows(ids[known])]
+        return replace(self, lookup_ids=ids, lookup_names=names.astype(str))
+
+    def section_names(self, group: str) -> np.ndarray:
+        """Section name of every design for a member group, empty where it has none."""
+        space = self.with_lookup()
+        ids = space.section_ids[:, space.groups.index(group)]
+        if not space.lookup_ids.size:
+            return np.full(len(space), "")
+        names = space.lookup_names[np.searchsorted(space.lookup_ids, ids).clip(max=space.lookup_ids.size - 1)]
+        return np.where(ids == NO_SECTION, "", names)
+
+    def pack(self) -> bytes:
+        """Compressed `.npz` payload of the columns and the section names they use."""
+        space = self.with_lookup()
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            weight=space.weight,
+            max_disp=space.max_disp,
+            n_joist=space.n_joist,
+            groups=np.array(space.groups, dtype=str),
+            section_ids=space.section_ids,
+            case=space.case,
+            case_labels=np.array(space.case_labels, dtype=str),
+            limit=np.array(np.nan if space.limit is None else space.limit),
+            lookup_ids=space.lookup_ids,
+            lookup_names=space.lookup_names,
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def unpack(cls, data: bytes) -> DesignSpace:
+        with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+            limit = float(npz["limit"])
+            return cls(
+                weight=npz["weight"],
+                max_disp=npz["max_disp"],
+                n_joist=npz["n_joist"],
+                groups=tuple(str(group) for group in npz["groups"]),
+                section_ids=npz["section_ids"].reshape(-1, npz["groups"].size),
+                case=npz["case"],
+                case_labels=tuple(str(label) for label in npz["case_labels"]),
+                limit=None if np.isnan(limit) else limit,
+                lookup_ids=npz["lookup_ids"],
+                lookup_names=npz["lookup_names"],
+            )
+
+
+def store_design_space(space: DesignSpace) -> None:
+    from app.storage import current_storage
+
+    current_storage().set(DESIGN_SPACE_KEY, space.pack())
+
+
+def hover_texts(space: DesignSpace) -> np.ndarray:
+    """Hover text of every design: weight, displacement, joists and sections."""
+    text = np.char.add(np.char.mod("%.0f kg, ", space.weight), np.char.mod("%.2f mm", space.max_disp))
+    text = np.char.add(text, np.char.mod("<br>%d joists", space.n_joist))
+    for group in space.groups:
+        names = space.section_names(group)
+        line = np.char.add(f"<br>{group_label(group)}: ", names)
+        text = np.char.add(text, np.where(names == "", "", line))
+    if len(space.case_labels) > 1:
+        cases = np.array(space.case_labels, dtype=str)[space.case]
+        text = np.char.add(np.char.add(cases, "<br>"), text)
+    return text
+
+
+def design_space_figure(space: DesignSpace, colour_by: str = "joist_cs") -> go.Figure:
+    """
+    Weight against max |ΔZ| of every design, one WebGL trace per joist count or per
+    section of the `colour_by` member group. Designs over the limit are faded.
+    """
+    import plotly.graph_objects as go
+
+    if colour_by not in space.groups:
+        colour_by = "nJoist"
+    if colour_by == "nJoist":
+        values = np.char.mod("%d joists", space.n_joist)
+        categories = np.char.mod("%d joists", np.unique(space.n_joist))
+    else:
+        values = space.section_names(colour_by)
+        # Sections in order of their (catalogue) id, which follows the stiffness within a family
+        ids = space.section_ids[:, space.groups.index(colour_by)]
+        _, first = np.unique(ids, return_index=True)
+        categories = values[first]
+
+    texts = hover_texts(space)
+    opacity = np.where(space.feasible, FEASIBLE_OPACITY, INFEASIBLE_OPACITY).astype(np.float32)
+    disp = np.abs(space.max_disp)
+    fig = go.Figure()
+    for category in categories.tolist():
+        mask = values == category
+        fig.add_trace(
+            go.Scattergl(
+                x=space.weight[mask], y=disp[mask], mode="markers", name=category or "None",
+                marker=dict(size=7, opacity=opacity[mask]), text=texts[mask], hovertemplate="%{text}<extra></extra>",
+            )
+        )
+    if space.limit is not None:
+        fig.add_hline(
+            y=space.limit, line=dict(color="red", dash="dash", width=1),
+            annotation_text=f"Limit {space.limit:g} mm", annotation_position="top left",
+        )
+    fig.update_layout(
+        xaxis=dict(title="Total weight (kg)", gridcolor="#eee", zeroline=False),
+        yaxis=dict(title="Max |ΔZ| (mm)", gridcolor="#eee", zeroline=False),
+        legend=dict(title=COLOUR_BY.get(colour_by, group_label(colour_by))),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        margin=dict(l=60, r=20, t=30, b=50),
+    )
+    return fig
+
+
+@lru_cache(maxsize=4)
+def render_design_space(data: bytes, colour_by: str = "joist_cs") -> str:
+    """Figure JSON of a stored design space. Cached per payload and colour option."""
+    from app.plots.payload import compact_figure_json
+
+    return compact_figure_json(design_space_figure(DesignSpace.unpack(data), colour_by), precision=0.01)
@@ -0,0 +1,221 @@
+"""
+Vectorized meshes of the members and load arrows.
+
+All prisms (or arrows) are computed at once in NumPy and drawn as a single
+``go.Mesh3d`` trace per colour, or one trace with a face intensity, instead of
+one trace per member. The prisms match the per-member prisms drawn before (see
+``benchmarks/mesh_traces.py``) vertex for vertex, with every face drawn on both sides.
+
+Large models are drawn with less detail, picked by member count with
+``detail_level``: single sided prisms (half the triangles), then centrelines (one
+``go.Scatter3d`` of all members, split by NaN points).
+"""
+from __future__ import annotations
+
+from typing import Literal
+
+import numpy as np
+import plotly.graph_objects as go
+
+MESH_LIGHTING = dict(ambient=0.5, diffuse=0.7, specular=0.3, roughness=0.9)
+
+DetailLevel = Literal["full", "single_sided", "centreline"]
+FULL_DETAIL_MAX_MEMBERS = 1_000
+SINGLE_SIDED_MAX_MEMBERS = 5_000
+CENTRELINE_WIDTH = 4
+
+# Two triangles per quad, and the same two reversed so the back faces show
+_QUADS = ((0, 1, 2, 3), (4, 5, 6, 7), (0, 1, 5, 4), (1, 2, 6, 5), (2, 3, 7, 6), (3, 0, 4, 7))
+PRISM_TRIANGLES = np.array(
+    [tri for a, b, c, d in _QUADS for tri in ((a, b, c), (a, c, d), (a, c, b), (a, d, c))], dtype=np.int32
+)
+PRISM_TRIANGLES_SINGLE_SIDED = np.array(
+    [tri for a, b, c, d in _QUADS for tri in ((a, b, c), (a, c, d))], dtype=np.int32
+)
+
+
+def detail_level(n_members: int, detail: DetailLevel | None = None) -> DetailLevel:
+    """`detail` when given, else the level for a model of `n_members` members."""
+    if detail is not None:
+        return detail
+    if n_members <= FULL_DETAIL_MAX_MEMBERS:
+        return "full"
+    if n_members <= SINGLE_SIDED_MAX_MEMBERS:
+        return "single_sided"
+    return "centreline"
+
+
+def prism_triangles(detail: DetailLevel) -> np.ndarray:
+    return PRISM_TRIANGLES if detail == "full" else PRISM_TRIANGLES_SINGLE_SIDED
+
+
+def prism_vertices(starts: np.ndarray, ends: np.ndarray, widths: np.ndarray, heights: np.ndarray) -> np.ndarray:
+    """(n, 8, 3) corners of the rectangular prisms of n members from `starts` to `ends`."""
+    axis = ends - starts
+    length = np.linalg.norm(axis, axis=1, keepdims=True)
+    axis_hat = np.divide(axis, length, out=np.zeros_like(axis), where=length > 0)
+
+    # World axis most perpendicular to every member (the first one on ties)
+    helper = np.eye(3)[np.argmin(np.abs(axis_hat), axis=1)]
+    local_y = np.cross(axis_hat, helper)
+    local_y /= np.linalg.norm(local_y, axis=1, keepdims=True).clip(min=np.finfo(float).tiny)
+    local_z = np.cross(axis_hat, local_y)
+    local_z /= np.linalg.norm(local_z, axis=1, keepdims=True).clip(min=np.finfo(float).tiny)
+    local_y *= (np.asarray(widths, dtype=float) / 2.0)[:, None]
+    local_z *= (np.asarray(heights, dtype=float) / 2.0)[:, None]
+
+    # Zero length members collapse to their start point
+    degenerate = (length[:, 0] == 0)[:, None]
+    local_y[degenerate[:, 0]] = 0.0
+    local_z[degenerate[:, 0]] = 0.0
+    ends = np.where(degenerate, starts, ends)
+
+    corners = np.stack(
+        [
+            starts + local_y + local_z,
+            starts + local_y - local_z,
+            starts - local_y - local_z,
+            starts - local_y + local_z,
+            ends + local_y + local_z,
+            ends + local_y - local_z,
+            ends - local_y - local_z,
+            ends - local_y + local_z,
+        ],
+        axis=1,
+    )
+    return corners
+
+
+def merged_mesh(vertices: np.ndarray, triangles: np.ndarray, **trace: object) -> go.Mesh3d:
+    """
+    One Mesh3d of n shapes, `vertices` (n, v, 3) sharing the `triangles` (t, 3) of one
+    shape. Extra keyword arguments are passed to the trace (colour, intensity...).
+    """
+    n_shapes, n_vertices, _ = vertices.shape
+    offsets = (np.arange(n_shapes, dtype=np.int64) * n_vertices)[:, None, None]
+    # Smallest index type, the figure JSON holds the arrays as typed binary data
+    index_dtype = np.uint16 if n_shapes * n_vertices <= np.iinfo(np.uint16).max else np.uint32
+    faces = (triangles[None, :, :] + offsets).reshape(-1, 3).astype(index_dtype)
+    xyz = vertices.reshape(-1, 3)
+    return go.Mesh3d(
+        x=xyz[:, 0], y=xyz[:, 1], z=xyz[:, 2],
+        i=faces[:, 0], j=faces[:, 1], k=faces[:, 2],
+        flatshading=False, opacity=1.0, hoverinfo="skip", lighting=MESH_LIGHTING, showscale=False,
+        **trace,
+    )
+
+
+def prism_meshes_by_colour(
+    vertices: np.ndarray, colours: list[str], triangles: np.ndarray = PRISM_TRIANGLES
+) -> list[go.Mesh3d]:
+    """One merged mesh of the prisms per distinct colour, in order of first use."""
+    colour_of = np.array(colours, dtype=object)
+    return [
+        merged_mesh(vertices[colour_of == colour], triangles, color=colour)
+        for colour in dict.fromkeys(colours)
+    ]
+
+
+def prism_mesh_with_intensity(
+    vertices: np.ndarray,
+    values: np.ndarray,
+    colorscale: str,
+    cmin: float,
+    cmax: float,
+    triangles: np.ndarray = PRISM_TRIANGLES,
+) -> go.Mesh3d:
+    """One merged mesh of the prisms, every face coloured by the value of its prism."""
+    return merged_mesh(
+        vertices,
+        triangles,
+        intensity=np.repeat(np.asarray(values, dtype=float), len(triangles)),
+        intensitymode="cell",
+        colorscale=colorscale,
+        cmin=cmin,
+        cmax=cmax,
+    )
+
+
+def centreline_xyz(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """(3n, 3) points of n segments as one polyline: start, end and a NaN point that splits it."""
+    points = np.full((len(starts), 3, 3), np.nan)
+    points[:, 0], points[:, 1] = starts, ends
+    return points.reshape(-1, 3)
+
+
+def centrelines_by_colour(starts: np.ndarray, ends: np.ndarray, colours: list[str]) -> list[go.Scatter3d]:
+    """One polyline of the member centrelines per distinct colour, in order of first use."""
+    colour_of = np.array(colours, dtype=object)
+    traces = []
+    for colour in dict.fromkeys(colours):
+        xyz = centreline_xyz(starts[colour_of == colour], ends[colour_of == colour])
+        traces.append(
+            go.Scatter3d(
+                x=xyz[:, 0], y=xyz[:, 1], z=xyz[:, 2], mode="lines",
+                line=dict(color=colour, width=CENTRELINE_WIDTH), hoverinfo="skip", showlegend=False,
+            )
+        )
+    return traces
+
+
+def centrelines_with_values(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    start_values: np.ndarray,
+    end_values: np.ndarray,
+    colorscale: str,
+    cmin: float,
+    cmax: float,
+) -> go.Scatter3d:
+    """One polyline of the member centrelines, coloured from the value at either end."""
+    xyz = centreline_xyz(starts, ends)
+    end_values = np.asarray(end_values, dtype=float)
+    # The split point takes the end value, NaN colours are not accepted
+    values = np.stack([np.asarray(start_values, dtype=float), end_values, end_values], axis=1).reshape(-1)
+    return go.Scatter3d(
+        x=xyz[:, 0], y=xyz[:, 1], z=xyz[:, 2], mode="lines",
+        line=dict(color=values, colorscale=colorscale, cmin=cmin, cmax=cmax, width=CENTRELINE_WIDTH),
+        hoverinfo="skip", showlegend=False,
+    )
+
+
+def arrow_meshes(
+    bases: np.ndarray,
+    shaft_height: float,
+    shaft_radius: float,
+    head_height: float,
+    head_radius: float,
+    segments: int = 16,
+    double_sided: bool = True,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vertices and triangles of downward arrows (a cylinder and a cone below it) whose
+    shafts start at the points `bases` (n, 3): (shafts (n, 2s, 3), shaft triangles,
+    heads (n, s + 1, 3), head triangles). Same shapes as the per-arrow cylinder and
+    cone drawn before, with the side of the shaft fully closed.
+    """
+    theta = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+    ring = np.stack([np.cos(theta), np.sin(theta), np.zeros(segments)], axis=1)
+    down = np.array([0.0, 0.0, -1.0])
+
+    shaft = np.vstack([ring * shaft_radius, ring * shaft_radius + down * shaft_height])
+    head = np.vstack([ring * head_radius, down * head_height]) + down * shaft_height
+
+    idx = np.arange(segments)
+    nxt = (idx + 1) % segments
+    bottom, bottom_nxt = idx + segments, nxt + segments
+    shaft_sides = [np.stack([idx, bottom, nxt], axis=1), np.stack([nxt, bottom, bottom_nxt], axis=1)]
+    tip = np.full(segments, segments)
+    head_sides = [np.stack([idx, nxt, tip], axis=1)]
+    if double_sided:
+        shaft_sides += [np.stack([idx, nxt, bottom], axis=1), np.stack([nxt, bottom_nxt, bottom], axis=1)]
+        head_sides += [np.stack([idx, tip, nxt], axis=1)]
+    shaft_triangles = np.stack(shaft_sides, axis=1).reshape(-1, 3)
+    head_triangles = np.stack(head_sides, axis=1).reshape(-1, 3)
+
+    return (
+        bases[:, None, :] + shaft[None],
+        shaft_triangles.astype(np.int32),
+        bases[:, None, :] + head[None],
+        head_triangles.astype(np.int32),
+    )
@@ -1,9 +1,19 @@
 import plotly.graph_objects as go
 import numpy as np
 
-from app.types import NodesDict, LinesDict, MembersDict, CrossSectionsDict
-
-Vec3 = np.ndarray
+from app.geometry.tables import LineTable, MemberTable, NodeTable
+from app.plots.mesh import (
+    DetailLevel,
+    arrow_meshes,
+    centreline_xyz,
+    centrelines_by_colour,
+    detail_level,
+    merged_mesh,
+    prism_meshes_by_colour,
+    prism_triangles,
+    prism_vertices,
+)
+from app.types import CrossSectionsDict
 
 PASTEL_PALETTE = [
     "#E416C1",  # Light Pink
@@ -11,152 +21,24 @@ PASTEL_PALETTE = [
     "#F3083F",  # Cotton Candy
     "#2704F0",  # Soft Sky Blue
 ]
-def compute_beam_vertices_rect(A: Vec3, B: Vec3, width: float, height: float) -> np.ndarray:
-    v = B - A
-    length = np.linalg.norm(v)
-    if length == 0:
-        raise ValueError("member with zero length")
-    v_hat = v / length
-
-    # pick whichever world‑axis is most perpendicular to v_hat
-    axes = [np.array([1,0,0]), np.array([0,1,0]), np.array([0,0,1])]
-    helper = min(axes, key=lambda ax: abs(np.dot(v_hat, ax)))
-
-    # build a clean 2D frame
-    local_y = np.cross(v_hat, helper)
-    local_y /= np.linalg.norm(local_y)
-    local_z = np.cross(v_hat, local_y)
-    local_z /= np.linalg.norm(local_z)
-
-    local_y *= width  / 2.0
-    local_z *= height / 2.0
-
-    # eight corners
-    v0 = A + local_y + local_z
-    v1 = A + local_y - local_z
-    v2 = A - local_y - local_z
-    v3 = A - local_y + local_z
-    v4 = B + local_y + local_z
-    v5 = B + local_y - local_z
-    v6 = B - local_y - local_z
-    v7 = B - local_y + local_z
-    return np.stack([v0, v1, v2, v3, v4, v5, v6, v7])
-
-def add_beam_mesh(fig: go.Figure, verts: np.ndarray, color: str) -> None:
-    """Insert one rectangular prism into the figure, drawing both sides of each face."""
-    # define each face by four verts (a,b,c,d)
-    quads = [
-        (0, 1, 2, 3),  # face at A
-        (4, 5, 6, 7),  # face at B
-        (0, 1, 5, 4),
-        (1, 2, 6, 5),
-        (2, 3, 7, 6),
-        (3, 0, 4, 7),
-    ]
-
-    i_list, j_list, k_list = [], [], []
-    for a, b, c, d in quads:
-        # two triangles per quad
-        # 1) a→b→c
-        i_list.append(a); j_list.append(b); k_list.append(c)
-        # 2) a→c→d
-        i_list.append(a); j_list.append(c); k_list.append(d)
-
-        # duplicate them reversed so back faces show
-        # 3) a→c→b
-        i_list.append(a); j_list.append(c); k_list.append(b)
-        # 4) a→d→c
-        i_list.append(a); j_list.append(d); k_list.append(c)
-
-    fig.add_trace(
-        go.Mesh3d(
-            x=verts[:, 0],
-            y=verts[:, 1],
-            z=verts[:, 2],
-            i=i_list,
-            j=j_list,
-            k=k_list,
-            color=color,
-            # draw both sides, disable flat shading to simplify
-            flatshading=False,
-            opacity=1.0,
-            hoverinfo="skip",
-            lighting=dict(ambient=0.5, diffuse=0.7, specular=0.3, roughness=0.9),
-            showscale=False,
-        )
-    )
-
-
-def compute_cylinder_mesh(
-    base_center: Vec3,
-    height: float,
-    radius: float,
-    segments: int = 16
-) -> tuple[np.ndarray, list[int], list[int], list[int]]:
-    """Return verts and faces for a vertical cylinder pointing down from base_center."""
-    theta = np.linspace(0, 2 * np.pi, segments, endpoint=False)
-    xs = radius * np.cos(theta)
-    ys = radius * np.sin(theta)
-    # top circle at z = base_z
-    top = np.vstack([base_center + np.array([x, y, 0]) for x, y in zip(xs, ys)])
-    # bottom circle at z = base_z - height
-    bottom = np.vstack([base_center + np.array([x, y, -height]) for x, y in zip(xs, ys)])
-    verts = np.vstack([top, bottom])
-    i_list = []
-    j_list = []
-    k_list = []
-    for i in range(segments):
-        ni = (i + 1) % segments
-        # triangle top→bottom→bottom next
-        i_list += [i, i]
-        j_list += [i + segments, ni + segments]
-        k_list += [ni, ni + segments]
-        # reversed for backface
-        i_list += [i, i]
-        j_list += [ni + segments, i + segments]
-        k_list += [i + segments, ni]
-    return verts, i_list, j_list, k_list
-
-def compute_cone_mesh(
-    base_center: Vec3,
-    height: float,
-    radius: float,
-    segments: int = 16
-) -> tuple[np.ndarray, list[int], list[int], list[int]]:
-    """Return verts and faces for a downward‐pointing cone at base_center."""
-    theta = np.linspace(0, 2 * np.pi, segments, endpoint=False)
-    xs = radius * np.cos(theta)
-    ys = radius * np.sin(theta)
-    # circle at base_center
-    base = np.vstack([base_center + np.array([x, y, 0]) for x, y in zip(xs, ys)])
-    tip = base_center + np.array([0, 0, -height])
-    verts = np.vstack([base, tip])
-    tip_idx = len(verts) - 1
-    i_list = []
-    j_list = []
-    k_list = []
-    for i in range(segments):
-        ni = (i + 1) % segments
-        # triangle base[i]→base[ni]→tip
-        i_list += [i, i]
-        j_list += [ni, tip_idx]
-        k_list += [tip_idx, ni]
-    return verts, i_list, j_list, k_list
 
 def plot_3d_model(
-    nodes: NodesDict,
-    lines: LinesDict,
-    members: MembersDict,
+    nodes: NodeTable,
+    lines: LineTable,
+    members: MemberTable,
     cross_sections: CrossSectionsDict,
     load: float = 0.0,
+    detail: DetailLevel | None = None,
 ) -> go.Figure:
-    """Plot members with pastel colours and add red load arrows."""
-    x_nodes = [n["x"] for n in nodes.values()]
-    y_nodes = [n["y"] for n in nodes.values()]
-    z_nodes = [n["z"] for n in nodes.values()]
+    """
+    Plot members with pastel colours and add red load arrows. The level of `detail`
+    follows the member count unless given (see `app.plots.mesh.detail_level`).
+    """
+    detail = detail_level(len(members), detail)
+    x_nodes, y_nodes, z_nodes = nodes.xyz.T.tolist()
 
     # --- colour map per cross‑section ----------------------------------------
-    cs_ids = sorted({m["cross_section_id"] for m in members.values()})
+    cs_ids = np.unique(members.cross_section_ids).tolist()
     color_map = {cs_id: PASTEL_PALETTE[i % len(PASTEL_PALETTE)] for i, cs_id in enumerate(cs_ids)}
     cs_labels = {
         cs_id: cross_sections[cs_id].get("Description", f"Section {cross_sections[cs_id]['name']}")
@@ -194,42 +76,43 @@ def plot_3d_model(
 
     fig.add_trace(
         go.Scatter3d(
-            x=x_nodes, y=y_nodes, z=z_nodes, mode="markers",
+            x=nodes.xyz[:, 0], y=nodes.xyz[:, 1], z=nodes.xyz[:, 2], mode="markers",
             marker=dict(size=3, color="black"), hoverinfo="text", showlegend=False,
         )
     )
 
-    for member in members.values():
-        line = lines[member["line_id"]]
-        ni, nj = nodes[line["Ni"]], nodes[line["Nj"]]
-        A = np.array([ni["x"], ni["y"], ni["z"]], float)
-        B = np.array([nj["x"], nj["y"], nj["z"]], float)
-        cs = cross_sections[member["cross_section_id"]]
-        width, height = float(cs["h"]), float(cs["h"])
-        verts = compute_beam_vertices_rect(A, B, width, height)
-        add_beam_mesh(fig, verts, color_map[member["cross_section_id"]])
-
-    nodes_with_load = list(
-        {node for ln in lines.values() if ln.get("Type") == "Joist" for node in (ln["Ni"], ln["Nj"])}
-    )
-    if nodes_with_load:
+    line_rows = lines.rows(members.ids)
+    starts = nodes.coords(lines.ni[line_rows])
+    ends = nodes.coords(lines.nj[line_rows])
+    member_cs = members.cross_section_ids.tolist()
+    member_colours = [color_map[cs_id] for cs_id in member_cs]
+    if detail == "centreline":
+        fig.add_traces(centrelines_by_colour(starts, ends, member_colours))
+    else:
+        heights = np.array([float(cross_sections[cs_id]["h"]) for cs_id in member_cs])
+        verts = prism_vertices(starts, ends, widths=heights, heights=heights)
+        fig.add_traces(prism_meshes_by_colour(verts, member_colours, prism_triangles(detail)))
+
+    nodes_with_load = lines.nodes_of_type("Joist")
+    if nodes_with_load.size:
         arrow_height, offset = 400.0, 300.0
         cyl_h, cone_h = 0.8 * arrow_height, 0.2 * arrow_height
         cyl_radius, cone_radius = 0.04 * arrow_height, 0.15 * arrow_height
-        for nid in nodes_with_load:
-            n = nodes[nid]
-            base = np.array([n["x"], n["y"], n["z"]], float) + np.array([0.0, 0.0, arrow_height + offset])
-            cyl_verts, ci, cj, ck = compute_cylinder_mesh(base, cyl_h, cyl_radius)
-            fig.add_trace(go.Mesh3d(
-                x=cyl_verts[:, 0], y=cyl_verts[:, 1], z=cyl_verts[:, 2],
-                i=ci, j=cj, k=ck, color="red", opacity=1.0, hoverinfo="skip", showlegend=False
-            ))
-            cone_base = base + np.array([0.0, 0.0, -cyl_h])
-            cone_verts, qi, qj, qk = compute_cone_mesh(cone_base, cone_h, cone_radius)
-            fig.add_trace(go.Mesh3d(
-                x=cone_verts[:, 0], y=cone_verts[:, 1], z=cone_verts[:, 2],
-                i=qi, j=qj, k=qk, color="red", opacity=1.0, hoverinfo="skip", showlegend=False
+        bases = nodes.coords(nodes_with_load) + np.array([0.0, 0.0, arrow_height + offset])
+        if detail == "centreline":
+            xyz = centreline_xyz(bases, bases - np.array([0.0, 0.0, arrow_height]))
+            fig.add_trace(go.Scatter3d(
+                x=xyz[:, 0], y=xyz[:, 1], z=xyz[:, 2], mode="lines",
+                line=dict(color="red", width=2), hoverinfo="skip", showlegend=False,
             ))
+        else:
+            shafts, shaft_faces, heads, head_faces = arrow_meshes(
+                bases, cyl_h, cyl_radius, cone_h, cone_radius, double_sided=detail == "full"
+            )
+            fig.add_traces([
+                merged_mesh(shafts, shaft_faces, color="red"),
+                merged_mesh(heads, head_faces, color="red"),
+            ])
 
     for cs_id in cs_ids:
         fig.add_trace(
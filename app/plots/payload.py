@@ -0,0 +1,221 @@
+"""
+Stored form of figure JSON passed to the Plotly view (tools store compact scenes
+instead, see ``app.plots.scene``, and the view caches the figure built from them).
+
+``compact_figure_json`` serializes the figures built here: NumPy arrays go out as
+Plotly typed arrays (base64), coordinates and colour values quantized to a
+precision and stored as float32 (or integers), face indices in the smallest
+unsigned type, without the default template and explicit default values.
+
+The view returns stored JSON as is, without rebuilding and validating a
+``go.Figure``. Large payloads are compressed, with zstd when available
+(``compression.zstd`` on Python 3.14+, or the ``zstandard`` package) and gzip
+otherwise. Payloads are recognised by their magic bytes, so the reader handles
+any of the stored forms, including plain JSON written by earlier versions.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import base64
+
+from functools import cache
+from typing import TYPE_CHECKING, Any, Literal
+
+if TYPE_CHECKING:
+    import numpy as np
+    import plotly.graph_objects as go
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Below this size compressing costs more than it saves on the storage round trip
+COMPRESS_MIN_BYTES = 32 * 1024
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+Codec = Literal["auto", "zstd", "gzip", "none"]
+
+# Model units are millimetres, a tenth of a millimetre is well below what the view shows
+COORDINATE_PRECISION = 0.1
+
+_QUANTIZED = ("x", "y", "z", "intensity")
+_INDICES = ("i", "j", "k")
+# Trace values plotly.js uses when they are not given
+_TRACE_DEFAULTS = {"opacity": 1.0, "flatshading": False, "visible": True}
+# NumPy types plotly.js decodes from typed arrays, and keys it reads as plain arrays
+_TYPED_ARRAY_DTYPES = {
+    "int8": "i1", "uint8": "u1", "int16": "i2", "uint16": "u2",
+    "int32": "i4", "uint32": "u4", "float32": "f4", "float64": "f8",
+}
+_PLAIN_ARRAY_KEYS = ("geojson", "layer", "layers", "range")
+
+
+@cache
+def _zstd():
+    """The zstd module of the interpreter or the `zstandard` package, None if neither exists."""
+    try:
+        from compression import zstd  # type: ignore[import-not-found]
+
+        return zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard
+
+        return zstandard
+    except ImportError:
+        return None
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    zstd = _zstd()
+    if zstd is None:
+        raise RuntimeError("The stored figure is zstd compressed, install `zstandard` to read it")
+    return zstd.decompress(data)
+
+
+def encode_figure(figure_json: str, codec: Codec = "auto") -> bytes:
+    """
+    Bytes to store for `figure_json`. With "auto", payloads from `COMPRESS_MIN_BYTES`
+    on are compressed with zstd if available, otherwise gzip.
+    """
+    data = figure_json.encode()
+    if codec == "auto":
+        if len(data) < COMPRESS_MIN_BYTES:
+            return data
+        codec = "zstd" if _zstd() is not None else "gzip"
+    if codec == "zstd":
+        return _zstd().compress(data, level=ZSTD_LEVEL)
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=GZIP_LEVEL)
+    return data
+
+
+def decode_figure(data: bytes) -> str:
+    """Figure JSON of a stored payload, whatever its compression."""
+    if data[:2] == GZIP_MAGIC:
+        data = gzip.decompress(data)
+    elif data[:4] == ZSTD_MAGIC:
+        data = _zstd_decompress(data)
+    return data.decode()
+
+
+def annotate_figure(figure_json: str, text: str) -> str:
+    """Figure JSON with `text` added as a note at the top, without building the figure."""
+    figure = json.loads(figure_json)
+    layout = figure.setdefault("layout", {})
+    layout["annotations"] = [
+        *layout.get("annotations", []),
+        dict(text=text, xref="paper", yref="paper", x=0.5, y=1.0, xanchor="center", yanchor="top", showarrow=False, font=dict(size=14)),
+    ]
+    return json.dumps(figure)
+
+
+def quantize(values: np.ndarray, precision: float) -> np.ndarray:
+    """
+    `values` rounded to multiples of `precision`: integers when the precision is whole,
+    otherwise float32 when that keeps them within half the precision. NaN (the line
+    breaks of polylines) is kept.
+    """
+    import numpy as np
+
+    quantized = np.round(np.asarray(values, dtype=np.float64) / precision) * precision
+    finite = np.isfinite(quantized)
+    largest = float(np.abs(quantized[finite]).max()) if finite.any() else 0.0
+    if float(precision).is_integer() and finite.all():
+        for dtype in (np.int16, np.int32):
+            if largest <= np.iinfo(dtype).max:
+                return quantized.astype(dtype)
+    if largest * np.finfo(np.float32).eps < precision / 2:
+        return quantized.astype(np.float32)
+    return quantized
+
+
+def _smallest_indices(indices: np.ndarray) -> np.ndarray:
+    import numpy as np
+
+    largest = int(indices.max()) if indices.size else 0
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if largest <= np.iinfo(dtype).max:
+            return indices.astype(dtype, copy=False)
+    return indices
+
+
+def typed_array(values: np.ndarray) -> dict[str, str] | np.ndarray:
+    """
+    Plotly.js typed array of `values`: its type, little-endian bytes in base64 and, for
+    more than one dimension, its shape. 64-bit integers are narrowed when they fit,
+    `values` that have no typed array type (or are empty) are returned as is.
+    """
+    import numpy as np
+
+    if values.dtype.kind in "iu" and values.dtype.name not in _TYPED_ARRAY_DTYPES and values.size:
+        values = _smallest_integers(values)
+    if values.dtype.name not in _TYPED_ARRAY_DTYPES or not values.size:
+        return values
+    data = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<"))
+    array = {"dtype": _TYPED_ARRAY_DTYPES[values.dtype.name], "bdata": base64.b64encode(data.tobytes()).decode("ascii")}
+    if values.ndim > 1:
+        array["shape"] = ", ".join(map(str, values.shape))
+    return array
+
+
+def _smallest_integers(values: np.ndarray) -> np.ndarray:
+    import numpy as np
+
+    low, high = int(values.min()), int(values.max())
+    dtypes = (np.uint8, np.uint16, np.uint32) if values.dtype.kind == "u" else (np.int8, np.int16, np.int32)
+    for dtype in dtypes:
+        if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max:
+            return values.astype(dtype)
+    return values
+
+
+def _typed_arrays(obj: Any) -> Any:
+    """`obj` with its NumPy arrays as typed arrays, in dicts and lists at any depth."""
+    import numpy as np
+
+    if isinstance(obj, np.ndarray):
+        return typed_array(obj)
+    if isinstance(obj, dict):
+        return {key: value if key in _PLAIN_ARRAY_KEYS else _typed_arrays(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_typed_arrays(value) for value in obj]
+    return obj
+
+
+def _compact_trace(trace: dict[str, Any], precision: float | None) -> dict[str, Any]:
+    import numpy as np
+
+    trace = {
+        key: value for key, value in trace.items() if not (key in _TRACE_DEFAULTS and value == _TRACE_DEFAULTS[key])
+    }
+    for key in _INDICES:
+        if isinstance(trace.get(key), np.ndarray):
+            trace[key] = _smallest_indices(trace[key])
+    if precision is None:
+        return trace
+    for key in _QUANTIZED:
+        if isinstance(trace.get(key), np.ndarray) and trace[key].dtype.kind == "f":
+            trace[key] = quantize(trace[key], precision)
+    for key in ("line", "marker"):
+        style = trace.get(key)
+        if isinstance(style, dict) and isinstance(style.get("color"), np.ndarray) and style["color"].dtype.kind == "f":
+            trace[key] = {**style, "color": quantize(style["color"], precision)}
+    return trace
+
+
+def compact_figure_json(figure: go.Figure, precision: float | None = COORDINATE_PRECISION) -> str:
+    """
+    Figure JSON of `figure` with its arrays as typed arrays, quantized to `precision`
+    (None keeps full precision), and without the template and default values.
+    """
+    import plotly.io as pio
+
+    # The traces keep their NumPy arrays, the figure dict has them encoded already
+    layout = figure.layout.to_plotly_json()
+    layout.pop("template", None)
+    compact = {"data": [_compact_trace(trace.to_plotly_json(), precision) for trace in figure.data], "layout": layout}
+    # `to_json` of a plain dict writes arrays as lists, they are typed arrays already
+    return pio.to_json(_typed_arrays(compact), validate=False)
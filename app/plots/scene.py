@@ -0,0 +1,133 @@
+"""
+Compact analysis results shown in the Plotly view.
+
+The chat path stores a ``Scene`` per tool (node coordinates, connectivity,
+section ids and, for analysed models, the vertical displacement of every node)
+as a compressed ``.npz`` payload instead of the figure. The view builds the
+figure from it on first display and caches the figure JSON by payload, so the
+chat reply does not wait for rendering and the stored payload is a fraction of
+the figure size.
+"""
+from __future__ import annotations
+
+import io
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Literal
+
+import numpy as np
+
+from app.geometry.tables import LineTable, MemberTable, NodeTable
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+    from app.plots.mesh import DetailLevel
+
+NPZ_MAGIC = b"PK\x03\x04"
+
+SceneKind = Literal["model", "deformed"]
+
+
+@dataclass(frozen=True)
+class Scene:
+    kind: SceneKind
+    nodes: NodeTable
+    lines: LineTable
+    members: MemberTable
+    disp_z: np.ndarray | None = None  # Vertical displacement per node, in the order of `nodes.ids`
+    title: str = ""
+
+    @classmethod
+    def deformed(cls, nodes: NodeTable, lines: LineTable, members: MemberTable, disp_dict: dict[int, float]) -> Scene:
+        disp_z = np.array([disp_dict.get(node_id, 0.0) for node_id in nodes.ids.tolist()], dtype=np.float64)
+        return cls("deformed", nodes, lines, members, disp_z)
+
+    @property
+    def nbytes(self) -> int:
+        disp_bytes = self.disp_z.nbytes if self.disp_z is not None else 0
+        return self.nodes.nbytes + self.lines.nbytes + self.members.nbytes + disp_bytes
+
+    def to_figure(self, detail: DetailLevel | None = None) -> go.Figure:
+        """Figure of the scene, the level of `detail` follows the member count unless given."""
+        from app.db.members import load_sections_db
+
+        cross_sections = load_sections_db()
+        if self.kind == "deformed":
+            from app.plots.model_defo import plot_deformed_mesh
+
+            disp_dict = dict(zip(self.nodes.ids.tolist(), self.disp_z.tolist()))
+            return plot_deformed_mesh(
+                disp_dict=disp_dict,
+                members=self.members,
+                cross_sections=cross_sections,
+                nodes=self.nodes,
+                lines=self.lines,
+                detail=detail,
+            )
+        from app.plots.model_viz import plot_3d_model
+
+        return plot_3d_model(self.nodes, self.lines, self.members, cross_sections, detail=detail)
+
+
+def pack_scenes(scenes: list[Scene]) -> bytes:
+    """Compressed `.npz` payload of the scenes."""
+    arrays: dict[str, np.ndarray] = {
+        "kinds": np.array([scene.kind for scene in scenes]),
+        "titles": np.array([scene.title for scene in scenes]),
+    }
+    for index, scene in enumerate(scenes):
+        arrays.update(
+            {
+                f"{index}_node_ids": scene.nodes.ids,
+                f"{index}_xyz": scene.nodes.xyz,
+                f"{index}_line_ids": scene.lines.ids,
+                f"{index}_ni": scene.lines.ni,
+                f"{index}_nj": scene.lines.nj,
+                f"{index}_line_types": scene.lines.type_codes,
+                f"{index}_member_line_ids": scene.members.ids,
+                f"{index}_cross_section_ids": scene.members.cross_section_ids,
+                f"{index}_material_codes": scene.members.material_codes,
+            }
+        )
+        if scene.disp_z is not None:
+            arrays[f"{index}_disp_z"] = scene.disp_z
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def unpack_scenes(data: bytes) -> list[Scene]:
+    with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+        return [
+            Scene(
+                kind=str(kind),
+                nodes=NodeTable(npz[f"{index}_node_ids"], npz[f"{index}_xyz"]),
+                lines=LineTable(npz[f"{index}_line_ids"], npz[f"{index}_ni"], npz[f"{index}_nj"], npz[f"{index}_line_types"]),
+                members=MemberTable(
+                    npz[f"{index}_member_line_ids"], npz[f"{index}_cross_section_ids"], npz[f"{index}_material_codes"]
+                ),
+                disp_z=npz[f"{index}_disp_z"] if f"{index}_disp_z" in npz.files else None,
+                title=str(title),
+            )
+            for index, (kind, title) in enumerate(zip(npz["kinds"], npz["titles"]))
+        ]
+
+
+def is_scene_payload(data: bytes) -> bool:
+    return data[:4] == NPZ_MAGIC
+
+
+@lru_cache(maxsize=8)
+def render_scenes(data: bytes) -> str:
+    """Figure JSON of a scene payload, several scenes side by side. Cached per payload."""
+    from app.plots.payload import compact_figure_json
+
+    scenes = unpack_scenes(data)
+    if len(scenes) == 1:
+        return compact_figure_json(scenes[0].to_figure())
+
+    from app.plots.compose import side_by_side
+
+    return compact_figure_json(side_by_side([scene.to_figure() for scene in scenes], [scene.title for scene in scenes]))
@@ -0,0 +1,175 @@
+"""
+Static thumbnails of the best optimization designs, shown next to the results table.
+
+When an optimization is stored, the deformed shapes of its `THUMBNAIL_TOP_K`
+lightest valid designs are stored with it: the scenes kept from their analyses,
+nothing is run again. The thumbnails view renders the PNGs that are missing with
+kaleido, in parallel worker processes, and caches them on disk by design hash, so
+a design drawn once (in this or an earlier optimization) is not rendered again.
+Until a thumbnail is ready the view shows a placeholder.
+"""
+from __future__ import annotations
+
+import os
+import json
+import base64
+import hashlib
+import logging
+import tempfile
+import multiprocessing
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from html import escape
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from app.storage import current_storage
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+    from app.plots.scene import Scene
+    from app.schemas import DesignResult
+
+logger = logging.getLogger(__name__)
+
+THUMBNAILS_KEY = "optimization_thumbnails"
+THUMBNAIL_TOP_K = 6
+THUMBNAIL_SIZE = (320, 240)
+THUMBNAIL_DIR = Path(tempfile.gettempdir()) / "opensees-agent-thumbnails"
+THUMBNAIL_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+_pool: ProcessPoolExecutor | None = None
+_renders: dict[Path, Future[Path]] = {}  # Renders in progress, dropped once done
+
+
+def design_hash(design: DesignResult) -> str:
+    """Hash of the geometry and sections of `design`, which determine its deformed shape."""
+    payload = json.dumps(
+        {
+            "platform": type(design.inputs).__name__,
+            "inputs": design.inputs.model_dump(mode="json"),
+            "sections": design.sections.model_dump(mode="json"),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def thumbnail_path(digest: str) -> Path:
+    width, height = THUMBNAIL_SIZE
+    return THUMBNAIL_DIR / f"{digest}_{width}x{height}.png"
+
+
+def store_thumbnail_designs(designs: list[DesignResult], captions: list[str]) -> None:
+    """
+    Stores the scenes of the designs to draw, with their captions, for the thumbnails
+    view, and starts rendering those not cached.
+    """
+    from app.plots.scene import pack_scenes
+
+    entries = [
+        {
+            "hash": design_hash(design),
+            "caption": caption,
+            "scene": base64.b64encode(pack_scenes([design.scene])).decode(),
+        }
+        for design, caption in zip(designs, captions)
+        if design.scene is not None
+    ]
+    current_storage().set_json(THUMBNAILS_KEY, {"designs": entries})
+    # Start rendering now, the thumbnails are usually ready when the view is opened
+    request_thumbnails(entries)
+
+
+def thumbnail_caption(rank: int, design: DesignResult, case: str | None = None) -> str:
+    caption = f"{rank}. {design.total_weight:,.0f} kg, {design.global_max_disp:.2f} mm"
+    return f"{case}: {caption}" if case else caption
+
+
+def thumbnail_figure(scene: Scene) -> go.Figure:
+    """Deformed shape of `scene` sized for a thumbnail, without legend, colour bar and margins."""
+    figure = scene.to_figure()
+    width, height = THUMBNAIL_SIZE
+    figure.update_traces(marker_showscale=False, selector=dict(type="scatter3d"))
+    figure.update_layout(width=width, height=height, showlegend=False, margin=dict(l=0, r=0, t=0, b=0), annotations=[])
+    return figure
+
+
+def render_thumbnail(scene_payload: bytes, path: Path) -> Path:
+    """Worker process: renders the PNG of a packed scene to `path`."""
+    from app.plots.scene import unpack_scenes
+
+    width, height = THUMBNAIL_SIZE
+    png = thumbnail_figure(unpack_scenes(scene_payload)[0]).to_image(format="png", width=width, height=height)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_bytes(png)
+    os.replace(tmp, path)
+    return path
+
+
+def thumbnail_pool() -> ProcessPoolExecutor:
+    """Worker processes rendering the thumbnails, each with its own kaleido browser."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=THUMBNAIL_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def request_thumbnails(entries: list[dict[str, Any]]) -> dict[str, Path | Future[Path]]:
+    """
+    Cached PNG of every stored design by hash, or the future of its render. Designs
+    not cached nor being rendered are submitted to the pool, all at once: a design whose
+    last render failed is rendered again.
+    """
+    thumbnails: dict[str, Path | Future[Path]] = {}
+    for entry in entries:
+        path = thumbnail_path(entry["hash"])
+        if path.exists():
+            thumbnails[entry["hash"]] = path
+            continue
+        render = _renders.get(path)
+        if render is None:
+            render = _renders[path] = thumbnail_pool().submit(render_thumbnail, base64.b64decode(entry["scene"]), path)
+            render.add_done_callback(lambda done, path=path: _render_done(path, done))
+        thumbnails[entry["hash"]] = render
+    return thumbnails
+
+
+def _render_done(path: Path, render: Future[Path]) -> None:
+    """Drops a finished render: the PNG is cached on disk, or the design is submitted again."""
+    if _renders.get(path) is render:
+        del _renders[path]
+
+
+def _thumbnail_cell(caption: str, thumbnail: Path | Future[Path]) -> str:
+    width, height = THUMBNAIL_SIZE
+    if isinstance(thumbnail, Future) and thumbnail.done() and thumbnail.exception() is None:
+        thumbnail = thumbnail.result()
+    if isinstance(thumbnail, Path):
+        data = base64.b64encode(thumbnail.read_bytes()).decode()
+        image = f'<img src="data:image/png;base64,{data}" width="{width}" height="{height}" alt="{escape(caption)}">'
+    elif thumbnail.done():
+        logger.warning("Thumbnail render failed: %s", thumbnail.exception())
+        image = f'<div class="missing" style="width:{width}px;height:{height}px">Not available</div>'
+    else:
+        image = f'<div class="missing" style="width:{width}px;height:{height}px">Rendering, update the view</div>'
+    return f"<figure>{image}<figcaption>{escape(caption)}</figcaption></figure>"
+
+
+def thumbnails_html() -> str:
+    """Gallery of the stored designs, rendering the missing thumbnails in the background."""
+    stored = current_storage().get_json(THUMBNAILS_KEY) or {}
+    entries = stored.get("designs", [])
+    if not entries:
+        return "<p>No optimization results yet.</p>"
+    thumbnails = request_thumbnails(entries)
+    cells = "".join(_thumbnail_cell(entry["caption"], thumbnails[entry["hash"]]) for entry in entries)
+    return (
+        "<html><head><style>"
+        "body{font-family:sans-serif;margin:8px;display:flex;flex-wrap:wrap;gap:8px}"
+        "figure{margin:0;border:1px solid #ddd}figcaption{padding:4px;font-size:13px}"
+        ".missing{display:flex;align-items:center;justify-content:center;color:#888;background:#f6f6f6}"
+        f"</style></head><body>{cells}</body></html>"
+    )
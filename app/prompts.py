@@ -0,0 +1,218 @@
+"""
+Prompt assembly for the chat agent.
+
+The request messages are laid out as::
+
+    [system: instructions + sections catalogue]   static, identical on every turn
+    [conversation history]                        grows by appending
+    [system: latest optimization results]         dynamic, always last
+
+The static block is built once per process and never changes, and the history
+only grows at its end, so every request shares the longest possible byte-stable
+prefix with the previous one and the provider-side prompt cache can hit.
+
+Long sessions are compacted: the oldest turns are folded into a summary of the
+agent state (current platform inputs, sections and last results), sent with the
+dynamic context. Turns are folded in blocks of `keep_turns`, so the start of the
+verbatim history only moves every `keep_turns` turns, and further when the
+prompt exceeds the token budget. Tokens are counted locally.
+"""
+import json
+import hashlib
+import logging
+
+from functools import lru_cache
+from textwrap import dedent
+
+from app.storage import current_storage
+
+
+logger = logging.getLogger(__name__)
+
+TOKENIZER_ENCODING = "o200k_base"  # gpt-4.1 family
+CHARS_PER_TOKEN = 4  # Estimate when tiktoken is not installed
+HISTORY_TURNS = 6  # Turns (user message and replies) kept verbatim
+TOKEN_BUDGET = 16_000  # Prompt tokens, the oldest verbatim turns are folded beyond it
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    return tiktoken.get_encoding(TOKENIZER_ENCODING)
+
+
+def count_tokens(text: str) -> int:
+    """Tokens of `text` with tiktoken when installed, otherwise estimated from its length."""
+    encoding = _encoding()
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
+
+
+@lru_cache(maxsize=1)
+def static_system_message() -> dict[str, str]:
+    """Instructions and sections catalogue, built once per process."""
+    from app.tools.model_tools import get_cross_section_library
+
+    return {
+        "role": "system",
+        # Dedented before the catalogue is inserted: its lines are not indented, with them
+        # in the template dedent would find no common indentation to remove
+        "content": dedent(
+            """
+            You are a helpful assistant with the following context, who formats responses clearly and helps users create and optimize structural models in OpenSees.
+
+            Respond by describing the functionality of the tools you have, without mentioning their names explicitly.
+
+            You can create two types of platforms. The first type uses only elements with open sections, such as I-shaped beams or PFC (C/U-shaped steel sections). You have a tool designed to generate this type of structure.
+
+            The second type of platform uses truss bearers to support the joists. These truss elements — including diagonals, top, and bottom chords — are modeled using hollow sections.
+
+            Your mission is to interact with the user and assist in optimizing the platform configuration.
+
+            In the first interaction, inform the user that you can help them optimize the platform. Then, naturally ask them to provide the platform specifications. By default, use the plotting tool to create and display the platform.
+
+            **Important**: Every time `selected_tools` is not empty, the VIKTOR app will render the model with the specified inputs. You may say something like, “The structure will be rendered on the right-hand side of the application.”
+
+            All units are in millimeters.
+            Do not optimize the structure yourself use OptimizationTool
+            The optimization runs as a background job: tell the user it has started and that the results table and view show its progress and the optimal model when it is done. Use CancelJobTool when the user asks to stop it.
+            **
+            This are the available cross Sections{catalogue}
+            **
+            The information about the latest optimized models is given in the last system message.
+            """
+        ).format(catalogue=get_cross_section_library()),
+    }
+
+
+@lru_cache(maxsize=1)
+def static_prefix_tokens() -> int:
+    return count_tokens(static_system_message()["content"])
+
+
+def store_agent_state(state: dict) -> None:
+    """Stores the state summarised in place of the folded turns."""
+    current_storage().set_json("agent_state", state)
+
+
+def read_agent_state() -> str | None:
+    return current_storage().get_text("agent_state")
+
+
+def format_agent_state(raw: str | None) -> str:
+    try:
+        state = json.loads(raw)
+    except Exception:
+        return "No platform has been created yet."
+    lines = [f"Last tool: {state.get('tool')}"]
+    if state.get("geometry"):
+        lines.append(f"Current platform inputs: {json.dumps(state['geometry'])}")
+    if state.get("sections"):
+        lines.append(f"Current sections (ids): {json.dumps(state['sections'])}")
+    if state.get("results"):
+        lines.append(f"Last results: {json.dumps(state['results'])}")
+    if state.get("message"):
+        lines.append(f"Last tool message: {state['message']}")
+    return "\n".join(lines)
+
+
+def split_turns(conversation_history: list[dict]) -> list[list[dict]]:
+    """Groups the messages in turns, each starting with a user message."""
+    turns: list[list[dict]] = []
+    for message in conversation_history:
+        if message.get("role") == "user" or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+def message_tokens(message: dict) -> int:
+    return count_tokens(str(message.get("content", "")))
+
+
+class PromptBuilder:
+    """
+    Builds the request messages of every chat turn. The optimization context and the
+    agent state are only re-formatted when their stored values change.
+    """
+
+    def __init__(self, max_models: int = 10, keep_turns: int = HISTORY_TURNS, token_budget: int = TOKEN_BUDGET) -> None:
+        self.max_models = max_models
+        self.keep_turns = keep_turns
+        self.token_budget = token_budget
+        self._table_digest: str | None = None
+        self._table_text: str | None = None
+        self._state_digest: str | None = None
+        self._state_text: str | None = None
+
+    @staticmethod
+    def _digest(raw: str | None) -> str:
+        return hashlib.blake2b((raw or "").encode(), digest_size=16).hexdigest()
+
+    def optimization_context(self) -> str:
+        from app.tools.analysis_tools import format_optimization_table, read_optimization_table
+
+        raw = read_optimization_table()
+        digest = self._digest(raw)
+        if self._table_text is None or digest != self._table_digest:
+            self._table_digest = digest
+            self._table_text = f"This is the infromation about the latest optimize models {format_optimization_table(raw, self.max_models)}"
+        return self._table_text
+
+    def state_summary(self) -> str:
+        raw = read_agent_state()
+        digest = self._digest(raw)
+        if self._state_text is None or digest != self._state_digest:
+            self._state_digest = digest
+            self._state_text = format_agent_state(raw)
+        return self._state_text
+
+    def context_message(self, folded_messages: int = 0) -> dict[str, str]:
+        content = self.optimization_context()
+        if folded_messages:
+            content = (
+                f"The {folded_messages} earliest messages of this conversation were removed. "
+                f"State of the session at the last tool call:\n{self.state_summary()}\n\n{content}"
+            )
+        return {"role": "system", "content": content}
+
+    def compact(self, conversation_history: list[dict]) -> tuple[list[dict], int]:
+        """The verbatim part of the history and the number of folded messages."""
+        turns = split_turns(conversation_history)
+        turn_tokens = [sum(message_tokens(message) for message in turn) for turn in turns]
+
+        # Fold in blocks, so the verbatim history keeps the same start for `keep_turns` turns
+        folded = max(0, len(turns) - self.keep_turns) // self.keep_turns * self.keep_turns
+        context_tokens = [count_tokens(self.context_message(folded_messages)["content"]) for folded_messages in (0, 1)]
+        while folded < len(turns) - 1:
+            total = static_prefix_tokens() + sum(turn_tokens[folded:]) + context_tokens[bool(folded)]
+            if total <= self.token_budget:
+                break
+            folded += 1
+
+        folded_messages = sum(len(turn) for turn in turns[:folded])
+        return conversation_history[folded_messages:], folded_messages
+
+    def build(self, conversation_history: list[dict]) -> list[dict]:
+        history, folded_messages = self.compact(conversation_history)
+        context = self.context_message(folded_messages)
+        # Copies, so the cached messages are never mutated by the client
+        messages = [dict(static_system_message()), *history, context]
+
+        history_tokens = sum(message_tokens(message) for message in history)
+        context_tokens = count_tokens(context["content"])
+        logger.info(
+            "Prompt tokens: %d (static prefix %d, history %d, context %d), %d of %d messages folded",
+            static_prefix_tokens() + history_tokens + context_tokens,
+            static_prefix_tokens(),
+            history_tokens,
+            context_tokens,
+            folded_messages,
+            len(conversation_history),
+        )
+        return messages
@@ -0,0 +1,135 @@
+"""
+LLM providers of the chat agent.
+
+A provider streams partial structured responses for a list of messages. The
+default talks to OpenAI through instructor and only builds its client on first
+use, so importing the agent needs no network nor credentials. ``ReplayProvider``
+serves recorded or scripted responses, streamed as partials the same way, for
+offline runs and latency tests. Set ``LLM_REPLAY_FILE`` to a JSON lines file of
+responses to use it in the app.
+"""
+import os
+import json
+import time
+import logging
+
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Protocol, TypeVar
+
+from pydantic import BaseModel
+from pydantic_core import from_json
+
+logger = logging.getLogger(__name__)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class LLMProvider(Protocol):
+    def stream(self, messages: list[dict], response_model: type[ModelT]) -> Iterator[ModelT]:
+        """Partial responses as they are generated; the last one is complete."""
+        ...
+
+
+class OpenAIProvider:
+    def __init__(self, model: str = "gpt-4.1", temperature: float = 0.3) -> None:
+        self.model = model
+        self.temperature = temperature
+
+    @cached_property
+    def client(self):
+        import instructor
+        from dotenv import load_dotenv
+        from openai import OpenAI
+
+        load_dotenv()
+        return instructor.from_openai(OpenAI())
+
+    def stream(self, messages: list[dict], response_model: type[ModelT]) -> Iterator[ModelT]:
+        return self.client.chat.completions.create_partial(
+            model=self.model,
+            messages=messages,
+            response_model=response_model,
+            temperature=self.temperature,
+        )
+
+
+class ReplayProvider:
+    """
+    Serves `responses` in order, one per request. Each one is streamed like the real
+    provider: the JSON of the response grows by `chunk_size` characters every `delay`
+    seconds, and every chunk is the model of the JSON so far, with nested models as
+    plain dicts and the last number or string cut short.
+    """
+
+    def __init__(self, responses: Iterable[BaseModel | dict], chunk_size: int = 16, delay: float = 0.0) -> None:
+        self.responses: list[BaseModel | dict] = list(responses)
+        self.chunk_size = chunk_size
+        self.delay = delay
+        self.requests: list[list[dict]] = []
+
+    @classmethod
+    def from_file(cls, file_path: Path, **kwargs: Any) -> "ReplayProvider":
+        """Responses from a JSON lines file, as written by `RecordingProvider`."""
+        with open(file_path) as jsonfile:
+            return cls([json.loads(line) for line in jsonfile if line.strip()], **kwargs)
+
+    def stream(self, messages: list[dict], response_model: type[ModelT]) -> Iterator[ModelT]:
+        if len(self.requests) >= len(self.responses):
+            raise RuntimeError(f"Replay exhausted after {len(self.responses)} responses")
+        recorded = self.responses[len(self.requests)]
+        self.requests.append(messages)
+        final = response_model.model_validate(recorded.model_dump() if isinstance(recorded, BaseModel) else recorded)
+        return self._partials(final)
+
+    def _partials(self, final: ModelT) -> Iterator[ModelT]:
+        # The JSON of the response cut every `chunk_size` characters and parsed as partial
+        # JSON, as instructor does: numbers and strings are truncated where the cut falls
+        text = final.model_dump_json()
+        for end in range(self.chunk_size, len(text), self.chunk_size):
+            parsed = from_json(text[:end], allow_partial="trailing-strings")
+            yield self._emit(final, {name: parsed.get(name) for name in type(final).model_fields})
+        yield final
+
+    def _emit(self, final: ModelT, fields: dict[str, Any]) -> ModelT:
+        if self.delay:
+            time.sleep(self.delay)
+        return type(final).model_construct(**fields)
+
+
+class RecordingProvider:
+    """Wraps a provider and appends every complete response to a JSON lines file."""
+
+    def __init__(self, provider: LLMProvider, file_path: Path) -> None:
+        self.provider = provider
+        self.file_path = file_path
+
+    def stream(self, messages: list[dict], response_model: type[ModelT]) -> Iterator[ModelT]:
+        final = None
+        for final in self.provider.stream(messages, response_model):
+            yield final
+        if final is not None:
+            with open(self.file_path, "a") as jsonfile:
+                jsonfile.write(final.model_dump_json() + "\n")
+
+
+_provider: LLMProvider | None = None
+
+
+def get_provider() -> LLMProvider:
+    """Provider of the process. `LLM_REPLAY_FILE` selects a replay of recorded responses."""
+    global _provider
+    if _provider is None:
+        replay_file = os.getenv("LLM_REPLAY_FILE")
+        if replay_file:
+            logger.info("Replaying LLM responses from %s", replay_file)
+            _provider = ReplayProvider.from_file(Path(replay_file))
+        else:
+            _provider = OpenAIProvider()
+    return _provider
+
+
+def set_provider(provider: LLMProvider | None) -> None:
+    """Replaces the provider of the process, None restores the default."""
+    global _provider
+    _provider = provider
@@ -1,7 +1,10 @@
 from pydantic import BaseModel, Field
-from typing import Any
-from dataclasses import dataclass
-from app.db.members import load_sections_db
+from typing import TYPE_CHECKING, Any
+from dataclasses import dataclass, field
+from app.db.catalogue import get_catalogue
+
+if TYPE_CHECKING:
+    from app.plots.scene import Scene
 
 
 class PlatformInputs(BaseModel):
@@ -32,6 +35,7 @@ class DesignResult:
     sections: SectionSeed
     max_disp_by_type: dict[str, float]
     weight_dict: dict[str, float]
+    scene: "Scene | None" = None  # Deformed shape of the analysis, kept to draw the design without re-running it
 
     @property
     def total_weight(self) -> float:
@@ -44,12 +48,12 @@ class DesignResult:
     @property
     def section_names(self) -> dict[str, str]:
         """Returns a dictionary of section types and their formatted names."""
-        cross_section_map = load_sections_db()
+        catalogue = get_catalogue()
         section_data = self.sections.model_dump() # Use .model_dump() for Pydantic
         names = {}
         for section_type_key, section_id in section_data.items():
             display_key = section_type_key.replace('_cs', '').replace('_', ' ').title()
-            section_name = cross_section_map.get(section_id, {}).get("name", f"ID: {section_id}")
+            section_name = catalogue.name(section_id) if section_id in catalogue else f"ID: {section_id}"
             names[display_key] = section_name
         return names
     
@@ -66,10 +70,45 @@ class DesignResult:
     def __repr__(self):
         
         sections_used = []
-        cross_section_dict = load_sections_db()
+        catalogue = get_catalogue()
 
         for eletype, cross_section_id in self.sections.model_dump().items():
             if cross_section_id:
-                sections_used = [f"{eletype}={cross_section_dict[cross_section_id]['name']}" ]
+                sections_used = [f"{eletype}={catalogue.name(cross_section_id)}" ]
             
-        return f"<DesignResult(max_disp={self.global_max_disp}, total_weight={self.total_weight}, sections={sections_used})>"
\ No newline at end of file
+        return f"<DesignResult(max_disp={self.global_max_disp}, total_weight={self.total_weight}, sections={sections_used})>"
+
+
+@dataclass
+class ScreeningStats:
+    """Counters of the optimization work avoided before reaching OpenSees."""
+    candidates: int = 0
+    infeasible: int = 0
+    dominated: int = 0
+    analysed: int = 0
+    refined: int = 0  # Re-analysed at full fidelity after a coarse pass
+    coarse_errors: list[float] = field(default_factory=list)  # Relative error of the coarse max |ΔZ|
+
+    @property
+    def avoided(self) -> int:
+        return self.infeasible + self.dominated
+
+    def __str__(self) -> str:
+        share = self.avoided / self.candidates if self.candidates else 0.0
+        text = (
+            f"{self.candidates} candidates: {self.analysed} analysed, {self.infeasible} infeasible by bounds, "
+            f"{self.dominated} dominated ({share:.0%} of the analyses avoided)"
+        )
+        if self.coarse_errors:
+            errors = [abs(error) for error in self.coarse_errors]
+            text += (
+                f"; {self.refined} refined, coarse vs fine max |ΔZ| error "
+                f"mean {sum(errors) / len(errors):.1%}, max {max(errors):.1%}"
+            )
+        return text
+
+
+@dataclass
+class OptimizationRun:
+    designs: list[DesignResult]
+    stats: ScreeningStats = field(default_factory=ScreeningStats)
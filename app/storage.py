@@ -0,0 +1,251 @@
+"""
+Entity storage access with a read-through cache per request.
+
+Views, callbacks and the chat call read the same few keys (the scene, the
+optimization table, the agent state) several times while handling one request.
+A ``StorageSession`` memoizes what it reads and writes, remembers which keys are
+missing, answers existence checks of several keys with one ``list`` call and
+keeps parsed JSON, so every key costs at most one round trip per request. The
+session also counts its round trips.
+
+Open a session around the handling of a request; code below it reaches it with
+``current_storage()``. Outside of a session every call gets a fresh one, which
+behaves like using ``vkt.Storage`` directly.
+
+Sessions read and write bytes through a ``StorageBackend``: ``ViktorStorage``
+(``vkt.Storage``, viktor is imported on first use) by default, or the backend
+set with ``set_backend``, e.g. ``InMemoryStorage`` to run without a VIKTOR
+environment.
+"""
+import json
+import logging
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, Protocol
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class StorageBackend(Protocol):
+    """Stored bytes by key. `get` and `delete` raise when the key is not stored."""
+
+    def set(self, key: str, data: bytes) -> None: ...
+
+    def get(self, key: str) -> bytes: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def list(self) -> Iterable[str]: ...
+
+
+class ViktorStorage:
+    """`vkt.Storage` of a `scope`, the entity by default."""
+
+    def __init__(self, scope: str = "entity") -> None:
+        import viktor as vkt
+
+        self.scope = scope
+        self._storage = vkt.Storage()
+
+    def set(self, key: str, data: bytes) -> None:
+        import viktor as vkt
+
+        self._storage.set(key, data=vkt.File.from_data(data), scope=self.scope)
+
+    def get(self, key: str) -> bytes:
+        return self._storage.get(key, scope=self.scope).getvalue_binary()
+
+    def delete(self, key: str) -> None:
+        self._storage.delete(key, scope=self.scope)
+
+    def list(self) -> Iterable[str]:
+        return self._storage.list(scope=self.scope)
+
+
+class InMemoryStorage:
+    """Stand-in of `vkt.Storage` keeping the data in a class level dict."""
+    files: dict[str, bytes] = {}
+
+    def set(self, key: str, data: bytes) -> None:
+        self.files[key] = data
+
+    def get(self, key: str) -> bytes:
+        if key not in self.files:
+            raise FileNotFoundError(key)
+        return self.files[key]
+
+    def delete(self, key: str) -> None:
+        if key not in self.files:
+            raise FileNotFoundError(key)
+        del self.files[key]
+
+    def list(self) -> Iterable[str]:
+        return list(self.files)
+
+
+_backend: Callable[[], StorageBackend] = ViktorStorage
+
+
+def set_backend(backend: Callable[[], StorageBackend] | None) -> None:
+    """Replaces the backend factory of the sessions opened without one, None restores `ViktorStorage`."""
+    global _backend
+    _backend = backend or ViktorStorage
+
+
+@dataclass
+class StorageStats:
+    gets: int = 0
+    sets: int = 0
+    deletes: int = 0
+    lists: int = 0
+    hits: int = 0
+
+    @property
+    def round_trips(self) -> int:
+        return self.gets + self.sets + self.deletes + self.lists
+
+    def __str__(self) -> str:
+        return (
+            f"{self.round_trips} round trips ({self.gets} get, {self.sets} set, {self.deletes} delete, "
+            f"{self.lists} list), {self.hits} served from the session"
+        )
+
+
+class StorageSession:
+    """
+    Cached view of the storage during one request. Reads of a key after the first one,
+    and existence checks of keys already read, written or listed, do not reach the
+    `backend` (made by the factory set with `set_backend` by default).
+    """
+
+    def __init__(self, backend: StorageBackend | None = None) -> None:
+        self._backend = backend
+        self.stats = StorageStats()
+        self._data: dict[str, bytes | None] = {}
+        self._parsed: dict[str, Any] = {}
+        self._listed: set[str] | None = None
+
+    @property
+    def backend(self) -> StorageBackend:
+        if self._backend is None:
+            self._backend = _backend()
+        return self._backend
+
+    def _known(self, key: str) -> bool:
+        return key in self._data or self._listed is not None
+
+    def keys(self) -> set[str]:
+        """Stored keys, listed once per session."""
+        if self._listed is None:
+            self.stats.lists += 1
+            self._listed = set(self.backend.list())
+            self._listed |= {key for key, data in self._data.items() if data is not None}
+            self._listed -= {key for key, data in self._data.items() if data is None}
+        else:
+            self.stats.hits += 1
+        return set(self._listed)
+
+    def exists(self, key: str) -> bool:
+        """Whether `key` is stored. A key not seen yet is read, so a later `get` is free."""
+        if not self._known(key):
+            return self.get(key) is not None
+        return self.exists_many([key])[key]
+
+    def exists_many(self, keys: Iterable[str]) -> dict[str, bool]:
+        """Existence of several keys with at most one `list` call."""
+        keys = list(keys)
+        if all(key in self._data for key in keys):
+            self.stats.hits += 1
+            return {key: self._data[key] is not None for key in keys}
+        listed = self.keys()
+        return {key: self._data[key] is not None if key in self._data else key in listed for key in keys}
+
+    def get(self, key: str) -> bytes | None:
+        """Stored bytes of `key`, None when it does not exist."""
+        if key in self._data:
+            self.stats.hits += 1
+            return self._data[key]
+        if self._listed is not None and key not in self._listed:
+            self.stats.hits += 1
+            return None
+        self.stats.gets += 1
+        try:
+            data = self.backend.get(key)
+        except Exception:
+            data = None
+        self._data[key] = data
+        return data
+
+    def get_text(self, key: str) -> str | None:
+        data = self.get(key)
+        return None if data is None else data.decode()
+
+    def get_json(self, key: str) -> Any:
+        """Parsed JSON of `key`, parsed once per session. None when missing or invalid."""
+        parsed = self._parsed.get(key, _MISSING)
+        if parsed is _MISSING:
+            data = self.get(key)
+            try:
+                parsed = None if data is None else json.loads(data)
+            except ValueError:
+                parsed = None
+            self._parsed[key] = parsed
+        return parsed
+
+    def set(self, key: str, data: bytes | str) -> None:
+        data = data.encode() if isinstance(data, str) else data
+        self.stats.sets += 1
+        self.backend.set(key, data)
+        self._data[key] = data
+        self._parsed.pop(key, None)
+        if self._listed is not None:
+            self._listed.add(key)
+
+    def set_json(self, key: str, obj: Any) -> None:
+        self.set(key, json.dumps(obj))
+        self._parsed[key] = obj
+
+    def delete(self, key: str) -> None:
+        """Deletes `key` if it is stored; known missing keys cost no round trip."""
+        if self._known(key) and not self.exists(key):
+            return
+        self.stats.deletes += 1
+        try:
+            self.backend.delete(key)
+        except Exception:
+            pass
+        self._data[key] = None
+        self._parsed.pop(key, None)
+        if self._listed is not None:
+            self._listed.discard(key)
+
+
+_session: ContextVar[StorageSession | None] = ContextVar("storage_session", default=None)
+
+
+def current_storage() -> StorageSession:
+    """Session of the request being handled, or a fresh one outside of `storage_session`."""
+    return _session.get() or StorageSession()
+
+
+@contextmanager
+def storage_session(backend: StorageBackend | None = None, name: str = "request") -> Iterator[StorageSession]:
+    """
+    Shares one `StorageSession` with everything called inside the block and logs its round
+    trips. Inside another session block, the enclosing session is reused.
+    """
+    outer = _session.get()
+    if outer is not None and backend is None:
+        yield outer
+        return
+    session = StorageSession(backend)
+    token = _session.set(session)
+    try:
+        yield session
+    finally:
+        _session.reset(token)
+        logger.info("Storage of %s: %s", name, session.stats)
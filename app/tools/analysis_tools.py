@@ -1,155 +1,313 @@
 import json
+import logging
 import itertools
-import viktor as vkt
+import numpy as np
 
-from typing import overload
+from typing import Callable, overload
 from app.geometry.platform import Platform, PlatformMixed
-from app.db.members import load_sections_db, calculate_weights_schedule, load_sections
+from app.db.catalogue import SectionWindow, get_catalogue
+from app.db.members import load_sections_db, calculate_weights_schedule, type_section_ids
+from app.geometry.tables import LINE_TYPES
+from app.geometry.topology import Topology
 from app.opensees.model import Model, calculate_displacements
-from app.schemas import PlatformMixedInputs, PlatformInputs, SectionSeed, SectionSeedMixed, DesignResult
-from app.tools.model_tools import generate_model_inputs
-from app.types import steel_cost
+from app.plots.scene import Scene
+from app.storage import current_storage
+from app.tools.results_table import RESULTS_KEY, ResultsQuery, query_results, store_results_table
+from app.schemas import PlatformMixedInputs, PlatformInputs, SectionSeed, SectionSeedMixed, DesignResult, OptimizationRun, ScreeningStats
+from app.tools.model_tools import JOIST_DIVISIONS, FULL_FIDELITY, Fidelity, generate_model_inputs, create_platform
+from app.tools.screening import deflection_bounds, is_infeasible
+from app.types import Steel, steel_cost
 
+logger = logging.getLogger(__name__)
 AnyPlatform = Platform | PlatformMixed
 
-def calculate_model(inputs: PlatformInputs | PlatformMixedInputs, sections: SectionSeed):
+# Candidate sections per member group. `max_count` keeps the search space tractable
+# when a full catalogue (SECTIONS_TABLE) with hundreds of sections per family is used.
+DEFAULT_WINDOWS: dict[str, SectionWindow] = {
+    "beam_cs": SectionWindow(families=("Ishape",), max_count=12),
+    "joist_cs": SectionWindow(families=("Ishape", "PFC"), max_count=12),
+    "truss_chord_cs": SectionWindow(families=("HollowSection",), max_count=12),
+}
+
+# Multi-fidelity: feasible designs kept at full fidelity, and the band above the
+# deformation limit (relative) in which coarse results are still re-analysed
+REFINE_TOP_K: int = 10
+REFINE_MARGIN: float = 0.1
+
+def calculate_model(inputs: PlatformInputs | PlatformMixedInputs, sections: SectionSeed, fidelity: Fidelity = FULL_FIDELITY):
     cs_dict = load_sections_db()
 
-    nodes, lines, members, dist_load = generate_model_inputs(inputs=inputs, sections=sections)
+    nodes, lines, members, dist_load = generate_model_inputs(inputs=inputs, sections=sections, fidelity=fidelity)
     
-    nodesWithLoad = list({node for line in lines.values() if line.get("Type") == "Joist" for node in (line["Ni"], line["Nj"])})
+    nodesWithLoad = lines.nodes_of_type("Joist").tolist()
     loadableArea = (inputs.xLenght/1000) * (inputs.yLenght / 1000)
     load = dist_load * loadableArea * 1000
     nodalLoadMagnitud = load / len(nodesWithLoad) if nodesWithLoad else 0
     
+    topology = Topology(nodes, lines)
     my_model = Model(
         nodes=nodes, lines=lines, cross_sections=cs_dict, members=members,
-        nodesWithLoad=nodesWithLoad, nodalLoadMagnitud=nodalLoadMagnitud
+        nodesWithLoad=nodesWithLoad, nodalLoadMagnitud=nodalLoadMagnitud, topology=topology
     )
     my_model.create_model()
     my_model.run_model() 
     
     max_disp_by_type, disp_dict = calculate_displacements(lines=lines, nodes=nodes)
-    weight_dict = calculate_weights_schedule(members=members, lines=lines, nodes=nodes)
+    weight_dict = calculate_weights_schedule(members=members, lines=lines, nodes=nodes, topology=topology)
     return nodes, lines, members, max_disp_by_type, disp_dict, weight_dict
 
 @overload
-def generate_combinations(inputs: PlatformMixedInputs) -> list[tuple[int, int, int, int, int]]: ...
+def generate_combinations(inputs: PlatformMixedInputs, windows: dict[str, SectionWindow] | None = None) -> list[tuple[int, int, int, int, int]]: ...
 @overload
-def generate_combinations(inputs: PlatformInputs) -> list[tuple[int, int, int]]: ...
+def generate_combinations(inputs: PlatformInputs, windows: dict[str, SectionWindow] | None = None) -> list[tuple[int, int, int]]: ...
 
-def generate_combinations(inputs: PlatformInputs | PlatformMixedInputs):
-    cross_section_dict = load_sections()
-    i_shape_ids = [cs["id"] for cs in cross_section_dict["Ishape"]]
+def generate_combinations(inputs: PlatformInputs | PlatformMixedInputs, windows: dict[str, SectionWindow] | None = None):
+    """Cartesian product of the candidates of every member group. `windows` overrides
+    the `DEFAULT_WINDOWS` of the given groups (beam_cs, joist_cs, truss_chord_cs)."""
+    catalogue = get_catalogue()
+    group_windows = {**DEFAULT_WINDOWS, **(windows or {})}
     joist_number = [3, 5, 6, 7, 8, 9]
-    pfc_sections_ids = [cs["id"] for cs in cross_section_dict["PFC"]]
-    beam_sections = i_shape_ids
-    joist_sections = i_shape_ids + pfc_sections_ids
+    beam_sections = catalogue.window(group_windows["beam_cs"]).tolist()
+    joist_sections = catalogue.window(group_windows["joist_cs"]).tolist()
 
     if isinstance(inputs, PlatformMixedInputs):
         truss_depth_range = list(range(700, 1501, 400))
-        hollow_section_ids = [cs["id"] for cs in cross_section_dict["HollowSection"]]
-        truss_chord_sections = hollow_section_ids
+        truss_chord_sections = catalogue.window(group_windows["truss_chord_cs"]).tolist()
         combinations = list(itertools.product(beam_sections, joist_sections, joist_number, truss_depth_range, truss_chord_sections))
         return combinations
     else:
         combinations = list(itertools.product(beam_sections, joist_sections, joist_number))
         return combinations
 
-def run_optimization(seed: PlatformInputs | PlatformMixedInputs) -> list[DesignResult]:
-    """
-    Runs a unified optimization loop for both standard and mixed platforms.
-    """
-    results: list[DesignResult] = []
-    if isinstance(seed, PlatformMixedInputs):
-        combinations = generate_combinations(seed)
-        for i, combo in enumerate(combinations):
-            beam_sec, joist_sec, joist_number, truss_depth, truss_section = combo
+Candidate = tuple[PlatformInputs | PlatformMixedInputs, SectionSeed | SectionSeedMixed]
+Progress = Callable[[int, int], None]
 
+def generate_candidates(seed: PlatformInputs | PlatformMixedInputs, windows: dict[str, SectionWindow] | None = None) -> list[Candidate]:
+    """Inputs and sections of every combination of the optimization."""
+    candidates: list[Candidate] = []
+    if isinstance(seed, PlatformMixedInputs):
+        for beam_sec, joist_sec, joist_number, truss_depth, truss_section in generate_combinations(seed, windows):
             current_inputs = seed.model_copy(deep=True)
             current_inputs.nJoist = joist_number
             current_inputs.TrussDepth = truss_depth
-            
+
             sections = SectionSeedMixed(
                 column_cs=25, beam_cs=beam_sec, joist_cs=joist_sec,
                 truss_chord_cs=truss_section, truss_diag_cs=truss_section
             )
-            nodes, lines, members, max_disp_by_type, disp_dict, weight_dict = calculate_model(inputs=current_inputs, sections=sections)
-            results.append(DesignResult(inputs=current_inputs, sections=sections, max_disp_by_type=max_disp_by_type, weight_dict=weight_dict))
-                    
+            candidates.append((current_inputs, sections))
 
-    
     elif isinstance(seed, PlatformInputs):
-        combinations = generate_combinations(seed)
-        for i, combo in enumerate(combinations):
-            beam_sec, joist_sec, joist_number = combo
-            
+        for beam_sec, joist_sec, joist_number in generate_combinations(seed, windows):
             current_inputs = seed.model_copy(deep=True)
             current_inputs.nJoist = joist_number
-            
+
             sections = SectionSeed(
                 column_cs=25, beam_cs=beam_sec, joist_cs=joist_sec
             )
-            nodes, lines, members, max_disp_by_type, disp_dict, weight_dict = calculate_model(inputs=current_inputs, sections=sections)
-            results.append(DesignResult(inputs=current_inputs, sections=sections, max_disp_by_type=max_disp_by_type, weight_dict=weight_dict))
+            candidates.append((current_inputs, sections))
+    return candidates
+
+def candidate_weights(candidates: list[Candidate]) -> np.ndarray:
+    """
+    Total weight (kg) of every candidate without running any analysis. Each geometry is
+    built once; the weight is then the lengths per line type times the section areas.
+    """
+    topologies: dict[str, Topology] = {}
+    type_lengths = np.empty((len(candidates), len(LINE_TYPES)))
+    type_sections = np.empty((len(candidates), len(LINE_TYPES)), dtype=np.int32)
+    for idx, (inputs, sections) in enumerate(candidates):
+        key = type(sections).__name__ + inputs.model_dump_json()
+        if key not in topologies:
+            topologies[key] = Topology(*create_platform(inputs, sections).create_model())
+        type_lengths[idx] = topologies[key].length_by_type
+        type_sections[idx] = type_section_ids(sections.model_dump())
+
+    areas = np.zeros(type_sections.shape)
+    used = type_sections > 0
+    areas[used] = get_catalogue().column("A", type_sections[used])
+    return (type_lengths * areas).sum(axis=1) * Steel.density
+
+def analyse_candidate(candidate: Candidate, fidelity: Fidelity = FULL_FIDELITY, with_scene: bool = False) -> DesignResult:
+    """Analysed design of `candidate`, `with_scene` keeping the deformed shape to draw it."""
+    current_inputs, sections = candidate
+    nodes, lines, members, max_disp_by_type, disp_dict, weight_dict = calculate_model(inputs=current_inputs, sections=sections, fidelity=fidelity)
+    return DesignResult(
+        inputs=current_inputs,
+        sections=sections,
+        max_disp_by_type=max_disp_by_type,
+        weight_dict=weight_dict,
+        scene=Scene.deformed(nodes, lines, members, disp_dict) if with_scene else None,
+    )
+
+def design_with_scene(design: DesignResult) -> DesignResult:
+    """`design` with the deformed shape of its analysis, analysed again when it kept none."""
+    if design.scene is not None:
+        return design
+    return analyse_candidate((design.inputs, design.sections), with_scene=True)
+
+def _analyse_in_order(
+    candidates: list[Candidate],
+    order: list[int],
+    stats: ScreeningStats,
+    deformation_limit: float | None = None,
+    keep_best: int | None = None,
+    coarse: Fidelity | None = None,
+    progress: Progress | None = None,
+    keep_scenes: int = 0,
+) -> list[DesignResult]:
+    """
+    Analyses the candidates in `order` until `keep_best` feasible designs are found.
+    With a `coarse` fidelity (which needs a `deformation_limit`) each candidate is analysed on
+    the coarse mesh first and only re-analysed at full fidelity when the coarse max |ΔZ| is
+    within `REFINE_MARGIN` of the limit.
+    The first `keep_scenes` feasible designs keep their deformed shape.
+    """
+    band = deformation_limit * (1 + REFINE_MARGIN) if coarse is not None else None
+    results: list[DesignResult] = []
+    feasible = 0
+    for rank, idx in enumerate(order):
+        if keep_best is not None and feasible >= keep_best:
+            stats.dominated = len(order) - rank
+            break
+
+        stats.analysed += 1
+        if coarse is not None:
+            coarse_design = analyse_candidate(candidates[idx], coarse)
+            if abs(coarse_design.global_max_disp) >= band:
+                if progress is not None:
+                    progress(rank + 1, len(order))
+                continue
+
+        design = analyse_candidate(candidates[idx], with_scene=feasible < keep_scenes)
+        results.append(design)
+        if coarse is not None:
+            stats.refined += 1
+            if design.global_max_disp:
+                stats.coarse_errors.append(coarse_design.global_max_disp / design.global_max_disp - 1)
+        if deformation_limit is None or abs(design.global_max_disp) < deformation_limit:
+            feasible += 1
+        else:
+            design.scene = None
+        if progress is not None:
+            progress(rank + 1, len(order))
     return results
 
+def run_optimization(
+    seed: PlatformInputs | PlatformMixedInputs,
+    deformation_limit: float | None = None,
+    windows: dict[str, SectionWindow] | None = None,
+    keep_best: int | None = None,
+    coarse: Fidelity | None = None,
+    progress: Progress | None = None,
+    keep_scenes: int = 0,
+) -> OptimizationRun:
+    """
+    Runs a unified optimization loop for both standard and mixed platforms.
+    Candidates are analysed from the lightest to the heaviest. With a `deformation_limit`,
+    candidates whose analytical lower deflection bound already exceeds it are skipped,
+    and with `keep_best` the search stops after that many feasible designs, since every
+    remaining candidate is heavier (dominated). Dominated candidates are only skipped
+    (and counted in the stats) with `keep_best`: the chat's optimization does not set it
+    unless it runs multi-fidelity, as its table lists every valid design.
 
-def store_design_results_as_table(design_results: list[DesignResult]):
+    With a `coarse` fidelity (e.g. `COARSE_FIDELITY`) the candidates are screened on a
+    coarse mesh and the search keeps the best `keep_best` (default `REFINE_TOP_K`) designs
+    verified at full fidelity. The coarse vs fine errors are reported in the stats. The
+    screening needs a `deformation_limit`: without one every candidate would be analysed
+    twice, a ValueError is raised.
+
+    `progress` is called with the number of candidates processed and to process after
+    each one (an upper bound, the search may stop early). It may raise to abort the run.
+
+    Only the `keep_scenes` lightest feasible designs keep the deformed shape of their
+    analysis (to draw them without running them again): a scene is about 10 kB and a
+    sweep may return thousands of designs.
     """
-    Converts a list of DesignResult objects into a simple table structure (headers and data),
-    and stores it as a JSON in vkt.Storage.
+    if coarse is not None and deformation_limit is None:
+        raise ValueError("A multi-fidelity optimization needs a deformation limit to screen the coarse results against")
+    candidates = generate_candidates(seed, windows)
+    weights = candidate_weights(candidates)
+    stats = ScreeningStats(candidates=len(candidates))
+
+    order: list[int] = []
+    for idx in np.argsort(weights, kind="stable").tolist():
+        if deformation_limit is not None:
+            current_inputs, sections = candidates[idx]
+            bounds = deflection_bounds(current_inputs, sections, n_division=JOIST_DIVISIONS)
+            if is_infeasible(bounds, deformation_limit):
+                stats.infeasible += 1
+                continue
+        order.append(idx)
+
+    if coarse is not None:
+        keep_best = keep_best or REFINE_TOP_K
+    results = _analyse_in_order(candidates, order, stats, deformation_limit, keep_best, coarse, progress, keep_scenes)
+    logger.info("Optimization screening: %s", stats)
+    return OptimizationRun(designs=results, stats=stats)
+
+
+def store_design_results_as_table(design_results: list[DesignResult], cases: list[str] | None = None):
+    """
+    Converts a list of DesignResult objects into a simple table structure (headers and rows),
+    and stores it in pages in vkt.Storage (see `app.tools.results_table`). With `cases` (one
+    label per result), results of several optimizations share the table and a leading "Case"
+    column tells them apart.
     """
     if not design_results:
-        table_structure = {"headers": [], "data": []}
+        headers, data = [], []
     else:
         
-        first_result_sections = list(design_results[0].section_names.keys())
-        headers = ["Total Weight (kg)","Max Displacement (mm)","Total Cost (€)", "# Joist"] + first_result_sections
+        section_headers = list(dict.fromkeys(key for result in design_results for key in result.section_names))
+        headers = ["Total Weight (kg)","Max Displacement (mm)","Total Cost (€)", "# Joist"] + section_headers
+        if cases is not None:
+            headers = ["Case"] + headers
 
         data = []
-        for result in design_results:
+        for idx, result in enumerate(design_results):
             row = [
                 round(result.total_weight, 2),
                 round(result.global_max_disp, 4),
                 round(result.total_weight*steel_cost,2),
                 round(result.inputs.nJoist)
             ]
-            row.extend(result.section_names.values())
+            section_names = result.section_names
+            row.extend(section_names.get(key, "") for key in section_headers)
+            if cases is not None:
+                row.insert(0, cases[idx])
             
             data.append(row)
-        
-        table_structure = {"headers": headers, "data": data}
 
-    vkt.Storage().set(
-        "optimization_table",
-        data=vkt.File.from_data(json.dumps(table_structure).encode()),
-        scope="entity",
-    )
+    store_results_table(headers, data)
 
-def last_optimization_result(max_models: int = 10) -> str:
+def read_optimization_table() -> str | None:
+    """Raw JSON of the index of the stored optimization table, None when nothing is stored."""
+    return current_storage().get_text(RESULTS_KEY)
+
+def format_optimization_table(raw: str | None, max_models: int = 10) -> str:
     """
-    Return up to `max_models` results as plain text.
-    The first data row is the best model.
+    Return up to `max_models` results of a stored table, from its index `raw`, as plain text.
+    Only the pages of those results are read. The first data row is the best model.
     """
     try:
-        raw = vkt.Storage().get("optimization_table", scope="entity").getvalue()
-        table = json.loads(raw)
-
-        headers = table.get("headers", [])
-        all_rows = table.get("data", [])
+        headers, rows = query_results(ResultsQuery(rows=max_models), json.loads(raw))
 
-        if not headers or not all_rows:
+        if not headers or not rows:
             return "No optimization results available"
 
-        rows = all_rows[: max_models]
-
         lines = [", ".join(map(str, headers))]
         for row in rows:
             lines.append(", ".join(map(str, row)))
 
-        print(lines)
+        logger.debug("Optimization table rows: %s", lines)
         return "Optimal model is in the first row\n" + "\n".join(lines)
 
     except Exception:
-        return "No optimization results available"
\ No newline at end of file
+        return "No optimization results available"
+
+def last_optimization_result(max_models: int = 10) -> str:
+    """
+    Return up to `max_models` results as plain text.
+    The first data row is the best model.
+    """
+    return format_optimization_table(read_optimization_table(), max_models)
@@ -0,0 +1,107 @@
+"""
+Bounded LRU memo of tool results.
+
+The LLM often re-emits the arguments of a previous tool call (to show the model
+again while answering a question). Tool runs are pure, so their output can be
+reused: results are keyed by a canonical hash of the tool name and arguments.
+"""
+import json
+import hashlib
+import logging
+import threading
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Generic, TypeVar
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+ToolT = TypeVar("ToolT", bound=BaseModel)
+ResultT = TypeVar("ResultT")
+
+
+def payload_key(tool: BaseModel) -> str:
+    """Hash of the tool name and its arguments, independent of the field order."""
+    payload = json.dumps(
+        {"tool": type(tool).__name__, "arguments": tool.model_dump(mode="json")},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@dataclass
+class MemoStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    nbytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.hits} hits, {self.misses} misses ({self.hit_rate:.0%} hit rate), "
+            f"{self.entries} entries, {self.nbytes / 1e6:.1f} MB, {self.evictions} evicted"
+        )
+
+
+class ToolMemo(Generic[ToolT, ResultT]):
+    """
+    Least recently used results, bounded by `max_entries` and by the total `sizeof`
+    of the results (e.g. the length of the figure JSON) in `max_bytes`.
+    """
+
+    def __init__(self, max_entries: int = 32, max_bytes: int = 64 * 2**20, sizeof: Callable[[ResultT], int] = lambda _: 0) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.stats = MemoStats()
+        self._entries: OrderedDict[str, tuple[ResultT, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, tool: ToolT) -> ResultT | None:
+        key = payload_key(tool)
+        with self._lock:
+            if key not in self._entries:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            result = self._entries[key][0]
+        logger.info("%s result reused from the memo: %s", type(tool).__name__, self.stats)
+        return result
+
+    def store(self, tool: ToolT, result: ResultT) -> None:
+        key = payload_key(tool)
+        size = self.sizeof(result)
+        with self._lock:
+            if key not in self._entries and size <= self.max_bytes:
+                self._entries[key] = (result, size)
+                self.stats.nbytes += size
+                self._evict()
+            self.stats.entries = len(self._entries)
+
+    def get_or_run(self, tool: ToolT, run: Callable[[ToolT], ResultT]) -> ResultT:
+        result = self.lookup(tool)
+        if result is None:
+            result = run(tool)
+            self.store(tool, result)
+        return result
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries or self.stats.nbytes > self.max_bytes:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.stats.nbytes -= size
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.stats = MemoStats()
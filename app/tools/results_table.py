@@ -0,0 +1,159 @@
+"""
+Optimization results table, stored in pages so its readers load only the rows they show.
+
+A sweep may return thousands of valid designs. The table is stored as a small index
+under `RESULTS_KEY` (headers, row count and, per order of the rows, the number of
+pages and the lowest weight and |ΔZ| of every page) and pages of `PAGE_SIZE` rows
+under keys of their own. All rows are paged in the order of the optimization (the
+lightest first, per case); the first `SORTED_PAGES` pages are also stored sorted by
+every column of `SORTS`.
+
+A query for the top N rows by a column within limits reads the index and walks the
+pages of that order, skipping pages with no row within the limits, until it has N
+rows: the prompt (first rows) and the table view read one or two pages whatever the
+size of the sweep. Only when the sorted pages run out before N rows are found, the
+query falls back to filtering the pages in the optimization order.
+"""
+from __future__ import annotations
+
+import uuid
+
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Callable, Iterator
+
+from app.storage import current_storage
+
+RESULTS_KEY = "optimization_table"
+PAGE_SIZE = 200
+SORTED_PAGES = 2
+RANK = "rank"  # Order of the optimization, the best design first
+WEIGHT_HEADER, DISP_HEADER = "Total Weight (kg)", "Max Displacement (mm)"
+# Sort options of the table, ascending (the displacement by absolute value). The cost
+# is proportional to the weight, it has no order of its own.
+SORTS = {"weight": WEIGHT_HEADER, "displacement": DISP_HEADER, "joists": "# Joist"}
+
+
+@dataclass(frozen=True)
+class ResultsQuery:
+    sort: str = RANK
+    rows: int = 10
+    max_weight: float | None = None  # kg
+    max_displacement: float | None = None  # Max |ΔZ| (mm)
+
+    def skips(self, zone: list[float]) -> bool:
+        """Whether a page with the lowest weight and |ΔZ| of `zone` has no row within the limits."""
+        min_weight, min_disp = zone
+        return (self.max_weight is not None and min_weight > self.max_weight) or (
+            self.max_displacement is not None and min_disp > self.max_displacement
+        )
+
+    def accepts(self, row: list[Any], headers: list[str]) -> bool:
+        weight, disp = _limit_values(row, headers)
+        return (self.max_weight is None or weight <= self.max_weight) and (
+            self.max_displacement is None or disp <= self.max_displacement
+        )
+
+
+def page_key(table_id: str, order: str, page: int) -> str:
+    return f"{RESULTS_KEY}/{table_id}/{order}/{page}"
+
+
+def _limit_values(row: list[Any], headers: list[str]) -> tuple[float, float]:
+    return row[headers.index(WEIGHT_HEADER)], abs(row[headers.index(DISP_HEADER)])
+
+
+def _sort_key(order: str, headers: list[str]) -> Callable[[list[Any]], Any] | None:
+    if SORTS.get(order) not in headers:
+        return None
+    column = headers.index(SORTS[order])
+    if order == "displacement":
+        return lambda row: abs(row[column])
+    return lambda row: row[column]
+
+
+def _page_keys(index: dict[str, Any]) -> list[str]:
+    return [
+        page_key(index["id"], order, page)
+        for order, pages in index.get("orders", {}).items()
+        for page in range(len(pages["zones"]))
+    ]
+
+
+def store_results_table(headers: list[str], rows: list[list[Any]]) -> None:
+    """
+    Stores the pages of `rows`, in the optimization order and sorted by every column of
+    `SORTS`, then their index, and deletes the pages of the table stored before.
+    """
+    storage = current_storage()
+    previous = storage.get_json(RESULTS_KEY)
+    index: dict[str, Any] = {"id": uuid.uuid4().hex[:12], "headers": headers, "rows": len(rows), "page_size": PAGE_SIZE, "orders": {}}
+    orders = {RANK: (rows, True)}
+    if rows:
+        sorted_rows = SORTED_PAGES * PAGE_SIZE
+        for order in (order for order, header in SORTS.items() if header in headers):
+            orders[order] = (sorted(rows, key=_sort_key(order, headers))[:sorted_rows], len(rows) <= sorted_rows)
+
+    for order, (ordered, complete) in orders.items():
+        zones = []
+        for page, start in enumerate(range(0, len(ordered), PAGE_SIZE)):
+            chunk = ordered[start : start + PAGE_SIZE]
+            storage.set_json(page_key(index["id"], order, page), chunk)
+            limits = [_limit_values(row, headers) for row in chunk]
+            zones.append([min(weight for weight, _ in limits), min(disp for _, disp in limits)])
+        index["orders"][order] = {"zones": zones, "complete": complete}
+    # The index last: readers never see an index whose pages are not stored yet
+    storage.set_json(RESULTS_KEY, index)
+    if isinstance(previous, dict) and "id" in previous:
+        for key in _page_keys(previous):
+            storage.delete(key)
+
+
+def clear_results_table() -> None:
+    """Deletes the stored table and its pages."""
+    storage = current_storage()
+    if not storage.exists(RESULTS_KEY):
+        return
+    index = storage.get_json(RESULTS_KEY)
+    if isinstance(index, dict) and "id" in index:
+        for key in _page_keys(index):
+            storage.delete(key)
+    storage.delete(RESULTS_KEY)
+
+
+def _walk(index: dict[str, Any], order: str, query: ResultsQuery) -> Iterator[list[Any]]:
+    """Rows of `order` within the limits of `query`, reading the pages as they are reached."""
+    storage, headers = current_storage(), index["headers"]
+    for page, zone in enumerate(index["orders"][order]["zones"]):
+        if query.skips(zone):
+            continue
+        rows = storage.get_json(page_key(index["id"], order, page)) or []
+        yield from (row for row in rows if query.accepts(row, headers))
+
+
+def _select(rows: list[list[Any]], headers: list[str], query: ResultsQuery) -> list[list[Any]]:
+    """Top rows of `query` among all `rows`, filtered and sorted in memory."""
+    rows = [row for row in rows if query.accepts(row, headers)]
+    key = _sort_key(query.sort, headers)
+    return (sorted(rows, key=key) if key else rows)[: query.rows]
+
+
+def query_results(query: ResultsQuery = ResultsQuery(), index: dict[str, Any] | None = None) -> tuple[list[str], list[list[Any]]]:
+    """
+    Headers and top `query.rows` rows of the stored table, sorted by `query.sort` and
+    within its limits. `index` is the stored index, read when not given. No headers
+    when nothing is stored.
+    """
+    index = current_storage().get_json(RESULTS_KEY) if index is None else index
+    if not isinstance(index, dict) or not index.get("headers"):
+        return [], []
+    headers = index["headers"]
+    if "data" in index:
+        # A table stored in one piece, before it was paged
+        return headers, _select(index["data"], headers, query)
+
+    order = query.sort if query.sort in index["orders"] else RANK
+    rows = list(islice(_walk(index, order, query), query.rows))
+    if len(rows) < query.rows and not index["orders"][order]["complete"]:
+        rows = _select(list(_walk(index, RANK, query)), headers, query)
+    return headers, rows
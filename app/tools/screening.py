@@ -0,0 +1,91 @@
+"""
+Closed-form deflection bound used to discard optimization candidates before
+they reach OpenSees.
+
+The live load is applied as equal point loads on every joist node (see
+`calculate_model`). For one joist, or one beam loaded by the joists, the
+deflection at its nodes is bounded from below by an idealised beam with
+fixed-fixed ends carrying the same point loads: the stiffest the real
+connections can be, relative to the supports, which themselves only move down.
+Self weight is left out, so the bound stays conservative.
+
+Only the lower bound is derived. The simply supported idealisation is no upper
+bound of the FE deflection (the FE model was more than twice as flexible in sweeps
+of 4000x6000 and 12000x5000 platforms), and nothing needs one: a candidate is
+discarded when even its lower bound exceeds the limit.
+"""
+import numpy as np
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+from app.db.catalogue import get_catalogue
+from app.schemas import PlatformInputs, PlatformMixedInputs, SectionSeed, SectionSeedMixed
+from app.types import Steel
+
+# Joist torsion adds a tiny restraint to the beams that the fixed-fixed idealisation ignores
+LOWER_BOUND_MARGIN: float = 0.9
+
+
+@dataclass(frozen=True)
+class DeflectionBounds:
+    lower: float  # mm, the FE max |ΔZ| is never below this
+
+
+def _point_load_deflection(a: np.ndarray, x: np.ndarray, fixed: bool) -> np.ndarray:
+    """Deflection at x of a unit span beam (EI = 1) under a unit load at a, for x <= a."""
+    b = 1.0 - a
+    if fixed:
+        return b**2 * x**2 * (3 * a - (3 * a + b) * x) / 6.0
+    return b * x * (1.0 - b**2 - x**2) / 6.0
+
+
+@lru_cache(maxsize=64)
+def deflection_coefficient(n_loads: int, fixed: bool) -> float:
+    """
+    Max nodal deflection of a unit span beam (EI = 1) with unit point loads at the
+    `n_loads` interior nodes of an equally divided span: δ = coefficient · P L³ / EI.
+    """
+    positions = np.arange(1, n_loads + 1) / (n_loads + 1)
+    a, x = np.meshgrid(positions, positions, indexing="ij")
+    left = x <= a
+    deflection = np.where(
+        left,
+        _point_load_deflection(a, x, fixed),
+        _point_load_deflection(1.0 - a, 1.0 - x, fixed),  # mirrored load case
+    )
+    return float(deflection.sum(axis=0).max())
+
+
+def deflection_bounds(
+    inputs: PlatformInputs | PlatformMixedInputs,
+    sections: SectionSeed | SectionSeedMixed,
+    n_division: int,
+) -> DeflectionBounds:
+    """Lower bound on the max |ΔZ| (mm) of a platform from the joist and beam sections."""
+    catalogue = get_catalogue()
+    E = Steel.E
+    mixed = isinstance(inputs, PlatformMixedInputs) and isinstance(sections, SectionSeedMixed)
+
+    # Same load as `calculate_model`: equal point loads on every joist node
+    load = inputs.distLoad * (inputs.xLenght / 1000) * (inputs.yLenght / 1000) * 1000
+    P = load / (inputs.nJoist * (n_division + 2))
+
+    # Joists span x between the bearers, loaded at their `n_division` interior nodes
+    EI_joist = E * catalogue.column("Iz", [sections.joist_cs])[0]
+    joist_factor = P * inputs.xLenght**3 / EI_joist
+    lower = deflection_coefficient(n_division, fixed=True) * joist_factor
+
+    if mixed:
+        return DeflectionBounds(lower=float(LOWER_BOUND_MARGIN * lower))
+
+    # Beams span y between the columns and carry, at every joist, the end node load plus half the joist
+    EI_beam = E * catalogue.column("Iz", [sections.beam_cs])[0]
+    beam_factor = P * (1 + n_division / 2) * inputs.yLenght**3 / EI_beam
+    lower += deflection_coefficient(inputs.nJoist, fixed=True) * beam_factor
+    return DeflectionBounds(lower=float(LOWER_BOUND_MARGIN * lower))
+
+
+def is_infeasible(bounds: DeflectionBounds, deformation_limit: float) -> bool:
+    """True when no analysis can bring the max |ΔZ| under the limit."""
+    return bounds.lower >= deformation_limit
@@ -55,6 +55,7 @@ class Steel:
     name: Literal["Steel"] = "Steel"
     G: float = 0.25 * 10**3
     gamma: float = 7.85 * 10**-5
+    density: float = 7.85 * 10**-6 # kg/mm³
     E: float = 200 * 10**3
     units: Literal["N,mm"] = "N,mm"
 
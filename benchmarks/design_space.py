@@ -0,0 +1,78 @@
+"""
+Design space view of large sweeps: a synthetic sweep of designs (random sections
+of the catalogue, weights and displacements) built as ``DesignResult`` objects.
+Compares the hover texts from per-row ``DesignResult.section_names`` (one
+catalogue lookup per design and member group) with the columnar ``DesignSpace``
+and its precomputed lookup, and reports the stored payload, the figure JSON and
+the time to build it. Run from the repository root:
+
+    python -m benchmarks.design_space
+"""
+import time
+
+import numpy as np
+
+from app.db.catalogue import get_catalogue
+from app.plots.design_space import DesignSpace, design_space_figure, hover_texts, render_design_space
+from app.schemas import DesignResult, PlatformInputs, SectionSeed
+
+SIZES = (1_000, 10_000, 50_000)
+LIMIT = 50.0
+
+
+def synthetic_designs(count: int, seed: int = 0) -> list[DesignResult]:
+    rng = np.random.default_rng(seed)
+    ids = get_catalogue().ids
+    inputs = [PlatformInputs(xLenght=8000, yLenght=14000, height=4000, nJoist=n, distLoad=5) for n in range(4, 13)]
+    designs = []
+    for _ in range(count):
+        beam, joist = rng.choice(ids, 2).tolist()
+        designs.append(
+            DesignResult(
+                inputs=inputs[rng.integers(len(inputs))],
+                sections=SectionSeed(column_cs=25, beam_cs=beam, joist_cs=joist),
+                max_disp_by_type={"Joist": -float(rng.gamma(4.0, 12.0))},
+                weight_dict={"Joist": float(rng.uniform(2_000, 12_000))},
+            )
+        )
+    return designs
+
+
+def per_row_texts(designs: list[DesignResult]) -> list[str]:
+    """Hover texts as the table builds its rows, `section_names` per design."""
+    return [
+        f"{design.total_weight:.0f} kg, {design.global_max_disp:.2f} mm<br>{design.inputs.nJoist} joists<br>"
+        + "<br>".join(f"{key}: {name}" for key, name in design.section_names.items())
+        for design in designs
+    ]
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    # Imports plotly and loads the catalogue before timing
+    render_design_space.__wrapped__(DesignSpace.from_designs(synthetic_designs(10), LIMIT).pack())
+    print(
+        f"{'designs':>8}{'per row [ms]':>14}{'columnar [ms]':>15}{'payload [kB]':>14}"
+        f"{'figure [ms]':>13}{'JSON [kB]':>11}{'traces':>8}"
+    )
+    for count in SIZES:
+        designs = synthetic_designs(count)
+        per_row, _ = timed(lambda: per_row_texts(designs))
+        columnar, space = timed(lambda: DesignSpace.from_designs(designs, LIMIT).with_lookup())
+        texts, _ = timed(lambda: hover_texts(space))
+        data = space.pack()
+        figure_time, figure_json = timed(lambda: render_design_space.__wrapped__(data))
+        traces = len(design_space_figure(space).data)
+        print(
+            f"{count:>8}{per_row * 1000:>14.1f}{(columnar + texts) * 1000:>15.1f}{len(data) / 1000:>14.1f}"
+            f"{figure_time * 1000:>13.1f}{len(figure_json) / 1000:>11.1f}{traces:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Figure JSON size and build time of every level of detail (full prisms, single
+sided prisms, centrelines) for platforms of increasing member count, and the
+level picked by default. The deformed shapes use a synthetic sag instead of an
+analysis, so large models build quickly. Run from the repository root:
+
+    python -m benchmarks.detail_levels
+"""
+import time
+import typing
+
+import numpy as np
+
+from app.db.members import create_members, load_sections_db
+from app.geometry.platform import Platform
+from app.plots.mesh import DetailLevel, detail_level
+from app.plots.model_defo import plot_deformed_mesh
+from app.plots.model_viz import plot_3d_model
+
+CASES = {
+    "7 joists": dict(nJoist=7, nDivision=7),
+    "60 joists": dict(nJoist=60, nDivision=20),
+    "200 joists": dict(nJoist=200, nDivision=30),
+}
+
+
+def sag(nodes) -> dict[int, float]:
+    """Vertical displacement of a plate simply supported on its edges, 20 mm at mid span."""
+    x, y, _ = nodes.xyz.T
+    span_x, span_y = np.ptp(x) or 1.0, np.ptp(y) or 1.0
+    disp = -20.0 * np.sin(np.pi * (x - x.min()) / span_x) * np.sin(np.pi * (y - y.min()) / span_y)
+    return dict(zip(nodes.ids.tolist(), disp.tolist()))
+
+
+def timed(build) -> tuple[float, int]:
+    start = time.perf_counter()
+    size = len(build().to_json())
+    return time.perf_counter() - start, size
+
+
+def main() -> None:
+    cross_sections = load_sections_db()
+    print(f"{'model':<12}{'members':>8}  {'detail':<14}{'model [kB]':>11}{'[ms]':>8}{'deformed [kB]':>15}{'[ms]':>8}")
+    for name, kwargs in CASES.items():
+        nodes, lines = Platform(xLenght=8000, yLenght=14000, height=4000, **kwargs).create_model()
+        members = create_members(lines=lines, column_cs=25, beam_cs=18, joist_cs=14, truss_chord_cs=1, truss_diag_cs=1)
+        disp_dict = sag(nodes)
+        default = detail_level(len(members))
+        for detail in typing.get_args(DetailLevel):
+            model_s, model_size = min(
+                timed(lambda: plot_3d_model(nodes, lines, members, cross_sections, detail=detail)) for _ in range(3)
+            )
+            defo_s, defo_size = min(
+                timed(lambda: plot_deformed_mesh(nodes, lines, members, cross_sections, disp_dict, detail=detail))
+                for _ in range(3)
+            )
+            label = detail + (" *" if detail == default else "")
+            print(
+                f"{name:<12}{len(members):>8}  {label:<14}{model_size / 1000:>11.1f}{model_s * 1000:>8.1f}"
+                f"{defo_size / 1000:>15.1f}{defo_s * 1000:>8.1f}"
+            )
+            name = ""
+    print("* level picked by default")
+
+
+if __name__ == "__main__":
+    main()
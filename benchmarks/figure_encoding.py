@@ -0,0 +1,88 @@
+"""
+Size and (de)serialization time of the view figures: ``Figure.to_json`` against
+``compact_figure_json`` (float32 or integer coordinates quantized to a precision,
+smallest index types, no template or default values). Parsing is timed as the
+view client does it, ``json.loads`` and decoding of the typed arrays. Run from
+the repository root:
+
+    python -m benchmarks.figure_encoding
+"""
+import base64
+import gzip
+import json
+import time
+
+import numpy as np
+
+from app.db.members import create_members, load_sections_db
+from app.geometry.platform import Platform
+from app.plots.model_defo import plot_deformed_mesh
+from app.plots.model_viz import plot_3d_model
+from app.plots.payload import compact_figure_json
+from app.tools.analysis_tools import calculate_model
+from app.tools.model_tools import generate_model_inputs
+from benchmarks.detail_levels import sag
+from benchmarks.mesh_traces import CASES
+
+ENCODINGS = {
+    "to_json (before)": lambda figure: figure.to_json(),
+    "compact, 0.1 mm": lambda figure: compact_figure_json(figure, precision=0.1),
+    "compact, 1 mm": lambda figure: compact_figure_json(figure, precision=1),
+    "compact, exact": lambda figure: compact_figure_json(figure, precision=None),
+}
+
+
+def decode_arrays(obj) -> None:
+    """Decodes the typed arrays of a parsed figure in place, as plotly.js does on load."""
+    items = obj.items() if isinstance(obj, dict) else enumerate(obj) if isinstance(obj, list) else ()
+    for key, value in items:
+        if isinstance(value, dict) and "bdata" in value:
+            obj[key] = np.frombuffer(base64.b64decode(value["bdata"]), dtype=value["dtype"])
+        else:
+            decode_arrays(value)
+
+
+def parse(figure_json: str) -> None:
+    decode_arrays(json.loads(figure_json))
+
+
+def best_of(function, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def figures() -> dict[str, object]:
+    cross_sections = load_sections_db()
+    built = {}
+    for name, (inputs, sections) in CASES.items():
+        nodes, lines, members, _ = generate_model_inputs(inputs=inputs, sections=sections)
+        _, _, _, _, disp_dict, _ = calculate_model(inputs=inputs, sections=sections)
+        built[f"{name} model"] = plot_3d_model(nodes, lines, members, cross_sections)
+        built[f"{name} deformed"] = plot_deformed_mesh(nodes, lines, members, cross_sections, disp_dict)
+    nodes, lines = Platform(xLenght=8000, yLenght=14000, height=4000, nJoist=60, nDivision=20).create_model()
+    members = create_members(lines=lines, column_cs=25, beam_cs=18, joist_cs=14, truss_chord_cs=1, truss_diag_cs=1)
+    built["Platform (60 joists) deformed"] = plot_deformed_mesh(nodes, lines, members, cross_sections, sag(nodes))
+    return built
+
+
+def main() -> None:
+    print(f"{'figure':<38}{'encoding':<18}{'JSON [kB]':>11}{'gzip [kB]':>11}{'write [ms]':>12}{'parse [ms]':>12}")
+    for name, figure in figures().items():
+        for encoding, serialize in ENCODINGS.items():
+            figure_json = serialize(figure)
+            write = best_of(lambda: serialize(figure))
+            read = best_of(lambda: parse(figure_json))
+            packed = len(gzip.compress(figure_json.encode(), compresslevel=6))
+            print(
+                f"{name:<38}{encoding:<18}{len(figure_json) / 1000:>11.1f}{packed / 1000:>11.1f}"
+                f"{write * 1000:>12.1f}{read * 1000:>12.2f}"
+            )
+            name = ""
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Cold start import profile of the app, from ``python -X importtime``.
+
+Reports the time to import ``app.controller`` (what a VIKTOR worker does on
+start up), which of the heavy dependencies it pulls in, and what each of them
+costs when it is loaded on first use instead. Run from the repository root:
+
+    python -m benchmarks.import_time
+"""
+import os
+import subprocess
+import sys
+
+# Loaded on first use only: tools, plots, LLM client and the debug plot helper
+DEFERRED = ("plotly.graph_objects", "openseespy.opensees", "instructor", "openai", "matplotlib.pyplot", "app.tools.analysis_tools")
+
+
+def import_profile(statement: str) -> dict[str, int]:
+    """Cumulative import time (us) of every module imported by `statement`, in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        check=True,
+    )
+    profile: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        profile.setdefault(name.strip(), int(cumulative))
+    return profile
+
+
+def main(repeat: int = 3) -> None:
+    startup = min((import_profile("import app.controller") for _ in range(repeat)), key=lambda profile: profile["app.controller"])
+    print(f"import app.controller: {startup['app.controller'] / 1000:8.1f} ms (viktor {startup['viktor'] / 1000:.1f} ms)")
+
+    print(f"\n{'module':<28}{'at startup':>12}{'on first use [ms]':>20}")
+    deferred_total = 0
+    for module in DEFERRED:
+        alone = min(import_profile(f"import {module}")[module] for _ in range(repeat))
+        loaded = module in startup
+        if not loaded:
+            deferred_total += alone
+        print(f"{module:<28}{'yes' if loaded else 'no':>12}{alone / 1000:>20.1f}")
+    print(f"\nDeferred from start up: {deferred_total / 1000:.1f} ms (upper bound, the modules share dependencies)")
+
+
+if __name__ == "__main__":
+    main()
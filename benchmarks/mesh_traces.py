@@ -0,0 +1,222 @@
+"""
+Member and load arrow meshes: one Mesh3d trace per member and two per arrow
+(the former ``add_beam_mesh`` loop) against the vectorized merged meshes of
+``app.plots.mesh``. Reports traces, figure JSON size and build time (traces and
+``to_json``), and checks the merged prisms match the per-member vertices. Run
+from the repository root:
+
+    python -m benchmarks.mesh_traces
+"""
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+
+from app.db.members import load_sections_db
+from app.plots.mesh import prism_meshes_by_colour, prism_vertices
+from app.plots.model_defo import plot_deformed_mesh
+from app.plots.model_viz import PASTEL_PALETTE, plot_3d_model
+from app.schemas import PlatformInputs, PlatformMixedInputs, SectionSeed, SectionSeedMixed
+from app.tools.analysis_tools import calculate_model
+from app.tools.model_tools import generate_model_inputs
+
+SECTIONS = dict(column_cs=25, beam_cs=18, joist_cs=14)
+MIXED_SECTIONS = SectionSeedMixed(**SECTIONS, truss_chord_cs=1, truss_diag_cs=1)
+
+CASES = {
+    "Platform (7 joists)": (PlatformInputs(xLenght=8000, yLenght=14000, height=4000, nJoist=7, distLoad=5), SectionSeed(**SECTIONS)),
+    "Mixed platform (9 joists)": (
+        PlatformMixedInputs(xLenght=8000, yLenght=14000, height=4000, nJoist=9, distLoad=5, TrussDir="x", TrussDepth=900),
+        MIXED_SECTIONS,
+    ),
+}
+
+Vec3 = np.ndarray
+
+
+# The per-shape drawing the merged meshes replaced, kept here as the baseline
+def compute_beam_vertices_rect(A: Vec3, B: Vec3, width: float, height: float) -> np.ndarray:
+    v = B - A
+    length = np.linalg.norm(v)
+    if length == 0:
+        raise ValueError("member with zero length")
+    v_hat = v / length
+
+    # pick whichever world‑axis is most perpendicular to v_hat
+    axes = [np.array([1,0,0]), np.array([0,1,0]), np.array([0,0,1])]
+    helper = min(axes, key=lambda ax: abs(np.dot(v_hat, ax)))
+
+    # build a clean 2D frame
+    local_y = np.cross(v_hat, helper)
+    local_y /= np.linalg.norm(local_y)
+    local_z = np.cross(v_hat, local_y)
+    local_z /= np.linalg.norm(local_z)
+
+    local_y *= width  / 2.0
+    local_z *= height / 2.0
+
+    # eight corners
+    v0 = A + local_y + local_z
+    v1 = A + local_y - local_z
+    v2 = A - local_y - local_z
+    v3 = A - local_y + local_z
+    v4 = B + local_y + local_z
+    v5 = B + local_y - local_z
+    v6 = B - local_y - local_z
+    v7 = B - local_y + local_z
+    return np.stack([v0, v1, v2, v3, v4, v5, v6, v7])
+
+def add_beam_mesh(fig: go.Figure, verts: np.ndarray, color: str) -> None:
+    """Insert one rectangular prism into the figure, drawing both sides of each face."""
+    # define each face by four verts (a,b,c,d)
+    quads = [
+        (0, 1, 2, 3),  # face at A
+        (4, 5, 6, 7),  # face at B
+        (0, 1, 5, 4),
+        (1, 2, 6, 5),
+        (2, 3, 7, 6),
+        (3, 0, 4, 7),
+    ]
+
+    i_list, j_list, k_list = [], [], []
+    for a, b, c, d in quads:
+        # two triangles per quad
+        # 1) a→b→c
+        i_list.append(a); j_list.append(b); k_list.append(c)
+        # 2) a→c→d
+        i_list.append(a); j_list.append(c); k_list.append(d)
+
+        # duplicate them reversed so back faces show
+        # 3) a→c→b
+        i_list.append(a); j_list.append(c); k_list.append(b)
+        # 4) a→d→c
+        i_list.append(a); j_list.append(d); k_list.append(c)
+
+    fig.add_trace(
+        go.Mesh3d(
+            x=verts[:, 0],
+            y=verts[:, 1],
+            z=verts[:, 2],
+            i=i_list,
+            j=j_list,
+            k=k_list,
+            color=color,
+            # draw both sides, disable flat shading to simplify
+            flatshading=False,
+            opacity=1.0,
+            hoverinfo="skip",
+            lighting=dict(ambient=0.5, diffuse=0.7, specular=0.3, roughness=0.9),
+            showscale=False,
+        )
+    )
+
+
+def compute_cylinder_mesh(
+    base_center: Vec3,
+    height: float,
+    radius: float,
+    segments: int = 16
+) -> tuple[np.ndarray, list[int], list[int], list[int]]:
+    """Return verts and faces for a vertical cylinder pointing down from base_center."""
+    theta = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+    xs = radius * np.cos(theta)
+    ys = radius * np.sin(theta)
+    # top circle at z = base_z
+    top = np.vstack([base_center + np.array([x, y, 0]) for x, y in zip(xs, ys)])
+    # bottom circle at z = base_z - height
+    bottom = np.vstack([base_center + np.array([x, y, -height]) for x, y in zip(xs, ys)])
+    verts = np.vstack([top, bottom])
+    i_list = []
+    j_list = []
+    k_list = []
+    for i in range(segments):
+        ni = (i + 1) % segments
+        # triangle top→bottom→bottom next
+        i_list += [i, i]
+        j_list += [i + segments, ni + segments]
+        k_list += [ni, ni + segments]
+        # reversed for backface
+        i_list += [i, i]
+        j_list += [ni + segments, i + segments]
+        k_list += [i + segments, ni]
+    return verts, i_list, j_list, k_list
+
+def compute_cone_mesh(
+    base_center: Vec3,
+    height: float,
+    radius: float,
+    segments: int = 16
+) -> tuple[np.ndarray, list[int], list[int], list[int]]:
+    """Return verts and faces for a downward‐pointing cone at base_center."""
+    theta = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+    xs = radius * np.cos(theta)
+    ys = radius * np.sin(theta)
+    # circle at base_center
+    base = np.vstack([base_center + np.array([x, y, 0]) for x, y in zip(xs, ys)])
+    tip = base_center + np.array([0, 0, -height])
+    verts = np.vstack([base, tip])
+    tip_idx = len(verts) - 1
+    i_list = []
+    j_list = []
+    k_list = []
+    for i in range(segments):
+        ni = (i + 1) % segments
+        # triangle base[i]→base[ni]→tip
+        i_list += [i, i]
+        j_list += [ni, tip_idx]
+        k_list += [tip_idx, ni]
+    return verts, i_list, j_list, k_list
+
+
+def per_member_figure(nodes, lines, members, cross_sections) -> go.Figure:
+    """Members and load arrows of `plot_3d_model` as drawn before, one trace per shape."""
+    fig = go.Figure()
+    cs_ids = np.unique(members.cross_section_ids).tolist()
+    color_map = {cs_id: PASTEL_PALETTE[i % len(PASTEL_PALETTE)] for i, cs_id in enumerate(cs_ids)}
+    line_rows = lines.rows(members.ids)
+    for A, B, cs_id in zip(nodes.coords(lines.ni[line_rows]), nodes.coords(lines.nj[line_rows]), members.cross_section_ids.tolist()):
+        h = float(cross_sections[cs_id]["h"])
+        add_beam_mesh(fig, compute_beam_vertices_rect(A, B, h, h), color_map[cs_id])
+    for base in nodes.coords(lines.nodes_of_type("Joist")) + np.array([0.0, 0.0, 700.0]):
+        verts, i, j, k = compute_cylinder_mesh(base, 320.0, 16.0)
+        fig.add_trace(go.Mesh3d(x=verts[:, 0], y=verts[:, 1], z=verts[:, 2], i=i, j=j, k=k, color="red"))
+        verts, i, j, k = compute_cone_mesh(base + np.array([0.0, 0.0, -320.0]), 80.0, 60.0)
+        fig.add_trace(go.Mesh3d(x=verts[:, 0], y=verts[:, 1], z=verts[:, 2], i=i, j=j, k=k, color="red"))
+    return fig
+
+
+def timed(build) -> tuple[float, go.Figure, int]:
+    start = time.perf_counter()
+    fig = build()
+    size = len(fig.to_json())
+    return time.perf_counter() - start, fig, size
+
+
+def main() -> None:
+    cross_sections = load_sections_db()
+    print(f"{'model':<30}{'figure':<22}{'members':>8}{'traces':>8}{'JSON [kB]':>11}{'build [ms]':>12}")
+    for name, (inputs, sections) in CASES.items():
+        nodes, lines, members, _ = generate_model_inputs(inputs=inputs, sections=sections)
+
+        line_rows = lines.rows(members.ids)
+        starts, ends = nodes.coords(lines.ni[line_rows]), nodes.coords(lines.nj[line_rows])
+        heights = np.array([float(cross_sections[cs_id]["h"]) for cs_id in members.cross_section_ids.tolist()])
+        merged = prism_vertices(starts, ends, heights, heights)
+        looped = np.stack([compute_beam_vertices_rect(A, B, h, h) for A, B, h in zip(starts, ends, heights)])
+        assert np.allclose(merged, looped), "merged prisms differ from the per-member vertices"
+
+        _, _, _, _, disp_dict, _ = calculate_model(inputs=inputs, sections=sections)
+        rows = {
+            "per member (before)": lambda: per_member_figure(nodes, lines, members, cross_sections),
+            "merged members": lambda: go.Figure(prism_meshes_by_colour(merged, ["#E416C1"] * len(merged))),
+            "plot_3d_model": lambda: plot_3d_model(nodes, lines, members, cross_sections),
+            "plot_deformed_mesh": lambda: plot_deformed_mesh(nodes, lines, members, cross_sections, disp_dict),
+        }
+        for label, build in rows.items():
+            seconds, fig, size = min((timed(build) for _ in range(3)), key=lambda run: run[0])
+            print(f"{name:<30}{label:<22}{len(members):>8}{len(fig.data):>8}{size / 1000:>11.1f}{seconds * 1000:>12.1f}")
+            name = ""
+
+
+if __name__ == "__main__":
+    main()
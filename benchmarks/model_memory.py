@@ -0,0 +1,50 @@
+"""
+Memory held per platform model: array-backed tables vs. the former dict-of-dicts.
+
+Run from the repository root:
+
+    python -m benchmarks.model_memory
+"""
+import gc
+import tracemalloc
+
+from app.geometry.platform import Platform, PlatformMixed
+from app.db.members import create_members
+
+
+def _measure(build) -> tuple[int, object]:
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, obj
+
+
+def _build(platform_cls, **kwargs):
+    nodes, lines = platform_cls(**kwargs).create_model()
+    members = create_members(lines=lines, column_cs=25, beam_cs=18, joist_cs=14, truss_chord_cs=1, truss_diag_cs=1)
+    return nodes, lines, members
+
+
+def main() -> None:
+    cases = {
+        "Platform (7 joists)": (Platform, dict(xLenght=8000, yLenght=14000, height=4000, nJoist=7, nDivision=7)),
+        "PlatformMixed (9 joists)": (
+            PlatformMixed,
+            dict(xLenght=8000, yLenght=14000, height=4000, nJoist=9, TrussDir="x", TrussDepth=900, nDivision=7),
+        ),
+    }
+    print(f"{'model':<26}{'nodes':>7}{'lines':>7}{'tables [B]':>13}{'dicts [B]':>12}{'ratio':>8}")
+    for name, (platform_cls, kwargs) in cases.items():
+        tables_bytes, tables = _measure(lambda: _build(platform_cls, **kwargs))
+        dicts_bytes, _ = _measure(lambda: tuple(table.to_dict() for table in tables))
+        nodes, lines, _ = tables
+        print(
+            f"{name:<26}{len(nodes):>7}{len(lines):>7}{tables_bytes:>13}{dicts_bytes:>12}"
+            f"{dicts_bytes / tables_bytes:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Offline end-to-end replay of a chat session, with the latency of every turn
+split into LLM (streaming the structured response), tool (waiting for the
+selected tools after the stream, plus their storage writes) and render (the Plotly
+view reading the stored scene and building its figure).
+
+The LLM is replaced by a `ReplayProvider` and `vkt.Storage` by an in-memory
+store, so it runs without network nor a VIKTOR environment. The storage column
+counts the storage round trips of the turn, and the job column the time until
+the background job started by the turn (an optimization) is done. Run from the
+repository root:
+
+    python -m benchmarks.replay                        # scripted session
+    python -m benchmarks.replay --replay session.jsonl # recorded responses
+    python -m benchmarks.replay --chunk-delay 0.02     # simulated token latency
+    python -m benchmarks.replay --in-process-jobs      # background jobs on a thread
+"""
+import argparse
+import json
+import time
+
+from pathlib import Path
+from types import SimpleNamespace
+
+from app.jobs import InProcessJobRunner, read_job, set_job_runner
+from app.providers import ReplayProvider, set_provider
+from app.storage import InMemoryStorage, set_backend, storage_session
+
+GEOMETRY = {"xLenght": 8000, "yLenght": 14000, "height": 4000, "nJoist": 7, "distLoad": 5}
+MIXED_GEOMETRY = {**GEOMETRY, "TrussDir": "x", "TrussDepth": 1000}
+JOB_POLL_INTERVAL = 0.1
+
+SECTIONS = {"column_cs": 25, "beam_cs": 18, "joist_cs": 14}
+MIXED_SECTIONS = {**SECTIONS, "truss_chord_cs": 1, "truss_diag_cs": 1}
+
+SCRIPT: list[tuple[str, dict]] = [
+    (
+        "Hi, what can you do?",
+        {"selected_tools": [], "response": "I can create, analyze and optimize steel platforms. Which platform do you need?"},
+    ),
+    (
+        "A platform of 8 by 14 m, 4 m high with 7 joists and 5 kPa.",
+        {
+            "selected_tools": [{"geometry": GEOMETRY, "sections": SECTIONS}],
+            "response": "Here is the platform with the typical sections, it is rendered on the right-hand side.",
+        },
+    ),
+    (
+        "Run it please.",
+        {
+            "selected_tools": [{"previous_geometry": GEOMETRY, "sections": SECTIONS}],
+            "response": "The deformed shape is shown on the right, the max displacement is in the view.",
+        },
+    ),
+    (
+        "Which section do the joists use?",
+        {
+            "selected_tools": [{"geometry": GEOMETRY, "sections": SECTIONS}],
+            "response": "The joists are UB 203x133x30, the platform is shown again on the right.",
+        },
+    ),
+    (
+        "Compare it with a mixed platform of the same size.",
+        {
+            "selected_tools": [
+                {"previous_geometry": GEOMETRY, "sections": SECTIONS},
+                {"previous_geometry": MIXED_GEOMETRY, "sections": MIXED_SECTIONS},
+            ],
+            "response": "Both platforms are analysed and shown side by side on the right.",
+        },
+    ),
+    (
+        "Optimize the first one for a 40 mm limit, quickly please.",
+        {
+            "selected_tools": [{"geometry": GEOMETRY, "deformation_limit": 40, "multi_fidelity": True}],
+            "response": "The optimization is running, the results table will list the lightest designs.",
+        },
+    ),
+]
+
+
+class ScriptedChat:
+    def __init__(self, messages: list[dict]) -> None:
+        self.messages = messages
+
+    def get_messages(self) -> list[dict]:
+        return list(self.messages)
+
+    def __bool__(self) -> bool:
+        return bool(self.messages)
+
+
+def replay(turns: list[tuple[str, dict]], chunk_delay: float, in_process_jobs: bool = False) -> list[dict[str, float]]:
+    set_backend(InMemoryStorage)
+    set_provider(ReplayProvider([response for _, response in turns], delay=chunk_delay))
+
+    from app.controller import Controller, store_scene
+    from app.llm_engine import ResponseStream, SpeculativeToolRunner, execute_tool, tool_executor
+
+    if in_process_jobs:
+        set_job_runner(InProcessJobRunner(tool_executor))
+
+    controller = Controller()
+    history: list[dict] = []
+    timings: list[dict[str, float]] = []
+    for user_message, _ in turns:
+        history.append({"role": "user", "content": user_message})
+        params = SimpleNamespace(
+            chat=ScriptedChat(history), results_sort="rank", results_rows=50, results_max_weight=None, results_max_displacement=None
+        )
+
+        # Same steps as `Controller.call_llm` and `stream_and_execute`
+        start = time.perf_counter()
+        with storage_session(name="chat prompt") as prompt_storage:
+            stream = ResponseStream(conversation_history=params.chat.get_messages(), runner=SpeculativeToolRunner(), verbose=False)
+            text = "".join(stream)
+        streamed = time.perf_counter()
+        with storage_session(name="chat tool") as tool_storage:
+            _, scene = execute_tool(stream.final, runner=stream.runner)
+            if scene:
+                store_scene(scene)
+        executed = time.perf_counter()
+        with storage_session(name="plotly view") as view_storage:
+            controller.get_plotly_view(controller, params=params)
+        rendered = time.perf_counter()
+
+        # A background job started by the turn: poll the results view until it is done
+        while (job := read_job()) is not None and job.active:
+            time.sleep(JOB_POLL_INTERVAL)
+            controller.design_results_view(controller, params=params)
+        finished = time.perf_counter()
+
+        history.append({"role": "assistant", "content": text})
+        timings.append(
+            {
+                "ttft": stream.ttft or 0.0,
+                "llm": streamed - start,
+                "tool": executed - streamed,
+                "render": rendered - executed,
+                "total": rendered - start,
+                "job": finished - rendered,
+                "storage": sum(storage.stats.round_trips for storage in (prompt_storage, tool_storage, view_storage)),
+            }
+        )
+    set_provider(None)
+    set_job_runner(None)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--replay", type=Path, help="JSON lines file of recorded responses")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="Seconds between streamed partials")
+    parser.add_argument("--in-process-jobs", action="store_true", help="Run background jobs in this process")
+    args = parser.parse_args()
+
+    if args.replay:
+        with open(args.replay) as jsonfile:
+            turns = [(f"Recorded turn {i + 1}", json.loads(line)) for i, line in enumerate(jsonfile) if line.strip()]
+    else:
+        turns = SCRIPT
+
+    timings = replay(turns, args.chunk_delay, args.in_process_jobs)
+    from app.llm_engine import tool_memo
+
+    print(f"{'turn':>4}{'ttft [s]':>10}{'llm [s]':>10}{'tool [s]':>10}{'render [s]':>12}{'total [s]':>11}{'storage':>9}{'job [s]':>9}")
+    for i, timing in enumerate(timings, start=1):
+        print(
+            f"{i:>4}{timing['ttft']:>10.3f}{timing['llm']:>10.3f}{timing['tool']:>10.3f}"
+            f"{timing['render']:>12.3f}{timing['total']:>11.3f}{timing['storage']:>9}{timing['job']:>9.2f}"
+        )
+    print(f"Tool memo: {tool_memo.stats}")
+
+
+if __name__ == "__main__":
+    main()
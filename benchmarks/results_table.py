@@ -0,0 +1,86 @@
+"""
+Reading the optimization results table as sweeps grow: the whole table stored as
+one JSON blob (as before) against the paged table of ``app.tools.results_table``,
+for the prompt (the 10 best rows) and the table view (50 rows, sorted by weight
+within a displacement limit). Rows are synthetic and the storage is in memory, so
+the times are those of reading and parsing; the round trips and bytes read are
+what a remote storage adds latency and transfer to. Run from the repository root:
+
+    python -m benchmarks.results_table
+"""
+import json
+import time
+import random
+
+from app.storage import InMemoryStorage, current_storage, storage_session
+from app.tools.analysis_tools import format_optimization_table, read_optimization_table
+from app.tools.results_table import DISP_HEADER, WEIGHT_HEADER, ResultsQuery, query_results, store_results_table
+
+SIZES = (1_000, 10_000, 50_000)
+HEADERS = [WEIGHT_HEADER, DISP_HEADER, "Total Cost (€)", "# Joist", "Column", "Beam", "Joist"]
+VIEW_QUERY = ResultsQuery(sort="weight", rows=50, max_displacement=30.0)
+
+
+class CountingStorage(InMemoryStorage):
+    """In memory storage counting the bytes read."""
+    read = 0
+
+    def get(self, key: str) -> bytes:
+        data = super().get(key)
+        CountingStorage.read += len(data)
+        return data
+
+
+def synthetic_rows(count: int, seed: int = 0) -> list[list]:
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        weight = rng.uniform(2_000, 12_000)
+        rows.append([round(weight, 2), -round(rng.gammavariate(4.0, 8.0), 4), round(weight * 1.5, 2), rng.randint(4, 12), "SHS 200x200x8", "IPE 300", "IPE 200"])
+    return sorted(rows, key=lambda row: row[0])
+
+
+def measure(read) -> tuple[float, int, int]:
+    """Time, round trips and bytes read by `read` in a fresh storage session."""
+    CountingStorage.read = 0
+    start = time.perf_counter()
+    with storage_session(CountingStorage()) as storage:
+        read()
+    return time.perf_counter() - start, storage.stats.round_trips, CountingStorage.read
+
+
+def blob_prompt() -> None:
+    table = json.loads(current_storage().get_text("blob"))
+    table["data"][:10]
+
+
+def blob_view() -> None:
+    table = json.loads(current_storage().get_text("blob"))
+    rows = [row for row in table["data"] if abs(row[1]) <= VIEW_QUERY.max_displacement]
+    sorted(rows, key=lambda row: row[0])[: VIEW_QUERY.rows]
+
+
+def main() -> None:
+    print(f"{'rows':>7}  {'reader':<8}{'blob [ms]':>11}{'trips':>7}{'[kB]':>9}{'paged [ms]':>12}{'trips':>7}{'[kB]':>7}")
+    for count in SIZES:
+        rows = synthetic_rows(count)
+        CountingStorage.files.clear()
+        with storage_session(CountingStorage()) as storage:
+            storage.set_json("blob", {"headers": HEADERS, "data": rows})
+            store_results_table(HEADERS, rows)
+        readers = {
+            "prompt": (blob_prompt, lambda: format_optimization_table(read_optimization_table(), 10)),
+            "view": (blob_view, lambda: query_results(VIEW_QUERY)),
+        }
+        for name, (blob, paged) in readers.items():
+            blob_s, blob_trips, blob_bytes = min(measure(blob) for _ in range(5))
+            paged_s, paged_trips, paged_bytes = min(measure(paged) for _ in range(5))
+            print(
+                f"{count:>7}  {name:<8}{blob_s * 1000:>11.2f}{blob_trips:>7}{blob_bytes / 1000:>9.1f}"
+                f"{paged_s * 1000:>12.2f}{paged_trips:>7}{paged_bytes / 1000:>7.1f}"
+            )
+            count = ""
+
+
+if __name__ == "__main__":
+    main()
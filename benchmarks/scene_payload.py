@@ -0,0 +1,74 @@
+"""
+Chat and Plotly view cost of the stored view payload.
+
+For figure JSON: the former view path (``json.loads``, ``go.Figure`` and
+``to_json`` again) against passing the stored JSON through, for every codec
+available. For the compact ``.npz`` scene stored by the tools: the time the chat
+path spends packing it, its size, and the time of the first (rendering) and of
+later (cached) views. Run from the repository root:
+
+    python -m benchmarks.scene_payload
+"""
+import json
+import time
+
+import plotly.graph_objects as go
+
+from app.llm_engine import PlotPlatformMixed, RunModelTool, _run_tool
+from app.plots.payload import _zstd, decode_figure, encode_figure
+from app.plots.scene import pack_scenes, render_scenes
+from app.schemas import PlatformInputs, PlatformMixedInputs, SectionSeed, SectionSeedMixed
+
+SECTIONS = dict(column_cs=25, beam_cs=18, joist_cs=14)
+MIXED = dict(xLenght=8000, yLenght=14000, height=4000, nJoist=9, distLoad=5, TrussDir="x", TrussDepth=900)
+
+CASES = {
+    "Platform deformed": RunModelTool(
+        previous_geometry=PlatformInputs(xLenght=8000, yLenght=14000, height=4000, nJoist=7, distLoad=5),
+        sections=SectionSeed(**SECTIONS),
+    ),
+    "Mixed platform model": PlotPlatformMixed(
+        geometry=PlatformMixedInputs(**MIXED), sections=SectionSeedMixed(**SECTIONS, truss_chord_cs=1, truss_diag_cs=1)
+    ),
+    "Mixed platform deformed": RunModelTool(
+        previous_geometry=PlatformMixedInputs(**MIXED), sections=SectionSeedMixed(**SECTIONS, truss_chord_cs=1, truss_diag_cs=1)
+    ),
+}
+
+
+def best_of(function, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    codecs = ["none", "gzip"] + (["zstd"] if _zstd() is not None else [])
+    print(f"{'figure':<26}{'codec':>6}{'stored [kB]':>13}{'write [ms]':>12}{'view [ms]':>11}{'speedup':>9}")
+    for name, tool in CASES.items():
+        scene = _run_tool(tool).scene
+        packed = pack_scenes([scene])
+        render = best_of(lambda: render_scenes.__wrapped__(packed))
+        figure_json = render_scenes(packed)
+        raw = figure_json.encode()
+        reparse = best_of(lambda: go.Figure(json.loads(raw)).to_json())
+        print(f"{name:<26}{'re-parse':>6}{len(raw) / 1000:>13.1f}{'':>12}{reparse * 1000:>11.1f}{'1.0x':>9}")
+        for codec in codecs:
+            stored = encode_figure(figure_json, codec=codec)
+            write = best_of(lambda: encode_figure(figure_json, codec=codec))
+            view = best_of(lambda: decode_figure(stored))
+            print(
+                f"{'':<26}{codec:>6}{len(stored) / 1000:>13.1f}{write * 1000:>12.1f}"
+                f"{view * 1000:>11.2f}{reparse / view:>8.0f}x"
+            )
+        pack = best_of(lambda: pack_scenes([scene]))
+        cached = best_of(lambda: render_scenes(packed))
+        print(f"{'':<26}{'npz':>6}{len(packed) / 1000:>13.1f}{pack * 1000:>12.1f}{render * 1000:>11.1f}{'(first)':>9}")
+        print(f"{'':<26}{'':>6}{'':>13}{'':>12}{cached * 1000:>11.3f}{'(cached)':>9}")
+
+
+if __name__ == "__main__":
+    main()
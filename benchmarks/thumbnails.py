@@ -0,0 +1,56 @@
+"""
+Thumbnails of the best designs of an optimization: rendering them one after the
+other in this process against the worker pool of ``app.plots.thumbnails``, and
+the cost of a second request, served from the disk cache. Needs kaleido with a
+working Chrome. Run from the repository root:
+
+    python -m benchmarks.thumbnails
+"""
+import base64
+import shutil
+import time
+
+from app.plots import thumbnails
+from app.plots.scene import pack_scenes
+from app.schemas import PlatformInputs
+from app.tools.analysis_tools import design_with_scene, run_optimization
+
+SEED = PlatformInputs(xLenght=8000, yLenght=14000, height=4000, nJoist=7, distLoad=5)
+LIMIT = 50.0
+
+
+def main() -> None:
+    run = run_optimization(SEED, deformation_limit=LIMIT, keep_scenes=thumbnails.THUMBNAIL_TOP_K)
+    valid = [design for design in sorted(run.designs) if abs(design.global_max_disp) < LIMIT]
+    designs = [design_with_scene(design) for design in valid[: thumbnails.THUMBNAIL_TOP_K]]
+    entries = [
+        {"hash": thumbnails.design_hash(design), "scene": base64.b64encode(pack_scenes([design.scene])).decode()}
+        for design in designs
+    ]
+    shutil.rmtree(thumbnails.THUMBNAIL_DIR, ignore_errors=True)
+
+    start = time.perf_counter()
+    for entry in entries:
+        thumbnails.render_thumbnail(base64.b64decode(entry["scene"]), thumbnails.thumbnail_path(entry["hash"]))
+    sequential = time.perf_counter() - start
+    shutil.rmtree(thumbnails.THUMBNAIL_DIR)
+
+    # Workers started (and their browsers warmed up) before timing, as in a running app
+    thumbnails.thumbnail_pool().submit(time.sleep, 0).result()
+    start = time.perf_counter()
+    for render in thumbnails.request_thumbnails(entries).values():
+        render.result()
+    parallel = time.perf_counter() - start
+
+    start = time.perf_counter()
+    thumbnails.request_thumbnails(entries)
+    cached = time.perf_counter() - start
+
+    print(f"{len(entries)} thumbnails of {thumbnails.THUMBNAIL_SIZE[0]}x{thumbnails.THUMBNAIL_SIZE[1]} px")
+    print(f"sequential, in process   {sequential:8.2f} s")
+    print(f"pool of {thumbnails.THUMBNAIL_WORKERS} workers        {parallel:8.2f} s ({sequential / parallel:.1f}x)")
+    print(f"cached                   {cached * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()